@@ -0,0 +1,94 @@
+# Tells muscle activity from rest on the envelope with a few running
+# averages per sample, so livestream can skip features and inference while
+# the envelope sits at its resting baseline (most of a session).
+#
+#   level    - fast exponential average of the envelope
+#   baseline - slow average of the envelope, only updated at rest
+#   spread   - slow average of |envelope - baseline| at rest (noise level)
+#
+# The gate opens as soon as level rises on_factor spreads above baseline and
+# closes once it has stayed below off_factor spreads for hold samples. The
+# gap between the two thresholds and the hold keep it from flickering around
+# a single threshold. It stays open for the first warmup samples while the
+# baseline settles.
+
+
+class ActivityGate:
+    """Hysteresis gate on an adaptive envelope baseline.
+
+    update(value) takes one sample and returns True while the muscle is
+    active. Counters: samples, active_samples, activations (rest -> active
+    transitions); livestream_decisions adds computed_windows and
+    skipped_windows (decisions answered from the cached rest decision).
+    """
+
+    def __init__(self, on_factor=4.0, off_factor=2.0, fast_alpha=0.3, baseline_alpha=0.01, hold=50, warmup=100,
+                 min_spread=1e-6):
+        if off_factor > on_factor:
+            raise ValueError(f"off_factor ({off_factor}) must not be above on_factor ({on_factor})")
+        self.on_factor = on_factor
+        self.off_factor = off_factor
+        self.fast_alpha = fast_alpha
+        self.baseline_alpha = baseline_alpha
+        self.hold = hold
+        self.warmup = warmup
+        self.min_spread = min_spread
+        self.reset()
+
+    def reset(self):
+        self.active = True
+        self.level = None
+        self.baseline = None
+        self.spread = 0.0
+        self.samples = 0
+        self.active_samples = 0
+        self.activations = 0
+        self.computed_windows = 0
+        self.skipped_windows = 0
+        self._below = 0
+
+    def update(self, value):
+        """Feeds one envelope sample; returns whether the muscle is active."""
+        value = float(value)
+        self.samples += 1
+        if self.level is None:
+            self.level = self.baseline = value
+        else:
+            self.level += self.fast_alpha * (value - self.level)
+
+        if self.samples <= self.warmup or not self.active:
+            # Learn what rest looks like; activity must not drag the baseline up.
+            # A plain running mean at first, so the warmup settles quickly.
+            alpha = max(self.baseline_alpha, 1.0 / self.samples)
+            self.baseline += alpha * (value - self.baseline)
+            self.spread += alpha * (abs(value - self.baseline) - self.spread)
+
+        if self.samples > self.warmup:
+            above = self.level - self.baseline
+            spread = max(self.spread, self.min_spread)
+            if not self.active:
+                if above > self.on_factor * spread:
+                    self.active = True
+                    self.activations += 1
+                    self._below = 0
+            elif above < self.off_factor * spread:
+                self._below += 1
+                if self._below >= self.hold:
+                    self.active = False
+            else:
+                self._below = 0
+
+        if self.active:
+            self.active_samples += 1
+        return self.active
+
+    def stats(self):
+        return {
+            "samples": self.samples,
+            "active_samples": self.active_samples,
+            "activations": self.activations,
+            "computed_windows": self.computed_windows,
+            "skipped_windows": self.skipped_windows,
+            "baseline": self.baseline,
+            "spread": self.spread,
+        }
@@ -0,0 +1,349 @@
+# Benchmarks for the real-time EMG hot paths: feature extraction, model
+# prediction, serial parsing, stream logging and the end-to-end livestream
+# loop. Results are written as JSON and compared against the stored baseline
+# (benchmark_baseline.json next to this file), failing when a metric
+# regresses by more than its threshold. The baseline is machine specific:
+# refresh it on the reference machine when a change is meant to be slower.
+#
+#   python benchmark.py                                           # measure and compare
+#   python benchmark.py --baseline other.json                     # compare with another run
+#   python benchmark.py --output benchmark_baseline.json --no-baseline  # refresh the baseline
+#   python benchmark.py --quick --no-baseline                     # quick sanity run
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+MODEL_PATH = Path(__file__).with_name("bg_model.npz")
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+# Fraction a metric may get worse by before compare() reports it
+DEFAULT_THRESHOLD = 0.15
+
+
+def _result(value, unit, higher_is_better):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds > 0 else float("inf")
+
+
+def _best_time(fn, repeat=5):
+    """Fastest of `repeat` runs of fn, in seconds; the minimum is the least noisy estimate."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _signal(n, seed=0):
+    return np.random.default_rng(seed).normal(size=n)
+
+
+# --- fake serial port, same approach as tests/test_emg_reader.py, minus the sleeps ---
+
+class _BenchSerial:
+    """Serves a fixed byte string through readline / in_waiting / read as fast as it is asked."""
+
+    def __init__(self, data, chunk=4096):
+        self._data = data
+        self._pos = 0
+        self._chunk = chunk
+
+    @property
+    def in_waiting(self):
+        return min(self._chunk, len(self._data) - self._pos)
+
+    def read(self, size=1):
+        data = self._data[self._pos:self._pos + size]
+        self._pos += len(data)
+        if not data:
+            time.sleep(0.001)
+        return data
+
+    def readline(self):
+        end = self._data.find(b"\n", self._pos)
+        if end < 0:
+            time.sleep(0.001)
+            return b""
+        line = self._data[self._pos:end + 1]
+        self._pos = end + 1
+        return line
+
+    def close(self):
+        pass
+
+
+class _BenchSerialModule:
+    def __init__(self, data):
+        self._data = data
+
+    def Serial(self, *args, **kwargs):
+        return _BenchSerial(self._data)
+
+
+@contextlib.contextmanager
+def fake_serial(data):
+    """Makes `import serial` inside EMGReader return a port serving data."""
+    previous = sys.modules.get("serial")
+    sys.modules["serial"] = _BenchSerialModule(data)
+    try:
+        yield
+    finally:
+        if previous is None:
+            sys.modules.pop("serial", None)
+        else:
+            sys.modules["serial"] = previous
+
+
+# --- benchmarks; each returns {name: result} ---
+
+def bench_features(quick=False):
+    """Windows/sec of the per-window reference and the batched kernel (per AR method) per window size and ar_order, and of multi-channel windows."""
+    from feature_engineering import calculate_emg_features, calculate_emg_features_batch
+
+    results = {}
+    n_single = 20 if quick else 200
+    n_batch = 500 if quick else 5000
+    for window in (50, 100, 200):
+        for ar_order in (2, 4, 6):
+            segments = _signal(window * n_batch).reshape(n_batch, window)
+            seconds = _best_time(lambda: [calculate_emg_features(s, ar_order) for s in segments[:n_single]], 3)
+            results[f"features.single.w{window}.p{ar_order}"] = _result(_rate(n_single, seconds), "windows/s", True)
+            seconds = _best_time(lambda: calculate_emg_features_batch(segments, ar_order))
+            results[f"features.batch.w{window}.p{ar_order}"] = _result(_rate(n_batch, seconds), "windows/s", True)
+            for method in ("yule_walker", "burg"):
+                seconds = _best_time(lambda: calculate_emg_features_batch(segments, ar_order, method))
+                results[f"features.batch_{method}.w{window}.p{ar_order}"] = _result(
+                    _rate(n_batch, seconds), "windows/s", True)
+    for channels in (4, 8):
+        segments = _signal(50 * n_batch * channels).reshape(n_batch, 50, channels)
+        seconds = _best_time(lambda: calculate_emg_features_batch(segments))
+        results[f"features.batch.w50.p4.c{channels}"] = _result(_rate(n_batch, seconds), "windows/s", True)
+    return results
+
+
+def bench_predict(quick=False, keras=False):
+    """Single-row latency and batch throughput of the NumPy runtime (and Keras if asked)."""
+    from inference import load_model, predict_proba
+
+    results = {}
+    model = load_model(MODEL_PATH)
+    row = _signal(11).reshape(1, 11)
+    batch = _signal(11 * 256).reshape(256, 11)
+    n = 200 if quick else 2000
+    seconds = _best_time(lambda: [predict_proba(model, row) for _ in range(n)])
+    results["predict.numpy.single"] = _result(seconds / n * 1e6, "us", False)
+    seconds = _best_time(lambda: predict_proba(model, batch))
+    results["predict.numpy.batch256"] = _result(_rate(256, seconds), "rows/s", True)
+
+    h5 = MODEL_PATH.with_suffix(".h5")
+    if keras and h5.exists():
+        keras_model = load_model(h5)
+        n = 10 if quick else 50
+        seconds = _best_time(lambda: [keras_model.predict(row, verbose=0) for _ in range(n)], 3)
+        results["predict.keras.single"] = _result(seconds / n * 1e6, "us", False)
+    return results
+
+
+def bench_reader(quick=False):
+    """Lines/sec EMGReader parses from a fake port, in line mode and in bulk mode."""
+    from emg import EMGReader
+
+    results = {}
+    n = 5000 if quick else 50000
+    data = b"".join(b"%.3f,%.3f\n" % (v, abs(v)) for v in _signal(n))
+    for mode, bulk in (("line", False), ("bulk", True)):
+        with fake_serial(data):
+            start = time.perf_counter()
+            reader = EMGReader(port="BENCH", bulk=bulk)
+            # Line mode keeps no sample counter, so wait for the port to be drained
+            if bulk:
+                done = lambda: reader._parser.parsed >= n  # noqa: E731
+            else:
+                done = lambda: reader.ser.in_waiting == 0  # noqa: E731
+            deadline = start + 60.0
+            while not done() and time.perf_counter() < deadline:
+                time.sleep(0.0005)
+            seconds = time.perf_counter() - start
+            reader.stop()
+        results[f"reader.{mode}"] = _result(_rate(n, seconds), "lines/s", True)
+    return results
+
+
+def bench_logger(quick=False):
+    """Rows/sec through the stream log writers, CSV and binary, including the writer thread."""
+    from logger import Logger
+
+    results = {}
+    n = 20000 if quick else 200000
+    with tempfile.TemporaryDirectory() as tmp:
+        for stream_format in ("csv", "binary"):
+            logger = Logger(Path(tmp) / stream_format / "session", stream_format=stream_format,
+                            stream_options={"max_queue": n + 1})
+            logger.path.parent.mkdir()
+            writer = logger._open_stream_writer()
+            start = time.perf_counter()
+            ts = time.time()
+            for i in range(n):
+                writer.write(logger._stream_row(ts + i * 0.01, "bench", 1, 0.5))
+            queued = time.perf_counter() - start
+            writer.close(timeout=60.0)
+            seconds = time.perf_counter() - start
+            results[f"logger.{stream_format}.write"] = _result(queued / n * 1e6, "us/row", False)
+            results[f"logger.{stream_format}.throughput"] = _result(_rate(writer.written, seconds), "rows/s", True)
+    return results
+
+
+def bench_livestream(quick=False):
+    """Per-sample latency of process_livestream from a sample arriving to its decision, hop=1."""
+    from livestream import process_livestream
+
+    results = {}
+    n = 1000 if quick else 5000
+    signal = _signal(n).tolist()
+    for mode, incremental in (("incremental", True), ("full", False)):
+        arrived = []
+        latencies = []
+
+        def samples():
+            for value in signal:
+                arrived.append(time.perf_counter())
+                yield value
+
+        def on_decision(decision):
+            latencies.append(time.perf_counter() - arrived[decision.sample_index - 1])
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_livestream(samples(), incremental=incremental, model_path=str(MODEL_PATH), on_decision=on_decision)
+        seconds = time.perf_counter() - start
+        latencies.sort()
+        results[f"livestream.{mode}.p50"] = _result(latencies[len(latencies) // 2] * 1e6, "us", False)
+        results[f"livestream.{mode}.p95"] = _result(latencies[int(len(latencies) * 0.95)] * 1e6, "us", False)
+        results[f"livestream.{mode}.throughput"] = _result(_rate(n, seconds), "samples/s", True)
+    return results
+
+
+BENCHMARKS = {
+    "features": bench_features,
+    "predict": bench_predict,
+    "reader": bench_reader,
+    "logger": bench_logger,
+    "livestream": bench_livestream,
+}
+
+
+def run_benchmarks(only=None, quick=False, keras=False):
+    """Runs the named benchmark groups (all by default) and returns the report dict."""
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        if name == "predict":
+            results.update(bench(quick=quick, keras=keras))
+        else:
+            results.update(bench(quick=quick))
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD, thresholds=None):
+    """
+    Compares a report with a baseline report.
+
+    Args:
+        threshold: Allowed relative change in the bad direction.
+        thresholds: Optional {metric name: threshold} overrides.
+
+    Returns:
+        list: one dict (name, baseline, value, change, threshold, regressed)
+        per metric present in both, change being relative to the baseline
+        and positive when the metric got better.
+    """
+    thresholds = thresholds or {}
+    rows = []
+    for name, current in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or not base["value"]:
+            continue
+        change = (current["value"] - base["value"]) / base["value"]
+        if not current["higher_is_better"]:
+            change = -change
+        limit = thresholds.get(name, threshold)
+        rows.append({"name": name, "baseline": base["value"], "value": current["value"], "change": change,
+                     "threshold": limit, "regressed": change < -limit})
+    return rows
+
+
+def format_comparison(rows):
+    lines = []
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else ""
+        lines.append(f"{row['name']:<34}{row['baseline']:>14.1f}{row['value']:>14.1f}{row['change'] * 100:>+9.1f}%  {flag}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the EMG real-time hot paths.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results.")
+    parser.add_argument("--baseline", default=None,
+                        help="Baseline results to compare against (default: benchmark_baseline.json).")
+    parser.add_argument("--no-baseline", action="store_true", help="Only measure, do not compare.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative regression, e.g. 0.15 for 15%%.")
+    parser.add_argument("--only", nargs="+", choices=tuple(BENCHMARKS), help="Run only these groups.")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads, for a fast sanity check.")
+    parser.add_argument("--keras", action="store_true", help="Also time Keras prediction from bg_model.h5.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmarks(only=args.only, quick=args.quick, keras=args.keras)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for name, result in report["results"].items():
+        print(f"{name:<34}{result['value']:>14.1f} {result['unit']}")
+    print(f"Results saved to {args.output}")
+
+    if args.no_baseline:
+        return 0
+    baseline_path = Path(args.baseline) if args.baseline else BASELINE_PATH
+    if args.baseline is None and not baseline_path.is_file():
+        print(f"No baseline at {baseline_path}, nothing to compare against")
+        return 0
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("meta", {}).get("quick") != report["meta"]["quick"]:
+        print(f"Warning: baseline quick={baseline.get('meta', {}).get('quick')} but this run "
+              f"quick={report['meta']['quick']}; the workloads differ")
+    rows = compare(report, baseline, threshold=args.threshold)
+    print(format_comparison(rows))
+    regressed = [row["name"] for row in rows if row["regressed"]]
+    if regressed:
+        print(f"{len(regressed)} regression(s): {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
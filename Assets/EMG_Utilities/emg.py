@@ -1,28 +1,247 @@
+import collections
 import threading
+import time
+
+from metrics import METRICS
+
+# Pause after a failed bulk read (e.g. an unplugged port) instead of retrying in a tight loop
+READ_ERROR_BACKOFF = 0.05
+# Bulk samples kept for read_samples(); when nobody drains them the oldest are dropped
+MAX_QUEUED_SAMPLES = 100000
+
+
+class LineParser:
+    """Turns raw serial bytes into samples, carrying partial lines between reads.
+
+    Malformed lines are counted instead of printed; the last one is kept in
+    last_error for debugging.
+    """
+
+    def __init__(self, n_fields=2):
+        self.n_fields = n_fields
+        self.parsed = 0
+        self.errors = 0
+        self.last_error = None
+        self._partial = b""
+
+    def feed(self, data):
+        """Returns a list of float tuples, one per complete line in data."""
+        lines = (self._partial + data).split(b"\n")
+        # The last piece has no newline yet; keep it for the next read
+        self._partial = lines.pop()
+        samples = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                values = tuple(map(float, line.split(b",")))
+                if len(values) != self.n_fields:
+                    raise ValueError(f"expected {self.n_fields} fields, got {len(values)}")
+            except ValueError as e:
+                self.errors += 1
+                self.last_error = (line, str(e))
+                continue
+            samples.append(values)
+        self.parsed += len(samples)
+        return samples
+
 
 class EMGReader:
-    def __init__(self, port="COM6", baud=115200):
-        import serial  # imported here so stub works without pyserial
+    def __init__(self, port="COM6", baud=115200, bulk=False, timestamps=False, buffer_size=None, serial_port=None,
+                 n_channels=1, start=True, queue_samples=True):
+        """
+        serial_port: an already open serial-like object (readline, or
+            in_waiting / read, and close) to read from instead of opening
+            port, e.g. a replay.ReplaySerial.
+        n_channels: electrodes per line. Every line holds a filtered,envelope
+            pair per channel (f1,e1,f2,e2,...); filtered/envelope follow
+            channel 0 and last_sample holds the whole line.
+        start: start the reading thread. A SerialManager passes False and
+            hands the reader the bytes it reads through feed() instead.
+        queue_samples: keep bulk samples for read_samples(). False when
+            another consumer (a SerialManager callback) takes them, so
+            nothing piles up undrained.
+        """
+        if serial_port is not None:
+            self.ser = serial_port
+        else:
+            import serial  # imported here so stub works without pyserial
 
-        self.ser = serial.Serial(port, baud, timeout=1)
+            self.ser = serial.Serial(port, baud, timeout=1)
         # print(f"Connected to Arduino on {port}") -> properly connected
+        self.n_channels = n_channels
         self.filtered = 0
         self.envelope = 0
+        self.last_sample = (0.0,) * (2 * n_channels)
         self.detect = 0
+        self.parse_errors = 0
+        self.bulk = bulk
+        self.timestamps = timestamps
+        self.queue_samples = queue_samples
+        self._parser = LineParser(2 * n_channels)
+        # bulk mode: every parsed sample, in order, until read_samples() drains it
+        self._samples = collections.deque(maxlen=MAX_QUEUED_SAMPLES)
+        self.dropped_samples = 0
+        # optional ring of (timestamp, filtered, envelope, ...) rows for windowed reads
+        self.buffer = None
+        self._cursor = 0
+        if buffer_size:
+            from ring_buffer import SampleRing  # NumPy is only loaded when a ring is requested
+
+            self.buffer = SampleRing(buffer_size, n_columns=1 + 2 * n_channels)
         self.running = True
-        threading.Thread(target=self._loop, daemon=True).start()
+        if start:
+            target = self._bulk_loop if bulk else self._loop
+            threading.Thread(target=target, daemon=True).start()
 
     def _loop(self):
         while self.running:
+            line = ""
             try:
-                line = self.ser.readline().decode(errors="ignore").strip()
+                t0 = METRICS.start()
+                raw = self.ser.readline()
+                METRICS.record("serial_read", t0)
+                t0 = METRICS.start()
+                line = raw.decode(errors="ignore").strip()
+                if not line:
+                    # Read timeout with nothing on the port (LineParser skips these too)
+                    continue
                 # print(line) # -> values are correctly read
-                filt, env = map(float, line.split(","))
+                sample = tuple(map(float, line.split(",")))
+                if len(sample) != 2 * self.n_channels:
+                    raise ValueError(f"expected {2 * self.n_channels} fields, got {len(sample)}")
+                METRICS.record("parse", t0)
+                self._parser.parsed += 1
                 # print(f"EMG Raw: {raw}, Filtered: {filt}, Envelope: {env}, Detect: {det}") # -> values not even read
-                self.filtered = filt
-                self.envelope = env
+                self.filtered, self.envelope = sample[:2]
+                self.last_sample = sample
+                if self.buffer is not None:
+                    self.buffer.append((time.time(),) + sample)
             except Exception as e:
-                print(f"Error parsing line: '{line}' -> {e}")
+                self.parse_errors += 1
+                self._parser.last_error = (line, str(e))
+
+    def _bulk_loop(self):
+        while self.running:
+            try:
+                # Block for the first byte (up to the port timeout), then take
+                # whatever else is already waiting in one call
+                t0 = METRICS.start()
+                waiting = self.ser.in_waiting
+                data = self.ser.read(waiting if waiting else 1)
+                METRICS.record("serial_read", t0)
+            except Exception as e:
+                if self.running:
+                    self._parser.last_error = (b"", str(e))
+                    time.sleep(READ_ERROR_BACKOFF)
+                continue
+            if data:
+                self.feed(data)
+
+    def feed(self, data):
+        """
+        Parses raw bytes and stores the samples the way the bulk loop does.
+        Returns the parsed sample tuples.
+        """
+        t0 = METRICS.start()
+        samples = self._parser.feed(data)
+        METRICS.record("parse", t0)
+        self.parse_errors = self._parser.errors
+        if not samples:
+            return samples
+        if self.buffer is not None:
+            # Lines from one read share its arrival time
+            ts = time.time()
+            t0 = METRICS.start()
+            self.buffer.extend([(ts,) + s for s in samples])
+            METRICS.record("buffer_write", t0)
+        elif self.queue_samples:
+            overflow = len(self._samples) + len(samples) - self._samples.maxlen
+            if overflow > 0:
+                self.dropped_samples += overflow
+            if self.timestamps:
+                ts = time.time()
+                self._samples.extend((ts,) + s for s in samples)
+            else:
+                self._samples.extend(samples)
+        self.last_sample = samples[-1]
+        self.filtered, self.envelope = samples[-1][:2]
+        return samples
+
+    @property
+    def last_error(self):
+        return self._parser.last_error
+
+    @property
+    def parsed_count(self):
+        """Samples parsed so far, in either read mode."""
+        return self._parser.parsed
+
+    def read_samples(self):
+        """
+        Drains the samples parsed since the last call (bulk mode only).
+
+        Returns a list of (filtered, envelope) tuples, or (timestamp,
+        filtered, envelope) when the reader was created with timestamps=True.
+        With several channels every tuple holds each channel's pair in turn.
+        With a ring buffer the samples come from it, so nothing is lost as
+        long as the caller drains more often than buffer_size samples arrive.
+        Without one at most MAX_QUEUED_SAMPLES are kept; older ones are
+        dropped and counted in dropped_samples.
+        """
+        if self.buffer is not None:
+            rows, self._cursor = self.buffer.since(self._cursor)
+            start = 0 if self.timestamps else 1
+            return [tuple(row[start:].tolist()) for row in rows]
+        samples = []
+        while self._samples:
+            samples.append(self._samples.popleft())
+        return samples
+
+    def latest(self, n):
+        """
+        View of the newest n (timestamp, filtered, envelope) rows from the ring
+        buffer, oldest first. Requires buffer_size.
+        """
+        return self._require_buffer().latest(n)
+
+    def since(self, cursor):
+        """
+        View of the rows written from absolute sample index `cursor` on, plus
+        the cursor to pass next time. Requires buffer_size.
+        """
+        return self._require_buffer().since(cursor)
+
+    @property
+    def envelope_columns(self):
+        """
+        Ring buffer column(s) of the envelope: 2 for one channel, or a slice
+        picking every channel's envelope as an (n, n_channels) view.
+        """
+        return 2 if self.n_channels == 1 else slice(2, None, 2)
+
+    def chunks(self, column=2, poll=0.005, cursor=None):
+        """
+        Yields one column (envelope by default) of every new sample as 1-D
+        views, in chunks of whatever arrived since the last one, until stop().
+        column=envelope_columns yields (n, n_channels) views instead.
+        Starts at absolute sample index `cursor`, or at the next sample if None.
+        """
+        ring = self._require_buffer()
+        if cursor is None:
+            cursor = ring.total
+        while self.running:
+            rows, cursor = ring.since(cursor)
+            if len(rows):
+                yield rows[:, column]
+            else:
+                time.sleep(poll)
+
+    def _require_buffer(self):
+        if self.buffer is None:
+            raise RuntimeError("EMGReader was created without buffer_size")
+        return self.buffer
 
     def stop(self):
         self.running = False
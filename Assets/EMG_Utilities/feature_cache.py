@@ -0,0 +1,93 @@
+# Content-addressed on-disk cache of extracted features. An entry is keyed by
+# the sha256 of the input samples together with the extraction parameters and
+# feature_engineering.FEATURE_VERSION, so unchanged data is never recomputed
+# and any change to the data, the parameters or the feature code misses.
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from feature_engineering import FEATURE_VERSION
+
+
+class FeatureCache:
+    """Feature arrays stored as .npy files under directory, evicted least recently used first.
+
+    get() refreshes an entry's modification time, and put() removes the
+    oldest entries once the cache holds more than max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = sum(p.stat().st_size for p in self._entries())
+
+    def _entries(self):
+        return self.directory.glob("*/*.npy")
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.npy"
+
+    @staticmethod
+    def key(values, **params):
+        """Key of the features of values extracted with params (e.g. window, hop, ar_order)."""
+        h = hashlib.sha256()
+        h.update(json.dumps(dict(params, feature_version=FEATURE_VERSION), sort_keys=True).encode())
+        h.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        return h.hexdigest()
+
+    def get(self, key):
+        """Cached array for key, or None."""
+        path = self._path(key)
+        try:
+            features = np.load(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return features
+
+    def put(self, key, features):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        old_size = path.stat().st_size if path.exists() else 0
+        # Write then rename, so a crash never leaves a truncated entry behind
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            np.save(f, np.asarray(features))
+        os.replace(tmp, path)
+        self.size += path.stat().st_size - old_size
+        if self.size > self.max_bytes:
+            self._evict(keep=path)
+
+    def _evict(self, keep):
+        entries = []
+        for p in self._entries():
+            try:
+                stat = p.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+        entries.sort()
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if self.size <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            self.size -= size
+            self.evictions += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "bytes": self.size}
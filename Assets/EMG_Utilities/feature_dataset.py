@@ -0,0 +1,135 @@
+# Typed feature dataset: a directory of .npz shards plus schema.json.
+# Each shard holds the feature matrix as one float64 array (columns WL, AAC,
+# DASDV, AR_1..AR_p, CC_1..CC_p) next to the Output labels and the
+# session_id / level_number of every row, so loading is a few array reads
+# instead of parsing a text column per row.
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+SCHEMA_FILE = "schema.json"
+
+
+def feature_columns(ar_order=4):
+    """Names of the feature matrix columns, in model input order."""
+    return (
+        ["WL", "AAC", "DASDV"]
+        + [f"AR_{i}" for i in range(1, ar_order + 1)]
+        + [f"CC_{i}" for i in range(1, ar_order + 1)]
+    )
+
+
+def is_feature_dataset(path):
+    return (Path(path) / SCHEMA_FILE).is_file()
+
+
+class FeatureDatasetWriter:
+    """Appends feature rows to a dataset directory, one shard per shard_rows rows.
+
+    Rows are buffered until a shard is full; close() writes the last shard
+    and schema.json, which records the windowing parameters and the shards.
+    """
+
+    def __init__(self, directory, window, hop, ar_order=4, shard_rows=100000, ar_method="ols"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Schema first: an interrupted rewrite must not look like a finished dataset
+        (self.directory / SCHEMA_FILE).unlink(missing_ok=True)
+        for old in self.directory.glob("part-*.npz"):
+            old.unlink()
+        self.schema = {
+            "format_version": FORMAT_VERSION,
+            "window": window,
+            "hop": hop,
+            "ar_order": ar_order,
+            "ar_method": ar_method,
+            "feature_columns": feature_columns(ar_order),
+            "rows": 0,
+            "shards": [],
+        }
+        self.shard_rows = shard_rows
+        self._pending = []
+        self._pending_rows = 0
+
+    def append(self, features, label, session_id, level_number):
+        """Adds an (n, 3 + 2p) feature block that shares one label, session and level."""
+        features = np.asarray(features, dtype=np.float64)
+        n = len(features)
+        if not n:
+            return
+        if features.shape[1] != len(self.schema["feature_columns"]):
+            raise ValueError(f"Expected {len(self.schema['feature_columns'])} feature columns, got {features.shape[1]}")
+        self._pending.append((features, np.full(n, label, dtype=np.int8),
+                              np.full(n, str(session_id)), np.full(n, _level(level_number), dtype=np.int64)))
+        self._pending_rows += n
+        if self._pending_rows >= self.shard_rows:
+            self._write_shard()
+
+    def _write_shard(self):
+        if not self._pending:
+            return
+        features, labels, sessions, levels = (np.concatenate(parts) for parts in zip(*self._pending))
+        name = f"part-{len(self.schema['shards']):05d}.npz"
+        np.savez(self.directory / name, features=features, Output=labels, session_id=sessions, level_number=levels)
+        self.schema["shards"].append({"file": name, "rows": len(features)})
+        self.schema["rows"] += len(features)
+        self._pending = []
+        self._pending_rows = 0
+
+    def close(self):
+        self._write_shard()
+        tmp = self.directory / (SCHEMA_FILE + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(self.schema, f, indent=2)
+        os.replace(tmp, self.directory / SCHEMA_FILE)
+
+
+def _level(level_number):
+    # Level labels are stored as int64; 2.0 from a float column is fine, 2.5 or "2" is not
+    try:
+        level = int(level_number)
+    except (TypeError, ValueError, OverflowError):
+        level = None
+    if level is None or level != level_number:
+        raise ValueError(f"level_number must be an integer, got {level_number!r}")
+    return level
+
+
+def read_schema(directory):
+    with (Path(directory) / SCHEMA_FILE).open(encoding="utf-8") as f:
+        schema = json.load(f)
+    if schema.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported feature dataset version {schema.get('format_version')}")
+    return schema
+
+
+def iter_shards(directory):
+    """Yields every shard as a dict of arrays (features, Output, session_id, level_number)."""
+    directory = Path(directory)
+    for shard in read_schema(directory)["shards"]:
+        with np.load(directory / shard["file"]) as data:
+            yield {name: data[name] for name in data.files}
+
+
+def load_feature_dataset(directory):
+    """
+    Loads the whole dataset.
+
+    Returns:
+        tuple: (X, y, info) with X the (n, 3 + 2p) float64 features, y the
+        labels and info a dict holding the schema plus the per-row
+        session_id and level_number arrays.
+    """
+    schema = read_schema(directory)
+    shards = list(iter_shards(directory))
+    width = len(schema["feature_columns"])
+    if shards:
+        columns = {name: np.concatenate([shard[name] for shard in shards]) for name in shards[0]}
+    else:
+        columns = {"features": np.zeros((0, width)), "Output": np.zeros(0, dtype=np.int8),
+                   "session_id": np.zeros(0, dtype=str), "level_number": np.zeros(0, dtype=np.int64)}
+    info = dict(schema, session_id=columns["session_id"], level_number=columns["level_number"])
+    return columns["features"], columns["Output"], info
@@ -1,13 +1,16 @@
 import numpy as np
-from statsmodels.tsa.ar_model import AutoReg
 
-def calculate_emg_features(signal, ar_order=4):
+# Bump whenever the feature code changes its output, so cached features are recomputed
+FEATURE_VERSION = 1
+
+def calculate_emg_features(signal, ar_order=4, ar_method="autoreg"):
     """
     Calculates EMG features from a signal array based on the provided images.
     
     Parameters:
     signal (np.array): The input EMG time-series data.
     ar_order (int): The order P for Auto-regressive and Cepstral coefficients.
+    ar_method (str): AR estimator, one of AR_METHODS. Only "autoreg" loads statsmodels.
     
     Returns:
     dict: A dictionary containing the calculated features.
@@ -28,12 +31,17 @@ def calculate_emg_features(signal, ar_order=4):
     dasdv = np.sqrt(np.sum(np.diff(x)**2) / (N - 1))
     
     # 2.1.23 Auto-regressive Coefficients (AR)
-    # Using Burg's method or Yule-Walker to estimate coefficients a_p
-    # Note: Using a simplified linalg approach for demonstration
-    res = AutoReg(x, lags=ar_order).fit()
-    # statsmodels returns [intercept, a1, a2, ...], we take the coefficients a_p
+    # Estimated with the method named by ar_method, see AR_METHODS
     # Note: Signs may vary by convention; standard AR is xi = sum(ap * xi-p)
-    ar_coeffs = res.params[1:] 
+    if ar_method == "autoreg":
+        # statsmodels is only needed here; the batched and live paths never load it
+        from statsmodels.tsa.ar_model import AutoReg
+
+        res = AutoReg(x, lags=ar_order).fit()
+        # statsmodels returns [intercept, a1, a2, ...], we take the coefficients a_p
+        ar_coeffs = res.params[1:]
+    else:
+        ar_coeffs = ar_coefficients(x[None, :], ar_order, ar_method)[0]
     
     # 2.1.24 Cepstral Coefficients (CC)
     # Derived recursively from AR coefficients (ap)
@@ -54,6 +62,176 @@ def calculate_emg_features(signal, ar_order=4):
         "Cepstral_Coeffs": cc
     }
 
+def feature_dim(ar_order=4, n_channels=1):
+    """Length of the feature vector: WL, AAC, DASDV, AR (P), CC (P) per channel."""
+    return n_channels * (3 + 2 * ar_order)
+
+def level_to_output(level_number):
+    """
+    Training label of a level: 1 for levels 2 and 4, 0 for levels 1 and 3,
+    -1 for anything else.
+    """
+    if level_number in (2, 4):
+        return 1
+    if level_number in (1, 3):
+        return 0
+    return -1
+
+# AR estimators selectable by name (ar_method). All fit x[t] = c + sum a_p x[t-p]
+# per window and return a_1..a_P; they differ in how, and so in the numbers:
+#   autoreg     - statsmodels AutoReg, one model object per window. The reference.
+#   ols         - the same conditional least squares as autoreg, solved for all
+#                 windows at once; matches it to rounding error.
+#   yule_walker - Levinson-Durbin on the biased autocovariance of the demeaned
+#                 window. Always a stable model, but biased towards zero on short
+#                 windows (the lag-k sums have only N - k terms but are divided by N).
+#   burg        - Burg's lattice recursion on the demeaned window. Stable, and much
+#                 closer to the least-squares fit than yule_walker on short windows.
+# ols, yule_walker and burg are plain NumPy. On flat windows ols returns the
+# minimum-norm solution while yule_walker and burg return zeros.
+AR_METHODS = ("autoreg", "ols", "yule_walker", "burg")
+
+def ar_coefficients(segments, ar_order=4, method="ols"):
+    """
+    AR coefficients a_1..a_P of every window.
+    
+    Parameters:
+    segments (np.array): 2-D array of shape (n_windows, window_len).
+    ar_order (int): The order P.
+    method (str): One of AR_METHODS.
+    
+    Returns:
+    np.array: Coefficients of shape (n_windows, ar_order).
+    """
+    if method not in AR_METHODS:
+        raise ValueError(f"Unknown AR method '{method}', expected one of {AR_METHODS}")
+    x = np.asarray(segments, dtype=float)
+    if method == "autoreg":
+        from statsmodels.tsa.ar_model import AutoReg
+
+        return np.array([AutoReg(row, lags=ar_order).fit().params[1:] for row in x]).reshape(len(x), ar_order)
+    if method == "ols":
+        return _ar_ols(x, ar_order)
+    x = x - x.mean(axis=1, keepdims=True)
+    if method == "yule_walker":
+        return _ar_yule_walker(x, ar_order)
+    return _ar_burg(x, ar_order)
+
+def _safe_divide(num, den):
+    out = np.zeros_like(num)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+def _ar_ols(x, ar_order):
+    # The OLS fit AutoReg does (intercept + lags 1..P), solved for all windows
+    # at once. Row t of the design is [1, x[t-1], ..., x[t-P]].
+    n_windows, N = x.shape
+    lagged = np.lib.stride_tricks.sliding_window_view(x, ar_order + 1, axis=1)
+    design = np.empty((n_windows, N - ar_order, ar_order + 1))
+    design[:, :, 0] = 1.0
+    design[:, :, 1:] = lagged[:, :, -2::-1]
+    target = x[:, ar_order:, None]
+    # pinv keeps flat (rank-deficient) windows finite, like statsmodels' OLS
+    params = np.matmul(np.linalg.pinv(design), target)[:, :, 0]
+    return params[:, 1:]
+
+def _ar_yule_walker(x, ar_order):
+    n_windows, N = x.shape
+    # Biased autocovariance r_0..r_P, O(N * P)
+    r = np.empty((n_windows, ar_order + 1))
+    for k in range(ar_order + 1):
+        r[:, k] = np.einsum("ij,ij->i", x[:, :N - k], x[:, k:]) / N
+    # Levinson-Durbin: grow the order one step at a time, all windows together
+    a = np.zeros((n_windows, ar_order))
+    err = r[:, 0].copy()
+    for k in range(ar_order):
+        acc = r[:, k + 1] - np.sum(a[:, :k] * r[:, k:0:-1], axis=1)
+        refl = _safe_divide(acc, err)
+        if k:
+            a[:, :k] = a[:, :k] - refl[:, None] * a[:, k - 1::-1]
+        a[:, k] = refl
+        err = err * (1 - refl**2)
+    return a
+
+def _ar_burg(x, ar_order):
+    n_windows = len(x)
+    # Forward and backward prediction errors, one sample shorter every order
+    f = x[:, 1:]
+    b = x[:, :-1]
+    a = np.zeros((n_windows, ar_order))
+    for k in range(ar_order):
+        num = 2 * np.einsum("ij,ij->i", f, b)
+        den = np.einsum("ij,ij->i", f, f) + np.einsum("ij,ij->i", b, b)
+        refl = _safe_divide(num, den)
+        if k:
+            a[:, :k] = a[:, :k] - refl[:, None] * a[:, k - 1::-1]
+        a[:, k] = refl
+        f, b = (f - refl[:, None] * b)[:, 1:], (b - refl[:, None] * f)[:, :-1]
+    return a
+
+def calculate_emg_features_batch(segments, ar_order=4, ar_method="ols"):
+    """
+    Vectorized version of calculate_emg_features for many equal-length windows.
+    
+    Parameters:
+    segments (np.array): 2-D array of shape (n_windows, window_len), or 3-D
+        (n_windows, window_len, n_channels) for multi-channel windows.
+    ar_order (int): The order P for Auto-regressive and Cepstral coefficients.
+    ar_method (str): AR estimator, one of AR_METHODS.
+    
+    Returns:
+    np.array: Feature matrix of shape (n_windows, 3 + 2 * ar_order), with columns
+    ordered WL, AAC, DASDV, AR (P), CC (P) as fed to the model. Multi-channel
+    windows give (n_windows, n_channels * (3 + 2 * ar_order)): that block for
+    channel 0, then channel 1, and so on.
+    """
+    x = np.asarray(segments, dtype=float)
+    if x.ndim == 3:
+        # Every channel of every window is one row of the same batched pass
+        n_windows, N, n_channels = x.shape
+        rows = x.transpose(0, 2, 1).reshape(n_windows * n_channels, N)
+        features = calculate_emg_features_batch(rows, ar_order, ar_method)
+        return features.reshape(n_windows, n_channels * features.shape[1])
+    if x.ndim != 2:
+        raise ValueError(f"Expected a 2-D (n_windows, window_len) array, got shape {x.shape}")
+    n_windows, N = x.shape
+    if N <= ar_order + 1:
+        raise ValueError(f"Window length {N} is too short for ar_order={ar_order}")
+
+    # WL, AAC and DASDV straight from the first difference along each row
+    d = np.diff(x, axis=1)
+    wl = np.sum(np.abs(d), axis=1)
+    aac = wl / N
+    dasdv = np.sqrt(np.sum(d**2, axis=1) / (N - 1))
+
+    ar_coeffs = ar_coefficients(x, ar_order, ar_method)
+    cc = cepstral_from_ar(ar_coeffs)
+
+    return np.column_stack((wl, aac, dasdv, ar_coeffs, cc))
+
+def cepstral_from_ar(ar_coeffs):
+    """
+    Cepstral coefficients from AR coefficients, vectorized over leading axes.
+    
+    Parameters:
+    ar_coeffs (np.array): AR coefficients with the order P on the last axis.
+    
+    Returns:
+    np.array: Cepstral coefficients with the same shape as ar_coeffs.
+    """
+    a = np.asarray(ar_coeffs, dtype=float)
+    ar_order = a.shape[-1]
+    cc = np.zeros_like(a)
+    if ar_order == 0:
+        return cc
+    # Same recursion as calculate_emg_features, looping over the order only
+    cc[..., 0] = -a[..., 0]
+    for p in range(2, ar_order + 1):
+        weights = 1 - np.arange(1, p) / p
+        sum_val = np.sum(weights * a[..., :p - 1] * cc[..., p - 2::-1], axis=-1)
+        cc[..., p - 1] = -a[..., p - 1] - sum_val
+    return cc
+
 # Example Usage:
 # signal_data = np.random.normal(0, 1, 1000)
 # results = calculate_emg_features(signal_data)
@@ -85,34 +263,43 @@ if __name__ == "__main__":
         level_number = row['level_number']
         
         # Determine Output based on level_number
-        if level_number in [2, 4]:
-            output_label = 1
-        elif level_number in [1, 3]:
-            output_label = 0
-        else:
-            output_label = -1 # Or some other default/error value
+        output_label = level_to_output(level_number)
+        if output_label == -1:
             print(f"Warning: Unexpected level_number {level_number} at row {index}")
 
         # Chunk the data into 50-value segments
         segment_size = 50
-        for i in range(0, len(filtered_values), segment_size):
-            segment = filtered_values[i:i+segment_size]
-            
-            # Ensure we have enough data for a segment 
-            # assuming standard chunking.
-            if len(segment) > 0:
-                features = calculate_emg_features(segment)
-                
-                # Construct the row for the new DataFrame
-                feature_row = {
-                    "WL": features["WL"],
-                    "AAC": features["AAC"],
-                    "DASDV": features["DASDV"],
-                    "AR": features["AR_Coeffs"], # Keeping as array/list
-                    "CC": features["Cepstral_Coeffs"], # Keeping as array/list
+        n_full = len(filtered_values) // segment_size
+        
+        # Full segments go through the batched kernel in one call
+        if n_full > 0:
+            segments = np.asarray(filtered_values[:n_full * segment_size], dtype=float)
+            batch = calculate_emg_features_batch(segments.reshape(n_full, segment_size))
+            for row_features in batch:
+                extracted_features.append({
+                    "WL": row_features[0],
+                    "AAC": row_features[1],
+                    "DASDV": row_features[2],
+                    "AR": row_features[3:7], # Keeping as array/list
+                    "CC": row_features[7:11], # Keeping as array/list
                     "Output": output_label
-                }
-                extracted_features.append(feature_row)
+                })
+        
+        # A trailing partial segment still uses the per-window path
+        segment = filtered_values[n_full * segment_size:]
+        if len(segment) > 0:
+            features = calculate_emg_features(segment)
+            
+            # Construct the row for the new DataFrame
+            feature_row = {
+                "WL": features["WL"],
+                "AAC": features["AAC"],
+                "DASDV": features["DASDV"],
+                "AR": features["AR_Coeffs"], # Keeping as array/list
+                "CC": features["Cepstral_Coeffs"], # Keeping as array/list
+                "Output": output_label
+            }
+            extracted_features.append(feature_row)
 
     # Create the new DataFrame
     features_df = pd.DataFrame(extracted_features)
@@ -0,0 +1,350 @@
+# Streams Logger's raw per-sample log (emg_stream.csv, or the binary
+# emg_stream.bin) straight into feature rows, without the cleaned-CSV step.
+# Samples are read in chunks, windowed per session/level as they arrive and
+# written out after every chunk, so memory is bounded by the chunk size.
+import argparse
+import collections
+import csv
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from feature_dataset import FeatureDatasetWriter
+from feature_engineering import AR_METHODS, calculate_emg_features_batch, level_to_output
+from stream_writer import stream_segments
+
+FEATURE_COLUMNS = ["WL", "AAC", "DASDV", "AR", "CC", "Output", "session_id", "level_number"]
+
+
+def iter_stream_runs(path, chunksize=100000):
+    """
+    Yields (session_id, level_number, values) for consecutive samples of the
+    same session and level, reading at most chunksize samples at a time.
+    Reads a .bin path as a binary log and anything else as a CSV log,
+    including its rotated segments. Samples without a value are dropped.
+    """
+    for segment in stream_segments(path) or [Path(path)]:
+        if Path(segment).suffix == ".bin":
+            runs = _binary_runs(segment, chunksize)
+        else:
+            runs = _csv_runs(segment, chunksize)
+        for session_id, level_number, values in runs:
+            values = values[~np.isnan(values)]
+            if len(values):
+                yield session_id, level_number, values
+
+
+def _csv_runs(path, chunksize):
+    import pandas as pd
+
+    reader = pd.read_csv(path, usecols=["session_id", "level_number", "value"], chunksize=chunksize)
+    for chunk in reader:
+        sessions = chunk["session_id"].to_numpy()
+        levels = chunk["level_number"].to_numpy()
+        values = pd.to_numeric(chunk["value"], errors="coerce").to_numpy(dtype=float)
+        # Start of every run of rows with the same session/level
+        changes = np.flatnonzero((sessions[1:] != sessions[:-1]) | (levels[1:] != levels[:-1])) + 1
+        bounds = [0, *changes.tolist(), len(chunk)]
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            yield _scalar(sessions[start]), _scalar(levels[start]), values[start:stop]
+
+
+def _scalar(value):
+    # NumPy scalars from the chunk arrays back to plain Python values
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _binary_runs(path, chunksize):
+    from stream_log import StreamLog
+
+    log = StreamLog(path)
+    for segment, records in log.select():
+        for start in range(0, len(records), chunksize):
+            # Copy one chunk at a time out of the mapped file
+            yield segment.session_id, segment.level_number, np.array(records["value"][start:start + chunksize])
+
+
+class StreamWindower:
+    """Cuts per-key sample runs into fixed windows, carrying the remainder.
+
+    Samples fed for a key are appended to what was left over from that key's
+    previous run, so windows span chunk boundaries. Only the unfinished tail
+    (fewer than window samples) is kept between calls, or, with hop > window,
+    the number of samples still to skip before the next window starts.
+    """
+
+    def __init__(self, window=50, hop=None):
+        self.window = window
+        self.hop = hop or window
+        if self.window < 1 or self.hop < 1:
+            raise ValueError(f"window and hop must be positive, got {window} and {hop}")
+        self._tails = {}
+        self._skips = {}
+
+    def feed(self, key, values):
+        """Returns the (n, window) array of windows completed by values."""
+        values = np.asarray(values, dtype=float)
+        skip = self._skips.pop(key, 0)
+        if skip:
+            if skip > len(values):
+                self._skips[key] = skip - len(values)
+                return np.zeros((0, self.window))
+            values = values[skip:]
+        buf = np.concatenate((self._tails.pop(key, np.zeros(0)), values))
+        if len(buf) < self.window:
+            if len(buf):
+                self._tails[key] = buf
+            return np.zeros((0, self.window))
+        n = (len(buf) - self.window) // self.hop + 1
+        windows = np.lib.stride_tricks.sliding_window_view(buf, self.window)[::self.hop][:n]
+        if n * self.hop < len(buf):
+            self._tails[key] = buf[n * self.hop:].copy()
+        elif n * self.hop > len(buf):
+            self._skips[key] = n * self.hop - len(buf)
+        return windows
+
+    def flush(self, key):
+        """Drops what is left of key's samples; its next samples start a new window."""
+        self._tails.pop(key, None)
+        self._skips.pop(key, None)
+
+
+def _array_repr(values):
+    # Same '[a b c d]' layout model.load_and_preprocess_data parses
+    return "[" + " ".join(repr(float(v)) for v in values) + "]"
+
+
+class _CsvFeatureWriter:
+    """Feature rows in the emg_features.csv layout, AR/CC as '[...]' strings."""
+
+    def __init__(self, path, ar_order):
+        self.ar_order = ar_order
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(FEATURE_COLUMNS)
+
+    def append(self, features, label, session_id, level_number):
+        p = self.ar_order
+        self._writer.writerows(
+            [row[0], row[1], row[2], _array_repr(row[3:3 + p]), _array_repr(row[3 + p:]), label, session_id,
+             level_number]
+            for row in features.tolist()
+        )
+
+    def close(self):
+        self._file.close()
+
+
+def _open_feature_writer(output_path, window, hop, ar_order, ar_method):
+    if Path(output_path).suffix == ".csv":
+        return _CsvFeatureWriter(output_path, ar_order)
+    return FeatureDatasetWriter(output_path, window=window, hop=hop, ar_order=ar_order, ar_method=ar_method)
+
+
+def extract_stream_features(input_path="emg_stream.csv", output_path="emg_features.csv", window=50, hop=None,
+                            ar_order=4, chunksize=100000, ar_method="ols"):
+    """
+    Computes features for every full window of the stream log and appends
+    them to output_path as they are computed. Trailing samples that do not
+    fill a window are dropped.
+
+    A .csv output_path gets the emg_features.csv layout; any other path is
+    written as a typed feature dataset directory (see feature_dataset).
+    ar_method picks the AR estimator (see feature_engineering.AR_METHODS).
+
+    Returns:
+        dict: samples read, windows written and windows per label.
+    """
+    windower = StreamWindower(window, hop)
+    writer = _open_feature_writer(output_path, windower.window, windower.hop, ar_order, ar_method)
+    counts = {"samples": 0, "windows": 0, "labels": {}}
+    try:
+        for session_id, level_number, values in iter_stream_runs(input_path, chunksize):
+            counts["samples"] += len(values)
+            windows = windower.feed((session_id, level_number), values)
+            if not len(windows):
+                continue
+            features = calculate_emg_features_batch(windows, ar_order=ar_order, ar_method=ar_method)
+            label = level_to_output(level_number)
+            writer.append(features, label, session_id, level_number)
+            counts["windows"] += len(features)
+            counts["labels"][label] = counts["labels"].get(label, 0) + len(features)
+    finally:
+        writer.close()
+    return counts
+
+
+# One unit of parallel work: samples of a single session/level run, cut so
+# its windows line up with the ones the run would give in one piece
+Shard = collections.namedtuple("Shard", ["index", "session_id", "level_number", "values"])
+
+
+def split_shards(runs, window, hop, shard_samples):
+    """
+    Regroups (session_id, level_number, values) runs into Shards of about
+    shard_samples samples. Consecutive runs with the same session/level are
+    one contiguous recording; each shard after the first repeats the
+    window - hop samples its first window shares with the shard before, or,
+    with hop > window, starts hop - window samples after it ended.
+    """
+    index = 0
+    key, buf, skip = None, np.zeros(0), 0
+    for session_id, level_number, values in runs:
+        if (session_id, level_number) != key:
+            if len(buf) >= window:
+                yield Shard(index, *key, buf)
+                index += 1
+            key, buf, skip = (session_id, level_number), np.zeros(0), 0
+        if skip:
+            dropped = min(skip, len(values))
+            values, skip = values[dropped:], skip - dropped
+        buf = np.concatenate((buf, values))
+        if len(buf) >= max(shard_samples, window):
+            n = (len(buf) - window) // hop + 1
+            yield Shard(index, *key, buf[:(n - 1) * hop + window])
+            index += 1
+            skip = max(0, n * hop - len(buf))
+            buf = buf[n * hop:]
+    if key is not None and len(buf) >= window:
+        yield Shard(index, *key, buf)
+
+
+def _shard_features(values, window, hop, ar_order, ar_method="ols"):
+    """Worker side of the parallel mode: features of every window in values, and the seconds it took."""
+    start = time.perf_counter()
+    windows = np.lib.stride_tricks.sliding_window_view(values, window)[::hop]
+    features = calculate_emg_features_batch(windows, ar_order=ar_order, ar_method=ar_method)
+    return features, time.perf_counter() - start
+
+
+def extract_stream_features_parallel(input_path="emg_stream.csv", output_path="emg_features.csv", window=50,
+                                     hop=None, ar_order=4, chunksize=100000, workers=None, shard_samples=50000,
+                                     executor=None, cache=None, ar_method="ols"):
+    """
+    extract_stream_features spread over a process pool.
+
+    The log is cut into shards of about shard_samples samples, never mixing
+    sessions/levels, and up to 2 * workers shards are in flight at a time.
+    Results are written in log order whatever order they finish in. A shard
+    that fails is recorded in the report and skipped; the rest of the run
+    goes on. Unlike the serial mode, windows do not continue across a level
+    that was interrupted by another one and picked up again later.
+
+    Args:
+        workers: Worker processes (default: one per core).
+        executor: Optional concurrent.futures executor to use instead of a new pool.
+        cache: Optional FeatureCache. Shards whose samples and parameters
+            were extracted before are read from it instead of recomputed, so
+            re-running after new sessions were logged only costs the new ones.
+
+    Returns:
+        dict: the extract_stream_features counts plus "shards" (index,
+        session_id, level_number, samples, windows, seconds, cached for every
+        shard that finished), "errors" (index, session_id, level_number,
+        error) and, with a cache, "cache" (hits, misses, evictions, bytes).
+    """
+    hop = hop or window
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    max_pending = 2 * (workers or os.cpu_count() or 1)
+    writer = _open_feature_writer(output_path, window, hop, ar_order, ar_method)
+    report = {"samples": 0, "windows": 0, "labels": {}, "shards": [], "errors": []}
+    pending = collections.deque()
+
+    def counted(runs):
+        for run in runs:
+            report["samples"] += len(run[2])
+            yield run
+
+    def collect(shard, future, key, cached):
+        try:
+            features, seconds = future.result()
+        except Exception as e:
+            report["errors"].append({"index": shard.index, "session_id": shard.session_id,
+                                     "level_number": shard.level_number, "error": repr(e)})
+            return
+        if key is not None and not cached:
+            cache.put(key, features)
+        label = level_to_output(shard.level_number)
+        writer.append(features, label, shard.session_id, shard.level_number)
+        report["windows"] += len(features)
+        report["labels"][label] = report["labels"].get(label, 0) + len(features)
+        report["shards"].append({"index": shard.index, "session_id": shard.session_id,
+                                 "level_number": shard.level_number, "samples": len(shard.values),
+                                 "windows": len(features), "seconds": seconds, "cached": cached})
+
+    try:
+        runs = counted(iter_stream_runs(input_path, chunksize))
+        for shard in split_shards(runs, window, hop, shard_samples):
+            key = features = None
+            if cache is not None:
+                key = cache.key(shard.values, window=window, hop=hop, ar_order=ar_order, ar_method=ar_method)
+                features = cache.get(key)
+            if features is not None:
+                future = Future()
+                future.set_result((features, 0.0))
+                pending.append((shard, future, key, True))
+            else:
+                future = executor.submit(_shard_features, shard.values, window, hop, ar_order, ar_method)
+                pending.append((shard, future, key, False))
+            # Oldest first keeps the output in log order and bounds memory
+            while len(pending) >= max_pending or (pending and pending[0][1].done()):
+                collect(*pending.popleft())
+        while pending:
+            collect(*pending.popleft())
+    finally:
+        writer.close()
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+    if cache is not None:
+        report["cache"] = cache.stats()
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract EMG features from a raw stream log.")
+    parser.add_argument("input", nargs="?", default="emg_stream.csv", help="emg_stream.csv or emg_stream.bin")
+    parser.add_argument("--output", default="emg_features.csv",
+                        help="A .csv file, or a directory for the typed .npz feature dataset.")
+    parser.add_argument("--window", type=int, default=50, help="Samples per feature window.")
+    parser.add_argument("--hop", type=int, default=None, help="Samples between windows (default: window).")
+    parser.add_argument("--ar-order", type=int, default=4)
+    parser.add_argument("--ar-method", choices=AR_METHODS, default="ols",
+                        help="AR estimator; yule_walker and burg are faster, autoreg is the statsmodels reference.")
+    parser.add_argument("--chunksize", type=int, default=100000, help="Samples read per chunk.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; 0 uses every core, 1 runs in this process.")
+    parser.add_argument("--shard-samples", type=int, default=50000, help="Samples per parallel work unit.")
+    parser.add_argument("--cache", default=None, help="Feature cache directory; unchanged shards are not recomputed.")
+    parser.add_argument("--cache-size", type=float, default=1024, help="Feature cache size limit in MB.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.workers == 1 and args.cache is None:
+        counts = extract_stream_features(args.input, args.output, window=args.window, hop=args.hop,
+                                         ar_order=args.ar_order, chunksize=args.chunksize, ar_method=args.ar_method)
+    else:
+        cache = None
+        if args.cache is not None:
+            from feature_cache import FeatureCache
+
+            cache = FeatureCache(args.cache, max_bytes=int(args.cache_size * 1024 * 1024))
+        counts = extract_stream_features_parallel(args.input, args.output, window=args.window, hop=args.hop,
+                                                  ar_order=args.ar_order, chunksize=args.chunksize,
+                                                  workers=args.workers or None, shard_samples=args.shard_samples,
+                                                  cache=cache, ar_method=args.ar_method)
+        if cache is not None:
+            print(f"Cache: {counts['cache']}")
+        for shard in counts["shards"]:
+            print(f"  shard {shard['index']:>5} {shard['session_id']}/{shard['level_number']}: "
+                  f"{shard['windows']} windows in {shard['seconds'] * 1000:.1f} ms")
+        for error in counts["errors"]:
+            print(f"  shard {error['index']:>5} {error['session_id']}/{error['level_number']} failed: {error['error']}")
+    print(f"{counts['windows']} windows from {counts['samples']} samples, labels {counts['labels']}")
+    print(f"Features saved to {args.output}")
@@ -0,0 +1,151 @@
+import numpy as np
+
+from feature_engineering import cepstral_from_ar
+
+# The running normal equations are the least-squares fit of "ols" and
+# "autoreg"; yule_walker and burg have no O(1) update and need the batch path
+AR_METHODS = ("autoreg", "ols")
+
+
+class SlidingFeatureEngine:
+    """Sliding-window EMG features updated in O(1) per sample.
+
+    Keeps running sums of |diff| and diff^2 for WL/AAC/DASDV, and the normal
+    equations (X'X, X'y) of AutoReg's intercept + lags OLS fit, adding the
+    newest row and removing the row that leaves the window on every push.
+    The running sums are rebuilt from the window every `refresh_every` samples
+    so floating point drift cannot build up over long sessions.
+
+    With n_channels > 1 every sample is a row of one value per channel and
+    all the sums carry a channel axis, so each push updates every channel at
+    once.
+
+    features() returns the same vector layout as calculate_emg_features_batch:
+    WL, AAC, DASDV, AR (P), CC (P), one such block per channel.
+    """
+
+    def __init__(self, window=50, ar_order=4, refresh_every=None, n_channels=1, ar_method="ols"):
+        if ar_method not in AR_METHODS:
+            raise ValueError(f"SlidingFeatureEngine supports ar_method {AR_METHODS}, not '{ar_method}'")
+        if window <= ar_order + 1:
+            raise ValueError(f"Window length {window} is too short for ar_order={ar_order}")
+        self.window = window
+        self.ar_order = ar_order
+        self.n_channels = n_channels
+        self.refresh_every = refresh_every or window
+        # lstsq's default cutoff, so flat windows solve the same way with pinv
+        self._rcond = np.finfo(float).eps * (ar_order + 1)
+        self.reset()
+
+    def reset(self):
+        C = self.n_channels
+        # Channel-first and written twice (slot and slot + window, as in
+        # SampleRing), so the window and every lag row are plain slices
+        self._buf = np.zeros((C, 2 * self.window))
+        self._row = np.ones((C, self.ar_order + 1))
+        self._start = 0
+        self._size = 0
+        self._since_refresh = 0
+        self._abs_sum = np.zeros(C)
+        self._sq_sum = np.zeros(C)
+        self._xtx = np.zeros((C, self.ar_order + 1, self.ar_order + 1))
+        self._xty = np.zeros((C, self.ar_order + 1))
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def ready(self):
+        return self._size == self.window
+
+    def _at(self, i):
+        # i-th sample of the window, 0 being the oldest
+        return self._buf[:, self._start + i]
+
+    def _lag_row(self, target_pos):
+        # [1, x[t-1], ..., x[t-P]] per channel for the sample at window position target_pos
+        end = self._start + target_pos
+        row = self._row
+        row[:, 1:] = self._buf[:, end - self.ar_order:end][:, ::-1]
+        return row
+
+    def push(self, value):
+        """Add one sample (one value per channel), dropping the oldest one once the window is full."""
+        value = np.asarray(value, dtype=float).reshape(self.n_channels)
+        p = self.ar_order
+
+        if self._size == self.window:
+            # Remove the first difference and the first AR row of the window
+            d = self._at(1) - self._at(0)
+            self._abs_sum -= np.abs(d)
+            self._sq_sum -= d * d
+            row = self._lag_row(p)
+            self._xtx -= row[:, :, None] * row[:, None, :]
+            self._xty -= row * self._at(p)[:, None]
+            self._start = (self._start + 1) % self.window
+            self._size -= 1
+
+        if self._size > 0:
+            d = value - self._at(self._size - 1)
+            self._abs_sum += np.abs(d)
+            self._sq_sum += d * d
+        if self._size >= p:
+            row = self._lag_row(self._size)
+            self._xtx += row[:, :, None] * row[:, None, :]
+            self._xty += row * value[:, None]
+
+        slot = (self._start + self._size) % self.window
+        self._buf[:, slot] = value
+        self._buf[:, slot + self.window] = value
+        self._size += 1
+
+        self._since_refresh += 1
+        if self.ready and self._since_refresh >= self.refresh_every:
+            self.refresh()
+
+    def extend(self, values):
+        for value in values:
+            self.push(value)
+
+    def window_values(self):
+        """
+        Copy of the current window, oldest sample first: (size,) for one
+        channel, (size, n_channels) otherwise.
+        """
+        values = self._buf[:, self._start:self._start + self._size].copy()
+        return values[0] if self.n_channels == 1 else values.T
+
+    def refresh(self):
+        """Rebuild the running sums from the samples currently in the window."""
+        x = self._buf[:, self._start:self._start + self._size]
+        p = self.ar_order
+        d = np.diff(x, axis=1)
+        self._abs_sum = np.sum(np.abs(d), axis=1)
+        self._sq_sum = np.sum(d**2, axis=1)
+        if x.shape[1] > p:
+            lagged = np.lib.stride_tricks.sliding_window_view(x, p + 1, axis=1)
+            design = np.empty((self.n_channels, x.shape[1] - p, p + 1))
+            design[:, :, 0] = 1.0
+            design[:, :, 1:] = lagged[:, :, -2::-1]
+            self._xtx = np.matmul(design.transpose(0, 2, 1), design)
+            self._xty = np.einsum("cti,ct->ci", design, x[:, p:])
+        self._since_refresh = 0
+
+    def features(self):
+        """Feature vector for the current window, or None until it is full."""
+        if not self.ready:
+            return None
+        N = self.window
+        wl = self._abs_sum
+        aac = wl / N
+        dasdv = np.sqrt(np.maximum(self._sq_sum, 0.0) / (N - 1))
+        # Minimum-norm solution of every channel's normal equations, as pinv
+        # gives in the batch code on flat windows. lstsq is quicker for one
+        # system; pinv with lstsq's cutoff solves all channels in one call.
+        if self.n_channels == 1:
+            params = np.linalg.lstsq(self._xtx[0], self._xty[0], rcond=None)[0][None, :]
+        else:
+            params = np.matmul(np.linalg.pinv(self._xtx, rcond=self._rcond), self._xty[:, :, None])[:, :, 0]
+        ar_coeffs = params[:, 1:]
+        cc = cepstral_from_ar(ar_coeffs)
+        return np.column_stack((wl, aac, dasdv, ar_coeffs, cc)).ravel()
@@ -0,0 +1,140 @@
+import numpy as np
+
+def _softmax(z):
+    e = np.exp(z - z.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+# Activations supported by the NumPy forward pass, keyed by Keras name
+_ACTIVATIONS = {
+    "linear": lambda z: z,
+    "relu": lambda z: np.maximum(z, 0.0),
+    "sigmoid": lambda z: 1.0 / (1.0 + np.exp(-z)),
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+# Layers that are the identity at inference time
+_PASSTHROUGH_LAYERS = ("InputLayer", "Dropout", "Flatten")
+
+
+class NumpyModel:
+    """Dense network forward pass in plain NumPy.
+
+    Mirrors the part of the Keras model API the rest of the code uses:
+    predict(X) returns an (n_samples, n_outputs) array of probabilities.
+    ar_method is the AR estimator of the features it was trained on, or
+    None if that was not recorded.
+    """
+
+    def __init__(self, kernels, biases, activations, ar_method=None):
+        if not (len(kernels) == len(biases) == len(activations)):
+            raise ValueError("kernels, biases and activations must have the same length")
+        for name in activations:
+            if name not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation '{name}'")
+        self.kernels = [np.asarray(k, dtype=np.float64) for k in kernels]
+        self.biases = [np.asarray(b, dtype=np.float64) for b in biases]
+        self.activations = list(activations)
+        self._funcs = [_ACTIVATIONS[name] for name in self.activations]
+        self.ar_method = ar_method
+
+    @property
+    def input_dim(self):
+        return self.kernels[0].shape[0]
+
+    def predict(self, X, verbose=0, batch_size=None):
+        # verbose/batch_size are accepted for drop-in compatibility with Keras
+        out = np.asarray(X, dtype=np.float64)
+        if out.ndim == 1:
+            out = out.reshape(1, -1)
+        for kernel, bias, func in zip(self.kernels, self.biases, self._funcs):
+            out = func(out @ kernel + bias)
+        return out
+
+
+def export_model(model, filepath='bg_model.npz', ar_method=None):
+    """
+    Exports the Dense layers of a Keras model (or a saved .h5 model path) to a
+    compact .npz weights file readable by load_numpy_model. ar_method records
+    the AR estimator of the training features, so the live path can refuse
+    features computed another way.
+    """
+    if isinstance(model, str):
+        from tensorflow.keras.models import load_model as load_keras_model
+        model = load_keras_model(model)
+
+    arrays = {}
+    activations = []
+    for layer in model.layers:
+        kind = layer.__class__.__name__
+        if kind in _PASSTHROUGH_LAYERS:
+            continue
+        if kind != "Dense":
+            raise ValueError(f"Cannot export layer '{layer.name}' of type {kind}")
+        weights = layer.get_weights()
+        kernel = weights[0]
+        bias = weights[1] if len(weights) > 1 else np.zeros(kernel.shape[1], dtype=kernel.dtype)
+        index = len(activations)
+        arrays[f"kernel_{index}"] = kernel
+        arrays[f"bias_{index}"] = bias
+        activations.append(layer.get_config()["activation"])
+
+    if ar_method is not None:
+        arrays["ar_method"] = np.array(ar_method)
+    np.savez(filepath, activations=np.array(activations), **arrays)
+    print(f"Model weights exported to {filepath}")
+    return filepath
+
+
+def load_numpy_model(filepath='bg_model.npz'):
+    """
+    Loads a weights file written by export_model into a NumpyModel.
+    """
+    with np.load(filepath, allow_pickle=False) as data:
+        activations = [str(a) for a in data["activations"]]
+        kernels = [data[f"kernel_{i}"] for i in range(len(activations))]
+        biases = [data[f"bias_{i}"] for i in range(len(activations))]
+        ar_method = str(data["ar_method"]) if "ar_method" in data.files else None
+    return NumpyModel(kernels, biases, activations, ar_method=ar_method)
+
+
+def load_model(filepath='bg_model.npz'):
+    """
+    Loads an exported .npz model with the NumPy runtime. Any other path is
+    handed to Keras, which is only imported in that case.
+    """
+    if str(filepath).endswith(".npz"):
+        return load_numpy_model(filepath)
+    from tensorflow.keras.models import load_model as load_keras_model
+    return load_keras_model(filepath)
+
+
+def predict_proba(model, X):
+    """
+    Returns the positive-class probability for every row of X as a 1-D array.
+    """
+    if isinstance(model, NumpyModel):
+        return model.predict(X)[:, 0]
+    return np.asarray(model.predict(X, verbose=0))[:, 0]
+
+
+def predict(model, X):
+    # Same contract as model.predict: thresholded decision for the first row
+    value = predict_proba(model, X)[0]
+    return (value > 0.5)
+
+
+def predict_batch(model, X, threshold=0.5):
+    """
+    Returns a boolean decision for every row of X.
+    """
+    return predict_proba(model, X) > threshold
+
+
+if __name__ == "__main__":
+    import sys
+
+    source = sys.argv[1] if len(sys.argv) > 1 else 'bg_model.h5'
+    target = sys.argv[2] if len(sys.argv) > 2 else 'bg_model.npz'
+    ar_method = sys.argv[3] if len(sys.argv) > 3 else None
+    export_model(source, target, ar_method=ar_method)
@@ -0,0 +1,253 @@
+# Entry point for a live EMG session. Only the light modules (serial reader,
+# logger, constants) are imported up front so acquisition and logging start
+# straight away; NumPy, the feature code and the inference runtime load on a
+# background thread while samples queue up.
+import argparse
+import importlib
+import queue
+import threading
+import time
+
+from activity_gate import ActivityGate
+from constants import LOGGING_INTERVAL
+from emg import EMGReader
+from logger import Logger
+from metrics import METRICS, MetricsDumper
+from prediction_bridge import PredictionPublisher, parse_address
+
+# Same as feature_engineering.AR_METHODS, which cannot be imported before NumPy
+AR_METHODS = ("autoreg", "ols", "yule_walker", "burg")
+
+# Modules only the processing side needs, imported in this order in the background
+HEAVY_MODULES = ("numpy", "feature_engineering", "incremental_features", "inference", "livestream")
+
+
+class BackgroundImporter:
+    """Imports a list of modules on a daemon thread and times each one.
+
+    Timings are incremental: a module's entry only covers what was not
+    already imported by the modules before it.
+    """
+
+    def __init__(self, module_names=HEAVY_MODULES):
+        self.module_names = tuple(module_names)
+        self.timings = {}
+        self.modules = {}
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        for name in self.module_names:
+            start = time.perf_counter()
+            try:
+                self.modules[name] = importlib.import_module(name)
+            except Exception as e:
+                self.error = e
+                return
+            finally:
+                self.timings[name] = time.perf_counter() - start
+
+    def wait(self, timeout=None):
+        """Blocks until every module is imported and returns them by name."""
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise TimeoutError("Background imports did not finish in time")
+        if self.error is not None:
+            raise self.error
+        return self.modules
+
+
+def iter_queue_chunks(samples, stop_event, poll=0.1):
+    """
+    Yields lists holding everything queued since the last call, blocking
+    until at least one sample is available. Ends once stop_event is set and
+    the queue has been drained.
+    """
+    while True:
+        try:
+            chunk = [samples.get(timeout=poll)]
+        except queue.Empty:
+            if stop_event.is_set():
+                return
+            continue
+        while True:
+            try:
+                chunk.append(samples.get_nowait())
+            except queue.Empty:
+                break
+        yield chunk
+
+
+def format_startup_report(timings, marks):
+    """
+    Formats per-import timings and startup milestones as a table.
+
+    Args:
+        timings: Mapping of module name to import seconds.
+        marks: Mapping of milestone name to seconds since process start.
+    """
+    lines = ["Startup report", "  imports:"]
+    for name, seconds in timings.items():
+        lines.append(f"    {name:<24}{seconds * 1000:8.1f} ms")
+    lines.append(f"    {'total':<24}{sum(timings.values()) * 1000:8.1f} ms")
+    lines.append("  milestones:")
+    for name, seconds in marks.items():
+        lines.append(f"    {name:<24}{seconds * 1000:8.1f} ms")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a live EMG session with real-time predictions.")
+    parser.add_argument("--port", default="COM6", help="Serial port of the EMG board.")
+    parser.add_argument("--baud", type=int, default=115200, help="Serial baud rate.")
+    parser.add_argument("--model", default="bg_model.npz", help="Model file (.npz for the NumPy runtime).")
+    parser.add_argument("--window", type=int, default=50, help="Samples per feature window.")
+    parser.add_argument("--hop", type=int, default=1, help="Samples between decisions.")
+    parser.add_argument("--interval", type=float, default=LOGGING_INTERVAL, help="Seconds between logged samples.")
+    parser.add_argument("--pacing", choices=("skip", "burst", "timestamp"), default="skip",
+                        help="How the logger handles missed sample deadlines.")
+    parser.add_argument("--source", choices=("logger", "reader"), default="logger",
+                        help="Feed the model from the logger's polled values, or every sample "
+                             "straight from the reader's ring buffer.")
+    parser.add_argument("--buffer-size", type=int, default=10000, help="Ring buffer capacity for --source reader.")
+    parser.add_argument("--channels", type=int, default=1,
+                        help="Electrodes per serial line (filtered,envelope pairs). More than one needs --source "
+                             "reader; the stream log records channel 0.")
+    parser.add_argument("--log-path", default="livestream_data", help="Path the stream log is written next to.")
+    parser.add_argument("--stream-format", choices=("csv", "binary"), default="csv",
+                        help="Stream log backend: emg_stream.csv or the memory-mappable emg_stream.bin.")
+    parser.add_argument("--session-id", default="live_session")
+    parser.add_argument("--level", type=int, default=1, help="Level number recorded in the stream log.")
+    parser.add_argument("--full-recompute", action="store_true",
+                        help="Recompute features from the whole window instead of incrementally.")
+    parser.add_argument("--ar-method", choices=AR_METHODS, default=None,
+                        help="AR estimator of the features (default: the one the model was exported with). "
+                             "yule_walker and burg need --full-recompute.")
+    parser.add_argument("--startup-report", action="store_true", help="Print per-import startup timings.")
+    parser.add_argument("--publish", default=None, metavar="HOST:PORT",
+                        help="Send every decision to the game as a UDP message (e.g. 127.0.0.1:5005) "
+                             "instead of printing it.")
+    parser.add_argument("--gate", action="store_true",
+                        help="Skip features and inference while the muscle is at rest and repeat the rest decision.")
+    parser.add_argument("--gate-on", type=float, default=4.0,
+                        help="Gate opens this many noise spreads above the resting baseline.")
+    parser.add_argument("--gate-off", type=float, default=2.0,
+                        help="Gate closes once the envelope stays below this many spreads.")
+    parser.add_argument("--gate-hold", type=int, default=50, help="Samples below --gate-off before the gate closes.")
+    parser.add_argument("--metrics", default=None,
+                        help="Time every pipeline stage and append p50/p95/p99 snapshots to this JSONL file.")
+    parser.add_argument("--metrics-interval", type=float, default=5.0, help="Seconds between metrics snapshots.")
+    parser.add_argument("--metrics-control", default=None,
+                        help="File read before every snapshot; writing 'on' or 'off' to it toggles timing live.")
+    args = parser.parse_args(argv)
+    if args.channels > 1 and args.source != "reader":
+        parser.error("--channels above 1 needs --source reader")
+    if args.ar_method in ("yule_walker", "burg") and not args.full_recompute:
+        parser.error(f"--ar-method {args.ar_method} needs --full-recompute")
+    if args.gate and args.gate_off > args.gate_on:
+        parser.error("--gate-off must not be above --gate-on")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    marks = {}
+
+    importer = BackgroundImporter().start()
+
+    dumper = None
+    if args.metrics:
+        METRICS.enable()
+        dumper = MetricsDumper(args.metrics, args.metrics_interval, control_path=args.metrics_control).start()
+
+    if args.source == "reader":
+        emg = EMGReader(port=args.port, baud=args.baud, bulk=True, buffer_size=args.buffer_size,
+                        n_channels=args.channels)
+    else:
+        emg = EMGReader(port=args.port, baud=args.baud)
+    marks["serial opened"] = time.perf_counter() - started
+
+    logger = Logger(args.log_path, stream_format=args.stream_format)
+    publisher = PredictionPublisher(parse_address(args.publish)) if args.publish else None
+    gate = ActivityGate(on_factor=args.gate_on, off_factor=args.gate_off, hold=args.gate_hold) if args.gate else None
+    stop_event = threading.Event()
+    pump_thread = None
+
+    # Acquisition and logging run from here on, independent of the imports
+    if args.source == "reader":
+        # Sample-accurate windows straight from the ring buffer, starting at the
+        # first sample; logging runs on its own thread
+        logger.start_stream(args.session_id, args.level, lambda: emg.envelope, policy=args.pacing)
+        data_stream = emg.chunks(column=emg.envelope_columns, cursor=0)
+    else:
+        stream = logger.live_stream_generator(
+            session_id=args.session_id,
+            level_number=args.level,
+            get_value_callable=lambda: emg.envelope,
+            interval=args.interval,
+            policy=args.pacing,
+        )
+        samples = queue.Queue()
+
+        def pump():
+            try:
+                for value in stream:
+                    if stop_event.is_set():
+                        break
+                    samples.put(value)
+            finally:
+                # Closing the generator writes out the queued log rows
+                stream.close()
+
+        pump_thread = threading.Thread(target=pump, daemon=True)
+        pump_thread.start()
+        data_stream = iter_queue_chunks(samples, stop_event)
+    marks["logging started"] = time.perf_counter() - started
+
+    print("Starting Live Stream...")
+    try:
+        modules = importer.wait()
+        marks["processing ready"] = time.perf_counter() - started
+        if args.startup_report:
+            print(format_startup_report(importer.timings, marks))
+
+        modules["livestream"].process_livestream(
+            data_stream,
+            incremental=not args.full_recompute,
+            model_path=args.model,
+            window=args.window,
+            hop=args.hop,
+            n_channels=args.channels,
+            on_decision=publisher.publish if publisher is not None else None,
+            gate=gate,
+            ar_method=args.ar_method,
+        )
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        stop_event.set()
+        if pump_thread is not None:
+            pump_thread.join(timeout=2.0)
+        logger.stop_stream()
+        emg.stop()
+        if logger.pacing is not None:
+            print(f"Pacing: {logger.pacing.summary()}")
+        if logger.stream_writer is not None:
+            print(f"Stream writer: {logger.stream_writer.stats()}")
+        if publisher is not None:
+            publisher.close()
+            print(f"Publisher: {publisher.stats()}")
+        if gate is not None:
+            print(f"Activity gate: {gate.stats()}")
+        if dumper is not None:
+            dumper.stop()
+            print(METRICS.format())
+
+
+if __name__ == "__main__":
+    main()
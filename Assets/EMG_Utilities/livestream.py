@@ -1,111 +1,229 @@
 import collections
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import load_model, Sequential
-from tensorflow.keras.layers import Dense, Conv1D, MaxPooling1D, Flatten, LSTM
 import time
-import random
 
 # Import local modules
-from feature_engineering import calculate_emg_features
-from model import predict
-from emg import *
+from feature_engineering import calculate_emg_features_batch, feature_dim
+from incremental_features import AR_METHODS as INCREMENTAL_AR_METHODS, SlidingFeatureEngine
+from inference import load_model, predict_proba
+from metrics import METRICS
 
-def process_livestream(data_stream):
+# "autoreg" and "ols" are the same least-squares AR fit
+_SAME_AR_FIT = {"autoreg": "ols"}
+
+# One model output, stamped with the wall-clock time it was produced and the
+# index (1-based) of the last sample in the window it was computed from.
+Decision = collections.namedtuple("Decision", ["timestamp", "sample_index", "probability", "prediction"])
+
+def livestream_decisions(data_stream, model, window=50, hop=1, incremental=False, threshold=0.5, n_channels=1,
+                         gate=None, ar_method="ols"):
+    """
+    Turns a stream of samples into a stream of timestamped decisions.
+    
+    Args:
+        data_stream: An iterable that yields samples (numbers), or chunks
+            (lists/arrays) of samples when the source delivers several at once.
+        model: Loaded model passed to predict_proba.
+        window: Number of samples per feature window.
+        hop: Samples between consecutive decisions once the window is full.
+        incremental: Update the features per sample with SlidingFeatureEngine
+            instead of recomputing them from the whole buffer.
+        threshold: Probability above which the prediction is positive.
+        n_channels: Values per sample. With more than one, every sample is a
+            row of one value per channel (chunks are (n, n_channels) arrays)
+            and the model gets every channel's features side by side.
+        gate: Optional ActivityGate fed every sample (the sum over channels).
+            Once it has reported rest for a whole window, so the window holds
+            no contraction samples, that window is predicted as usual and its
+            decision is repeated for the following ones without computing
+            features or calling the model; the incremental engine stops too
+            and catches up on the last window when activity starts.
+            gate.computed_windows / gate.skipped_windows count the work.
+        ar_method: AR estimator the model was trained with (see
+            feature_engineering.AR_METHODS). The incremental engine only
+            supports INCREMENTAL_AR_METHODS.
+    
+    Yields:
+        Decision tuples. All windows that fall due within one item of the
+        stream are predicted together in one batched model call.
+    """
+    if hop < 1:
+        raise ValueError(f"hop must be at least 1, got {hop}")
+
+    buffer = collections.deque(maxlen=window)
+    engine = SlidingFeatureEngine(window=window, n_channels=n_channels, ar_method=ar_method) if incremental else None
+    sample_index = 0
+    # Cached rest probability, or the position of the window computing it in this chunk
+    rest = None
+    rest_pos = None
+    # The engine stopped following the stream while at rest
+    stale = False
+    # Samples since the gate closed
+    quiet = 0
+
+    for item in data_stream:
+        if n_channels > 1:
+            # Copied, since a chunk may be a view into the reader's ring
+            samples = np.array(item, dtype=float).reshape(-1, n_channels)
+        else:
+            samples = item if hasattr(item, "__len__") else (item,)
+        due = []
+        pending = []
+
+        for value in samples:
+            sample_index += 1
+            live = active = True
+            if gate is not None:
+                active = gate.update(value if n_channels == 1 else value.sum())
+                quiet = 0 if active else quiet + 1
+                if active:
+                    rest = rest_pos = None
+                live = active or (rest is None and rest_pos is None)
+
+            if engine is not None:
+                if gate is not None:
+                    buffer.append(value)
+                if not live:
+                    stale = True
+                elif stale:
+                    # Catch up on the window that went by at rest
+                    engine.reset()
+                    engine.extend(buffer)
+                    stale = False
+                else:
+                    # Running sums are updated in place, no copy of the window
+                    engine.push(value)
+            else:
+                buffer.append(value)
+
+            if sample_index < window or (sample_index - window) % hop != 0:
+                continue
+
+            if not live:
+                gate.skipped_windows += 1
+                due.append((sample_index, rest_pos, rest))
+                continue
+            if gate is not None:
+                gate.computed_windows += 1
+                if quiet >= window:
+                    # First window of nothing but rest: computed once, then
+                    # reused. Earlier ones can still hold the contraction's tail.
+                    rest_pos = len(pending)
+            due.append((sample_index, len(pending), None))
+            if engine is not None:
+                # AR is only solved for windows that are actually due
+                t0 = METRICS.start()
+                pending.append(engine.features())
+                METRICS.record("features", t0)
+            else:
+                t0 = METRICS.start()
+                pending.append(list(buffer))
+                METRICS.record("buffer_copy", t0)
+
+        if not due:
+            continue
+
+        probabilities = ()
+        if pending:
+            # Stack every due window and run features + model once for all of them
+            if engine is not None:
+                input_data = np.vstack(pending)
+            else:
+                t0 = METRICS.start()
+                windows = np.vstack(pending)
+                if n_channels > 1:
+                    windows = windows.reshape(len(pending), window, n_channels)
+                METRICS.record("buffer_copy", t0)
+                t0 = METRICS.start()
+                input_data = calculate_emg_features_batch(windows, ar_method=ar_method)
+                METRICS.record("features", t0)
+            t0 = METRICS.start()
+            probabilities = predict_proba(model, input_data)
+            METRICS.record("predict", t0)
+            if rest_pos is not None:
+                rest, rest_pos = float(probabilities[rest_pos]), None
+
+        timestamp = time.time()
+        for index, pos, cached in due:
+            probability = probabilities[pos] if pos is not None else cached
+            yield Decision(timestamp, index, float(probability), bool(probability > threshold))
+
+def resolve_ar_method(model, ar_method=None, incremental=False):
+    """
+    AR estimator to build the model's features with: ar_method, or the one
+    the model was exported with when it is None ("ols" if it records none).
+    Raises ValueError when the model was trained on another estimator, or
+    when the incremental engine cannot compute it.
+    """
+    trained_with = getattr(model, "ar_method", None)
+    if ar_method is None:
+        ar_method = trained_with or "ols"
+    elif trained_with is not None and _SAME_AR_FIT.get(ar_method, ar_method) != _SAME_AR_FIT.get(trained_with,
+                                                                                                  trained_with):
+        raise ValueError(f"model was trained on {trained_with} AR features, not {ar_method}")
+    if incremental and ar_method not in INCREMENTAL_AR_METHODS:
+        raise ValueError(f"incremental features support ar_method {INCREMENTAL_AR_METHODS}, not '{ar_method}'; "
+                         "use the full recompute")
+    return ar_method
+
+
+def process_livestream(data_stream, incremental=False, model_path='bg_model.npz', window=50, hop=1, on_decision=None,
+                       n_channels=1, gate=None, ar_method=None):
     """
     Simulates processing a live stream of data.
     
     Args:
-        data_stream: An iterable that yields data points (numbers).
+        data_stream: An iterable that yields data points (numbers), or chunks of them.
+        incremental: Update the features per sample with SlidingFeatureEngine
+            instead of recomputing them from the whole buffer.
+        model_path: Model to load. Exported .npz weights run on the NumPy
+            runtime; a Keras .h5 path still works but pulls in TensorFlow.
+        window: Number of samples per feature window.
+        hop: Samples between decisions; 1 predicts on every new sample.
+        on_decision: Optional callable receiving each Decision. Decisions are
+            printed when it is not given.
+        n_channels: Channels per sample; the model must take feature_dim(n_channels=n_channels) inputs.
+        gate: Optional ActivityGate; quiescent windows get the cached rest
+            decision instead of features and inference.
+        ar_method: AR estimator for the features. None uses the one the
+            model was exported with ("ols" if it records none); a model
+            trained on another estimator is refused.
     """
     
     # Load the model
-    # Note: Ensure bg_model.h5 exists. 
+    # Note: Ensure bg_model.npz exists (python inference.py exports it from bg_model.h5).
     try:
-        model = load_model('bg_model.h5')
+        model = load_model(model_path)
         print("Model loaded successfully.")
     except Exception as e:
         print(f"Error loading model: {e}")
         return
+    expected = feature_dim(n_channels=n_channels)
+    if getattr(model, "input_dim", expected) != expected:
+        print(f"Error: model takes {model.input_dim} inputs, {n_channels} channel(s) give {expected}")
+        return
+    try:
+        ar_method = resolve_ar_method(model, ar_method, incremental)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
 
-    # Initialize a queue with a maximum length of 50
-    buffer = collections.deque(maxlen=50)
-    
-    print("Starting livestream processing...")
+    print(f"Starting livestream processing (window={window}, hop={hop}, ar_method={ar_method})...")
     
-    for value in data_stream:
-        # Add new value to the buffer
-        buffer.append(value)
-        
-        # Check if we have enough data
-        if len(buffer) == 50:
-            # Convert buffer to list/array for feature calculation
-            segment = list(buffer)
-            
-            # Calculate features
-            # calculate_emg_features returns a dict with 'WL', 'AAC', 'DASDV', 'AR_Coeffs', 'Cepstral_Coeffs'
-            features = calculate_emg_features(segment)
-            
-            # Flatten features to match model input (1, 11)
-            # Order: WL, AAC, DASDV, AR (4), CC (4)
-            
-            wl = features['WL']
-            aac = features['AAC']
-            dasdv = features['DASDV']
-            ar = features['AR_Coeffs']
-            cc = features['Cepstral_Coeffs']
-            
-            # Ensure AR and CC are arrays/lists of length 4
-            # (calculate_emg_features handles this, but good to be safe if dynamic)
-            
-            # Construct the feature vector
-            feature_vector = np.concatenate(([wl, aac, dasdv], ar, cc))
-            
-            # Reshape for model input: (1, 11)
-            input_data = feature_vector.reshape(1, -1)
-            
-            # Predict
-            # Using the imported predict wrapper which handles the thresholding
-            prediction = predict(model, input_data)
-            
-            print(f"Input: {value:.2f} | Buffer Full | Prediction: {prediction}")
+    # Processing is driven by the generator's speed
+    for decision in livestream_decisions(data_stream, model, window=window, hop=hop, incremental=incremental,
+                                         n_channels=n_channels, gate=gate, ar_method=ar_method):
+        if on_decision is not None:
+            on_decision(decision)
         else:
-            print(f"Input: {value:.2f} | Buffer Filling: {len(buffer)}/50")
-            
-        # Processing is driven by the generator's speed
-        # time.sleep(0.05) # Removed to avoid double waiting
+            print(
+                f"{decision.timestamp:.3f} | Sample {decision.sample_index} | "
+                f"p={decision.probability:.3f} | Prediction: {decision.prediction}"
+            )
 
 if __name__ == "__main__":
-    from logger import Logger
-    from constants import LOGGING_INTERVAL
+    # The live session entry point lives in live_session.py, which starts
+    # acquisition before the processing modules have finished importing.
+    from live_session import main
 
-    emg = EMGReader()
-    # Give it a moment to connect
-    time.sleep(2) 
-    
-    # Setup logger
-    # Assuming current directory or a 'logs' directory
-    # The logger uses the path to determine where to put emg_stream.csv. 
-    # ensuring 'logs' dir exists might be good, or just use current dir.
-    logger = Logger("livestream_data") 
-    
-    print("Starting Live Stream...")
-    try:
-        # Create the generator
-        # We need a callable for the value. emg.envelope is a property/variable.
-        # We need to capture the current value at the time of call.
-        get_val = lambda: emg.envelope
-        
-        stream = logger.live_stream_generator(
-            session_id="live_session",
-            level_number=1,
-            get_value_callable=get_val,
-            interval=LOGGING_INTERVAL
-        )
-        
-        process_livestream(stream)
-        
-    except KeyboardInterrupt:
-        print("\nStopping...")
-    finally:
-        emg.stop()
+    main()
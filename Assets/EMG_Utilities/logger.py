@@ -1,19 +1,45 @@
 import csv
 import threading
-import time
 from pathlib import Path
 from constants import LOGGING_INTERVAL
+from metrics import METRICS
+from pacing import DeadlineScheduler
+from stream_writer import BinaryStreamWriter, StreamWriter
+
+
+STREAM_HEADER = ["timestamp", "session_id", "level_number", "value"]
+
+# Stream log backends: file name and writer class
+STREAM_FORMATS = {
+    "csv": ("emg_stream.csv", StreamWriter),
+    "binary": ("emg_stream.bin", BinaryStreamWriter),
+}
 
 
 class Logger:
-    def __init__(self, path):
+    def __init__(self, path, stream_options=None, stream_format="csv"):
+        """
+        stream_options: extra StreamWriter arguments for the stream log, e.g.
+            flush_rows / flush_bytes / flush_interval to bound how much is held
+            in memory, rotate_bytes / rotate_seconds to roll emg_stream.csv
+            over into numbered segments.
+        stream_format: "csv" for emg_stream.csv, or "binary" for the
+            fixed-width emg_stream.bin log that stream_log.StreamLog maps.
+        """
+        if stream_format not in STREAM_FORMATS:
+            raise ValueError(f"Unknown stream format '{stream_format}', expected one of {tuple(STREAM_FORMATS)}")
         self.path = Path(path)
         self.error = ""
+        self.stream_options = dict(stream_options or {})
+        self.stream_format = stream_format
         # stream logging state
         self._stream_thread = None
         self._stream_stop = None
-        self._stream_path = self.path.with_name("emg_stream.csv")
+        self._stream_path = self.path.with_name(STREAM_FORMATS[stream_format][0])
         self.info_path = self.path.with_name("info.csv")
+        # scheduler and writer of the most recent stream, for pacing / queue stats
+        self.pacing = None
+        self.stream_writer = None
         
 
     def ensure_log_header(self):
@@ -64,48 +90,56 @@ class Logger:
         except OSError as e:
             self.error = str(e)
 
-    def _stream_worker(self, session_id, level_number, get_value, interval, stop_event):
-        try:
-            # ensure header
-            if not self._stream_path.exists():
-                with self._stream_path.open("w", newline="", encoding="utf-8") as f:
-                    w = csv.writer(f)
-                    w.writerow(["timestamp", "session_id", "level_number", "value"])
+    def _open_stream_writer(self, **overrides):
+        options = dict(self.stream_options, **overrides)
+        writer_class = STREAM_FORMATS[self.stream_format][1]
+        writer = writer_class(self._stream_path, header=STREAM_HEADER, **options)
+        self.stream_writer = writer
+        return writer
 
-            # buffer rows in memory, write them when level finishes
-            buffer = []
+    def _stream_row(self, timestamp, session_id, level_number, val):
+        if self.stream_format == "binary":
+            # full-precision timestamp; the binary writer stores the numbers as is
+            return (timestamp, session_id, level_number, val)
+        return [f"{timestamp:.3f}", session_id, level_number, val]
+
+    def _stream_worker(self, session_id, level_number, get_value, interval, stop_event, policy="skip"):
+        # Rows go to the writer thread in chunks as the level runs, so memory
+        # stays flat and stopping only has to write out the last chunk
+        writer = self._open_stream_writer()
+        # waiting on stop_event allows early exit
+        scheduler = DeadlineScheduler(interval, policy=policy, sleep=stop_event.wait)
+        self.pacing = scheduler
+        try:
             while not stop_event.is_set():
-                ts = time.time()
+                tick = scheduler.wait()
+                if stop_event.is_set():
+                    break
                 try:
                     val = get_value()
                 except Exception:
                     val = ""
-                buffer.append([f"{ts:.3f}", session_id, level_number, val])
-                # wait allows early exit on stop_event
-                stop_event.wait(interval)
-
-            # level finished: flush buffered rows to disk once
-            try:
-                if buffer:
-                    with self._stream_path.open("a", newline="", encoding="utf-8") as f:
-                        w = csv.writer(f)
-                        w.writerows(buffer)
-            except OSError as e:
-                self.error = str(e)
-        except OSError as e:
-            self.error = str(e)
+                t0 = METRICS.start()
+                writer.write(self._stream_row(tick.timestamp, session_id, level_number, val))
+                METRICS.record("log_enqueue", t0)
+        finally:
+            writer.close()
+            if writer.error:
+                self.error = writer.error
 
-    def start_stream(self, session_id, level_number, get_value_callable):
+    def start_stream(self, session_id, level_number, get_value_callable, policy="skip"):
         """Start background logging of short-interval values.
 
         get_value_callable: zero-arg callable returning the current value to log.
-        interval: seconds between samples.
+        policy: catch-up policy of the DeadlineScheduler pacing the samples
+            ("skip", "burst" or "timestamp").
+        Samples are LOGGING_INTERVAL seconds apart.
         """
         self.stop_stream()
         stop_event = threading.Event()
         th = threading.Thread(
             target=self._stream_worker,
-            args=(session_id, level_number, get_value_callable, LOGGING_INTERVAL, stop_event),
+            args=(session_id, level_number, get_value_callable, LOGGING_INTERVAL, stop_event, policy),
             daemon=True,
         )
         self._stream_stop = stop_event
@@ -121,44 +155,47 @@ class Logger:
         self._stream_thread = None
         self._stream_stop = None
 
-    def live_stream_generator(self, session_id, level_number, get_value_callable, interval=LOGGING_INTERVAL):
-        """Generates values for livestreaming while logging them synchronously."""
-        # ensure header
-        try:
-            if not self._stream_path.exists():
-                with self._stream_path.open("w", newline="", encoding="utf-8") as f:
-                    w = csv.writer(f)
-                    w.writerow(["timestamp", "session_id", "level_number", "value"])
-        except OSError as e:
-            self.error = str(e)
-            # Proceeding might be dangerous if logging is critical, but for livestream display we might continue.
-            # However, we'll yield anyway.
+    def live_stream_generator(
+        self,
+        session_id,
+        level_number,
+        get_value_callable,
+        interval=LOGGING_INTERVAL,
+        policy="skip",
+        durability=None,
+    ):
+        """Generates values for livestreaming while logging them in the background.
+
+        Samples are paced by a DeadlineScheduler, so the consumer's work between
+        values does not stretch the period; policy picks how missed deadlines
+        are handled ("skip", "burst" or "timestamp"). Rows are handed to a
+        StreamWriter thread, so a slow disk never blocks the yield;
+        durability, if given, overrides stream_options ("none", "flush" or
+        "fsync").
+        """
+        if durability is not None:
+            writer = self._open_stream_writer(durability=durability)
+        else:
+            writer = self._open_stream_writer()
 
+        scheduler = DeadlineScheduler(interval, policy=policy)
+        self.pacing = scheduler
         try:
-            with self._stream_path.open("a", newline="", encoding="utf-8") as f:
-                w = csv.writer(f)
+            while True:
+                tick = scheduler.wait()
+                try:
+                    val = get_value_callable()
+                except Exception:
+                    val = "" # or 0? keeping consistent with _stream_worker
                 
-                while True:
-                    ts = time.time()
-                    try:
-                        val = get_value_callable()
-                    except Exception:
-                        val = "" # or 0? keeping consistent with _stream_worker
-                    
-                    # Log to file immediately (or buffer? buffering is set by OS/file object, we can flush if needed)
-                    # For safety, let's trust the file object buffering or flush if critical.
-                    # Given high frequency, allowing default buffering is better for performance.
-                    w.writerow([f"{ts:.3f}", session_id, level_number, val])
-                    
-                    yield val
-                    
-                    time.sleep(interval)
-        except OSError as e:
-            self.error = str(e)
-            # If we can't write to file, we might still want to yield live data?
-            # But the loop is inside the 'with open'. If that fails, the generator stops.
-            # Fallback: yield data without logging if logging fails?
-            # For now, let's just abort if logging fails, or handle logic to continue.
-            # Simpler to just let it raise or stop.
-            pass
-
+                # Only a queue put on the hot path; the writer thread does the disk I/O
+                t0 = METRICS.start()
+                writer.write(self._stream_row(tick.timestamp, session_id, level_number, val))
+                METRICS.record("log_enqueue", t0)
+                
+                yield val
+        finally:
+            # Runs when the consumer closes the generator: write out what is queued
+            writer.close()
+            if writer.error:
+                self.error = writer.error
@@ -0,0 +1,158 @@
+# Per-stage latency instrumentation for the live pipeline. Stages time
+# themselves with
+#
+#     t0 = METRICS.start()
+#     ...work...
+#     METRICS.record("features", t0)
+#
+# When metrics are off start() returns None and record() returns straight
+# away, so the hooks cost one attribute check. They are switched on with
+# EMG_METRICS=1, METRICS.enable(), live_session --metrics, or at runtime
+# through a MetricsDumper control file.
+import json
+import os
+import threading
+import time
+
+
+class LatencyHistogram:
+    """Rolling window of the last `size` durations of one stage.
+
+    Recording is lock-free: under concurrent writers a sample can
+    occasionally be overwritten, which is fine for statistics.
+    """
+
+    def __init__(self, size=2048):
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self._samples = [0.0] * size
+
+    def add(self, seconds):
+        self._samples[self.count % self.size] = seconds
+        self.count += 1
+        self.total += seconds
+
+    def snapshot(self):
+        """count / mean over the whole run, percentiles and max over the rolling window, in ms."""
+        window = sorted(self._samples[:min(self.count, self.size)])
+        if not window:
+            return {"count": 0}
+
+        def pct(q):
+            return window[min(len(window) - 1, int(q * len(window)))] * 1000
+
+        return {
+            "count": self.count,
+            "mean": self.total / self.count * 1000,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": window[-1] * 1000,
+        }
+
+
+class Metrics:
+    """Registry of LatencyHistograms by stage name."""
+
+    def __init__(self, enabled=False, size=2048):
+        self.enabled = enabled
+        self.size = size
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def start(self):
+        """Start time for record(), or None when metrics are off."""
+        return time.perf_counter() if self.enabled else None
+
+    def record(self, stage, started):
+        """Adds the time since `started` (from start()) to the stage."""
+        if started is None:
+            return
+        self.add(stage, time.perf_counter() - started)
+
+    def add(self, stage, seconds):
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(stage, LatencyHistogram(self.size))
+        histogram.add(seconds)
+
+    def snapshot(self):
+        return {name: histogram.snapshot() for name, histogram in sorted(self._stages.items())}
+
+    def format(self):
+        lines = [f"{'stage':<20}{'count':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name, s in self.snapshot().items():
+            if s["count"]:
+                lines.append(f"{name:<20}{s['count']:>10}{s['p50']:>10.3f}{s['p95']:>10.3f}{s['p99']:>10.3f}"
+                             f"{s['max']:>10.3f}")
+        return "\n".join(lines)
+
+
+METRICS = Metrics(enabled=os.environ.get("EMG_METRICS") == "1")
+
+
+class MetricsDumper:
+    """Appends a JSON line with every stage's snapshot to path every `interval` seconds.
+
+    If control_path is given it is checked on every dump: a file containing
+    "on" or "off" switches the metrics on or off while the session runs.
+    """
+
+    def __init__(self, path, interval=5.0, metrics=METRICS, control_path=None):
+        self.path = path
+        self.interval = interval
+        self.metrics = metrics
+        self.control_path = control_path
+        self.dumps = 0
+        self.error = ""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _apply_control(self):
+        try:
+            with open(self.control_path, encoding="utf-8") as f:
+                state = f.read().strip().lower()
+        except OSError:
+            return
+        if state == "on":
+            self.metrics.enable()
+        elif state == "off":
+            self.metrics.disable()
+
+    def dump(self):
+        if self.control_path is not None:
+            self._apply_control()
+        line = {"time": time.time(), "enabled": self.metrics.enabled, "stages": self.metrics.snapshot()}
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line) + "\n")
+            self.dumps += 1
+        except OSError as e:
+            self.error = str(e)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+    def stop(self):
+        """Stops the thread and writes one last line."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.dump()
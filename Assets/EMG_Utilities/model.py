@@ -1,21 +1,29 @@
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Dense, Conv1D, MaxPooling1D, Flatten, LSTM
 
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
+# TensorFlow, pandas and scikit-learn are imported inside the functions that
+# need them, so importing this module for predict() stays cheap.
 
 import sys
 
-# input_dim=11 based on: 3 scalars (WL, AAC, DASDV) + 4 (AR) + 4 (CC)
+from feature_dataset import is_feature_dataset, load_feature_dataset, read_schema
+from inference import export_model
+
+# input_dim=11 based on: 3 scalars (WL, AAC, DASDV) + 4 (AR) + 4 (CC), per
+# channel; multi-channel models take feature_engineering.feature_dim(n_channels=N)
 INPUT_DIM = 11
 
 def load_and_preprocess_data(filepath='emg_features.csv'):
     """
     Loads data from CSV, parses array columns, and prepares X and y.
+    A feature dataset directory (see feature_dataset) is loaded straight
+    into X and y without parsing.
     """
+    if is_feature_dataset(filepath):
+        X, y, _ = load_feature_dataset(filepath)
+        return X, y
+
+    import pandas as pd
+
     try:
         df = pd.read_csv(filepath)
     except FileNotFoundError:
@@ -51,19 +59,36 @@ def split_data(X, y, test_size=0.2, random_state=13):
     """
     Splits data into training and testing sets.
     """
+    from sklearn.model_selection import train_test_split
+
     return train_test_split(X, y, test_size=test_size, random_state=random_state)
 
-def build_model(input_dim=INPUT_DIM, verbose=False):
+def build_model(input_dim=INPUT_DIM, verbose=False, hidden_units=(16, 16), learning_rate=None):
+    """
+    hidden_units: Width of every hidden relu layer.
+    learning_rate: Adam learning rate, or None for Keras' default.
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense
+    from tensorflow.keras.optimizers import Adam
+
     # Build a 2-layer neural network
     model = Sequential()
-    # Layer 1: Hidden layer
-    model.add(Dense(16, input_dim=input_dim, activation='relu'))
-    model.add(Dense(16, activation='relu'))
-    # Layer 2: Output layer with sigmoid activation
-    model.add(Dense(1, activation='sigmoid'))
+    # Hidden layers, the first one taking the features
+    for i, units in enumerate(hidden_units):
+        if i == 0:
+            model.add(Dense(units, input_dim=input_dim, activation='relu'))
+        else:
+            model.add(Dense(units, activation='relu'))
+    # Output layer with sigmoid activation
+    if hidden_units:
+        model.add(Dense(1, activation='sigmoid'))
+    else:
+        model.add(Dense(1, input_dim=input_dim, activation='sigmoid'))
 
     # Compile the model
-    model.compile(loss='binary_crossentropy', optimizer='adam', metrics=['accuracy'])
+    optimizer = Adam() if learning_rate is None else Adam(learning_rate=learning_rate)
+    model.compile(loss='binary_crossentropy', optimizer=optimizer, metrics=['accuracy'])
 
     if verbose:
         # Display model summary
@@ -71,11 +96,19 @@ def build_model(input_dim=INPUT_DIM, verbose=False):
 
     return model
 
-def train_neural_network(model, X_train, y_train, epochs=5, batch_size=32):
+def train_neural_network(model, X_train, y_train=None, epochs=5, batch_size=32, validation_data=None):
     """
     Trains the Keras model.
+    X_train can also be a batched tf.data.Dataset of (features, label) pairs
+    (see training_data.make_dataset), with y_train left as None; it is then
+    validated on validation_data instead of a split of the training rows.
     """
+    import tensorflow as tf
+
     early_stopping=tf.keras.callbacks.EarlyStopping(monitor='accuracy', patience=5, restore_best_weights=True)
+    if y_train is None:
+        model.fit(X_train, epochs=epochs, verbose=1, callbacks=[early_stopping], validation_data=validation_data)
+        return model
     model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, verbose=1, callbacks=[early_stopping], validation_split=0.2)
     return model
 
@@ -83,9 +116,10 @@ def predict(model, X):
     value = model.predict(X)[0][0]
     return (value > 0.5)
 
-def evaluate_model(model, X_test, y_test):
+def evaluate_model(model, X_test, y_test=None):
     """
     Evaluates the model on test data and returns accuracy.
+    X_test can be a batched tf.data.Dataset, with y_test left as None.
     """
     loss, accuracy = model.evaluate(X_test, y_test, verbose=0)
     return accuracy
@@ -103,6 +137,8 @@ def load_and_predict(model_path, input_data):
     Input data should be preprocessed and match the model's input shape.
     """
     try:
+        from tensorflow.keras.models import load_model
+
         model = load_model(model_path)
         predictions = predict(model, input_data)
         return predictions
@@ -114,6 +150,28 @@ if __name__ == "__main__":
     # Use command line argument for filename if provided, else default
     file_path = sys.argv[1] if len(sys.argv) > 1 else 'emg_features.csv'
     
+    if is_feature_dataset(file_path):
+        # Stream the shards instead of loading everything, validating on
+        # whole sessions held out from training
+        from training_data import make_dataset, split_sessions
+
+        train_sessions, test_sessions = split_sessions(file_path)
+        print(f"Streaming {file_path}: {len(train_sessions)} training / {len(test_sessions)} test sessions")
+        train_ds = make_dataset(file_path, sessions=train_sessions)
+        test_ds = make_dataset(file_path, sessions=test_sessions, shuffle=False) if test_sessions else None
+
+        schema = read_schema(file_path)
+        model = build_model(input_dim=len(schema["feature_columns"]), verbose=True)
+        train_neural_network(model, train_ds, epochs=50, validation_data=test_ds)
+        if test_ds is not None:
+            accuracy = evaluate_model(model, test_ds)
+            print(f"Model Accuracy on Test Sessions: {accuracy * 100:.2f}%")
+
+        save_model_to_disk(model)
+        # The live path computes its features with the same AR estimator
+        export_model(model, ar_method=schema.get("ar_method", "ols"))
+        sys.exit()
+
     print(f"Loading data from {file_path}...")
     X, y = load_and_preprocess_data(file_path)
     
@@ -134,3 +192,5 @@ if __name__ == "__main__":
         print(f"Model Accuracy on Test Set: {accuracy * 100:.2f}%")
         
         save_model_to_disk(model)
+        # Weights for the TensorFlow-free runtime used by livestream.py
+        export_model(model)
@@ -0,0 +1,111 @@
+import collections
+import math
+import time
+
+# One scheduled sample. timestamp is wall-clock seconds, lateness is how far
+# past its deadline the tick woke up, skipped is the number of slots dropped
+# right before it (skip policy only).
+Tick = collections.namedtuple("Tick", ["index", "timestamp", "lateness", "skipped"])
+
+# What to do with deadlines that passed while the caller was busy:
+#   skip      - drop the missed slots and stay on the original grid
+#   burst     - run the missed slots back to back until caught up
+#   timestamp - no catch-up; restart the grid at the late tick and stamp
+#               every tick with the time it actually ran
+POLICIES = ("skip", "burst", "timestamp")
+
+
+class DeadlineScheduler:
+    """Paces a loop to absolute deadlines on a monotonic clock.
+
+    Sleeping to start + n * interval instead of sleeping `interval` after the
+    work keeps the rate exact however long the work takes. Wall-clock
+    timestamps are derived from the monotonic clock and one anchor taken at
+    the first tick, so they cannot jump when the system clock is adjusted.
+
+    sleep can be swapped for e.g. threading.Event.wait so a stop request
+    interrupts the wait; clock/wall_clock are injectable for tests.
+    """
+
+    def __init__(self, interval, policy="skip", sleep=time.sleep, clock=time.monotonic, wall_clock=time.time):
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+        self.interval = interval
+        self.policy = policy
+        self._sleep = sleep
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._anchor = None
+        self._started = None
+        self._wall_offset = None
+        self._slot = 0
+        self.ticks = 0
+        self.missed_deadlines = 0
+        self.skipped = 0
+        # lateness statistics (Welford), in seconds
+        self._late_mean = 0.0
+        self._late_m2 = 0.0
+        self.max_lateness = 0.0
+
+    def wait(self):
+        """Sleeps until the next deadline and returns its Tick."""
+        now = self._clock()
+        if self._anchor is None:
+            self._anchor = now
+            self._started = now
+            self._wall_offset = self._wall_clock() - now
+
+        deadline = self._anchor + self._slot * self.interval
+        if now < deadline:
+            self._sleep(deadline - now)
+            now = self._clock()
+        lateness = max(now - deadline, 0.0)
+
+        skipped = 0
+        if lateness >= self.interval:
+            self.missed_deadlines += 1
+            if self.policy == "skip":
+                skipped = int(lateness // self.interval)
+                self._slot += skipped
+                deadline += skipped * self.interval
+                lateness -= skipped * self.interval
+                self.skipped += skipped
+            elif self.policy == "timestamp":
+                # Restart the grid here instead of chasing the old one
+                self._anchor = now
+                self._slot = 0
+
+        # Nominal slot time, or the time the tick actually ran
+        timestamp = self._wall_offset + (now if self.policy == "timestamp" else deadline)
+        self._slot += 1
+
+        self.ticks += 1
+        delta = lateness - self._late_mean
+        self._late_mean += delta / self.ticks
+        self._late_m2 += delta * (lateness - self._late_mean)
+        self.max_lateness = max(self.max_lateness, lateness)
+        return Tick(self.ticks - 1, timestamp, lateness, skipped)
+
+    def stats(self):
+        """Missed deadlines and lateness (jitter) statistics so far."""
+        variance = self._late_m2 / (self.ticks - 1) if self.ticks > 1 else 0.0
+        elapsed = (self._clock() - self._started) if self._started is not None else 0.0
+        return {
+            "ticks": self.ticks,
+            "missed_deadlines": self.missed_deadlines,
+            "skipped": self.skipped,
+            "mean_lateness": self._late_mean,
+            "std_lateness": math.sqrt(variance),
+            "max_lateness": self.max_lateness,
+            "effective_rate": self.ticks / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (
+            f"{s['ticks']} ticks, {s['missed_deadlines']} missed deadlines, {s['skipped']} skipped, "
+            f"lateness mean {s['mean_lateness'] * 1000:.2f} ms / std {s['std_lateness'] * 1000:.2f} ms / "
+            f"max {s['max_lateness'] * 1000:.2f} ms, {s['effective_rate']:.1f} Hz"
+        )
@@ -0,0 +1,178 @@
+# Hands every live decision to the Unity game as one small UDP datagram on
+# localhost, instead of the game scraping stdout or polling a file. A message
+# is 24 little-endian bytes:
+#   magic "EP" | version u8 | decision u8 | session u32 | seq u32 | timestamp f8 | probability f4
+# timestamp is the decision's wall-clock time (time.time()), so a receiver on
+# the same machine can measure muscle-to-game latency; seq counts up from 0
+# so it can count lost and reordered messages. session is random per
+# publisher: when it changes the Python side was restarted and seq starts
+# over, so receivers begin a new stream instead of treating it as stale.
+# Assets/Scripts/EMG/EmgPredictionReceiver.cs is the game side,
+# PredictionSubscriber the Python reference used by the tests.
+import collections
+import random
+import socket
+import struct
+import time
+
+from metrics import METRICS, LatencyHistogram
+
+MESSAGE = struct.Struct("<2sBBIIdf")
+MESSAGE_MAGIC = b"EP"
+MESSAGE_VERSION = 2
+DEFAULT_ADDRESS = ("127.0.0.1", 5005)
+
+# One received message; latency is receive time minus timestamp, in seconds
+Message = collections.namedtuple("Message", ["session", "seq", "timestamp", "probability", "prediction", "latency"])
+
+
+def pack_message(seq, timestamp, probability, prediction, session=0):
+    return MESSAGE.pack(MESSAGE_MAGIC, MESSAGE_VERSION, int(bool(prediction)), session & 0xFFFFFFFF,
+                        seq & 0xFFFFFFFF, timestamp, probability)
+
+
+def unpack_message(data, received=None):
+    """Message from one datagram, or None if it is not a version 2 prediction message."""
+    if len(data) != MESSAGE.size:
+        return None
+    magic, version, prediction, session, seq, timestamp, probability = MESSAGE.unpack(data)
+    if magic != MESSAGE_MAGIC or version != MESSAGE_VERSION:
+        return None
+    received = time.time() if received is None else received
+    return Message(session, seq, timestamp, probability, bool(prediction), received - timestamp)
+
+
+def parse_address(text):
+    """'host:port' or 'port' -> (host, port), host defaulting to localhost."""
+    host, _, port = text.rpartition(":")
+    return host or DEFAULT_ADDRESS[0], int(port)
+
+
+class PredictionPublisher:
+    """Sends livestream Decisions to a UDP address without ever blocking.
+
+    publish(decision) fits process_livestream's on_decision. A send that
+    would block, or fails because nobody is listening yet, is counted and
+    the decision dropped; the live loop never waits on the game.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, session=None):
+        self.address = address
+        self.session = random.getrandbits(32) if session is None else session
+        self.seq = 0
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = ""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def publish(self, decision):
+        """Sends one Decision. Returns False if it was dropped."""
+        t0 = METRICS.start()
+        data = pack_message(self.seq, decision.timestamp, decision.probability, decision.prediction, self.session)
+        self.seq += 1
+        try:
+            self._socket.sendto(data, self.address)
+        except BlockingIOError:
+            self.dropped += 1
+            return False
+        except OSError as e:
+            # e.g. ICMP port unreachable while the game is not running
+            self.errors += 1
+            self.last_error = str(e)
+            return False
+        finally:
+            METRICS.record("publish", t0)
+        self.sent += 1
+        return True
+
+    __call__ = publish
+
+    def stats(self):
+        return {"published": self.seq, "sent": self.sent, "dropped": self.dropped, "errors": self.errors}
+
+    def close(self):
+        self._socket.close()
+
+
+class PredictionSubscriber:
+    """Reference receiver: reads messages and keeps sequence and latency statistics.
+
+    lost counts seq numbers skipped over, reordered counts messages older
+    than one already seen (they are still returned), invalid counts
+    datagrams that are not prediction messages, and sessions counts the
+    publisher sessions seen; a new session restarts the sequence.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, latency_size=2048):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(address)
+        self.address = self._socket.getsockname()
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+        self.invalid = 0
+        self.sessions = 0
+        self.latency = LatencyHistogram(latency_size)
+        self._session = None
+        self._next_seq = None
+
+    def receive(self, timeout=None):
+        """Next Message, or None if nothing valid arrived within timeout (None blocks)."""
+        self._socket.settimeout(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                data = self._socket.recv(64)
+            except (socket.timeout, BlockingIOError):
+                return None
+            message = unpack_message(data)
+            if message is not None:
+                self._account(message)
+                return message
+            self.invalid += 1
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._socket.settimeout(remaining)
+
+    def drain(self):
+        """Every message already waiting, without blocking."""
+        messages = []
+        while True:
+            message = self.receive(timeout=0)
+            if message is None:
+                return messages
+            messages.append(message)
+
+    def _account(self, message):
+        self.received += 1
+        self.latency.add(max(message.latency, 0.0))
+        if message.session != self._session:
+            # The publisher restarted and counts from 0 again
+            self._session = message.session
+            self.sessions += 1
+            self._next_seq = None
+        if self._next_seq is not None:
+            if message.seq < self._next_seq:
+                self.reordered += 1
+                # A late message was counted as lost when its successor arrived
+                self.lost = max(self.lost - 1, 0)
+                return
+            self.lost += message.seq - self._next_seq
+        self._next_seq = message.seq + 1
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "lost": self.lost,
+            "reordered": self.reordered,
+            "invalid": self.invalid,
+            "sessions": self.sessions,
+            "latency": self.latency.snapshot(),
+        }
+
+    def close(self):
+        self._socket.close()
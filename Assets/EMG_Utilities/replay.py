@@ -0,0 +1,324 @@
+# Replays recorded sessions through the live path without the board: a
+# stream log (emg_stream.csv / .bin) or a raw serial capture is fed either
+# straight into the livestream decision loop or through EMGReader via a fake
+# serial port, at the recorded pace, N times faster, or as fast as possible.
+# Recorded timestamps travel with every sample, so decisions can be lined up
+# with the recording afterwards.
+import argparse
+import array
+import collections
+import contextlib
+import csv
+import time
+from pathlib import Path
+
+from feature_engineering import level_to_output
+
+# One recorded sample; level_number is None for raw captures
+Sample = collections.namedtuple("Sample", ["timestamp", "value", "level_number"])
+
+# Longest recorded gap (seconds) that is replayed as a pause; longer gaps,
+# e.g. between levels, are shortened to this
+MAX_GAP = 1.0
+
+
+def read_stream_log(path, session_id=None, level_number=None, chunksize=100000):
+    """Yields the Samples of a stream log (CSV with its rotated segments, or binary), in order."""
+    import numpy as np
+
+    from stream_writer import stream_segments
+
+    for segment in stream_segments(path) or [Path(path)]:
+        if Path(segment).suffix == ".bin":
+            from stream_log import StreamLog
+
+            log = StreamLog(segment)
+            for seg, records in log.select(session_id, level_number):
+                for ts, value in records.tolist():
+                    if not np.isnan(value):
+                        yield Sample(ts, value, seg.level_number)
+            continue
+
+        import pandas as pd
+
+        for chunk in pd.read_csv(segment, chunksize=chunksize):
+            if session_id is not None:
+                chunk = chunk[chunk["session_id"].astype(str) == str(session_id)]
+            if level_number is not None:
+                chunk = chunk[chunk["level_number"] == level_number]
+            values = pd.to_numeric(chunk["value"], errors="coerce")
+            chunk = chunk[values.notna()]
+            yield from map(Sample, chunk["timestamp"].tolist(), values[values.notna()].tolist(),
+                           chunk["level_number"].tolist())
+
+
+def read_serial_capture(path, rate=100.0, column=1):
+    """
+    Yields Samples from a raw capture of the board's serial output
+    ("filtered,envelope" lines), timestamped at `rate` Hz from 0. column
+    picks the value (1 = envelope). Malformed lines are skipped.
+    """
+    n = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                fields = line.strip().split(b",")
+                value = float(fields[column])
+            except (ValueError, IndexError):
+                continue
+            yield Sample(n / rate, value, None)
+            n += 1
+
+
+def paced(samples, speed=1.0, max_chunk=256, max_gap=MAX_GAP, sleep=time.sleep, clock=time.perf_counter):
+    """
+    Groups samples into lists released at their recorded time divided by
+    speed (speed None or 0: no waiting). Everything already due is released
+    together, up to max_chunk samples per list.
+    """
+    start = None
+    offset = 0.0  # recorded time skipped by shortening long gaps
+    last_ts = None
+    chunk = []
+    for sample in samples:
+        if not speed:
+            chunk.append(sample)
+            if len(chunk) >= max_chunk:
+                yield chunk
+                chunk = []
+            continue
+        if start is None:
+            start, t0 = clock(), sample.timestamp
+        elif sample.timestamp - last_ts > max_gap:
+            offset += sample.timestamp - last_ts - max_gap
+        last_ts = sample.timestamp
+        due = start + (sample.timestamp - t0 - offset) / speed
+        if due > clock():
+            # Hand over what is due before waiting for this one
+            if chunk:
+                yield chunk
+                chunk = []
+            wait = due - clock()
+            if wait > 0:
+                sleep(wait)
+        chunk.append(sample)
+        if len(chunk) >= max_chunk:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ReplaySerial:
+    """Serial-port stand-in for EMGReader(serial_port=...) serving recorded samples.
+
+    Each Sample becomes a "value,value" line (the stream log only keeps one
+    value, so it stands in for both filtered and envelope). Lines become
+    readable at their paced time; once everything has been served, reads
+    return nothing and `finished` is set.
+    """
+
+    def __init__(self, samples, speed=1.0, timeout=0.05):
+        self._chunks = paced(samples, speed)
+        self._pending = b""
+        self.timeout = timeout
+        self.finished = False
+        self.closed = False
+        self.lines = 0
+
+    def _fill(self):
+        if self._pending or self.finished:
+            return
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.finished = True
+            return
+        self.lines += len(chunk)
+        self._pending = b"".join(b"%r,%r\n" % (s.value, s.value) for s in chunk)
+
+    @property
+    def in_waiting(self):
+        self._fill()
+        return len(self._pending)
+
+    def read(self, size=1):
+        self._fill()
+        if not self._pending:
+            time.sleep(self.timeout)
+            return b""
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def readline(self):
+        self._fill()
+        if not self._pending:
+            time.sleep(self.timeout)
+            return b""
+        end = self._pending.find(b"\n") + 1
+        line, self._pending = self._pending[:end], self._pending[end:]
+        return line
+
+    def close(self):
+        self.closed = True
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def replay(samples, model_path="bg_model.npz", speed=None, window=50, hop=1, incremental=True, via_reader=False,
+           on_decision=None, ar_method=None):
+    """
+    Runs recorded samples through the livestream decision loop and reports
+    how it went.
+
+    Args:
+        samples: Iterable of Samples (read_stream_log / read_serial_capture).
+        speed: 1.0 for the recorded pace, N for N times faster, None or 0
+            for as fast as possible.
+        via_reader: Go through EMGReader (bulk mode, ring buffer) and a
+            ReplaySerial instead of feeding the loop directly.
+        on_decision: Optional callable receiving (Decision, recorded timestamp).
+        ar_method: AR estimator for the features; None uses the one the
+            model was exported with. A mismatch with the model, or an
+            estimator the incremental engine lacks, raises ValueError.
+
+    Returns:
+        dict: samples, decisions, seconds, samples_per_sec, realtime_factor
+        (recorded seconds per wall second), latency_p50 / latency_p95 in ms
+        (sample released to decision; direct mode only), positive_rate,
+        accuracy against level_to_output where the levels are known, and
+        overruns (samples the reader's ring dropped; reader mode only).
+    """
+    from inference import load_model
+    from livestream import livestream_decisions, resolve_ar_method
+
+    model = load_model(model_path)
+    ar_method = resolve_ar_method(model, ar_method, incremental)
+    recorded = array.array("d")
+    labels = array.array("b")
+    released = array.array("d")
+
+    def remember(chunk):
+        for s in chunk:
+            recorded.append(s.timestamp)
+            labels.append(-1 if s.level_number is None else level_to_output(s.level_number))
+
+    if via_reader:
+        from emg import EMGReader
+
+        def tracked():
+            for s in samples:
+                remember([s])
+                yield s
+
+        port = ReplaySerial(tracked(), speed=speed)
+        # Samples the loop falls more than buffer_size behind on are lost (counted in overruns)
+        reader = EMGReader(bulk=True, buffer_size=1 << 18, serial_port=port)
+
+        def data_stream():
+            cursor = 0
+            while True:
+                rows, cursor = reader.since(cursor)
+                if len(rows):
+                    yield rows[:, 2].copy()
+                elif port.finished and reader.buffer.total >= port.lines:
+                    return
+                else:
+                    time.sleep(0.001)
+    else:
+        def data_stream():
+            for chunk in paced(samples, speed):
+                remember(chunk)
+                now = time.perf_counter()
+                released.extend([now] * len(chunk))
+                yield [s.value for s in chunk]
+
+    latencies = []
+    n_decisions = positives = correct = labelled = 0
+    start = time.perf_counter()
+    try:
+        for decision in livestream_decisions(data_stream(), model, window=window, hop=hop, incremental=incremental,
+                                             ar_method=ar_method):
+            i = decision.sample_index - 1
+            if released:
+                latencies.append(time.perf_counter() - released[i])
+            n_decisions += 1
+            positives += decision.prediction
+            if labels[i] >= 0:
+                labelled += 1
+                correct += int(decision.prediction) == labels[i]
+            if on_decision is not None:
+                on_decision(decision, recorded[i])
+    finally:
+        if via_reader:
+            reader.stop()
+    seconds = time.perf_counter() - start
+    overruns = reader.buffer.overruns if via_reader else 0
+
+    duration = recorded[-1] - recorded[0] if len(recorded) > 1 else 0.0
+    return {
+        "samples": len(recorded),
+        "decisions": n_decisions,
+        "seconds": seconds,
+        "samples_per_sec": len(recorded) / seconds if seconds > 0 else 0.0,
+        "realtime_factor": duration / seconds if seconds > 0 else 0.0,
+        "latency_p50": _percentile(latencies, 0.50) * 1000,
+        "latency_p95": _percentile(latencies, 0.95) * 1000,
+        "positive_rate": positives / n_decisions if n_decisions else 0.0,
+        "accuracy": correct / labelled if labelled else None,
+        "overruns": overruns,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded session through the live pipeline.")
+    parser.add_argument("input", help="emg_stream.csv / emg_stream.bin, or a raw serial capture with --raw.")
+    parser.add_argument("--raw", action="store_true", help="Input is a raw serial capture.")
+    parser.add_argument("--rate", type=float, default=100.0, help="Sample rate of a raw capture, in Hz.")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 = recorded pace, N = N times faster, 0 = unthrottled.")
+    parser.add_argument("--session-id", default=None)
+    parser.add_argument("--level", type=int, default=None)
+    parser.add_argument("--model", default="bg_model.npz")
+    parser.add_argument("--window", type=int, default=50)
+    parser.add_argument("--hop", type=int, default=1)
+    parser.add_argument("--full-recompute", action="store_true")
+    parser.add_argument("--ar-method", default=None,
+                        help="AR estimator for the features; defaults to the one the model was exported with.")
+    parser.add_argument("--via-reader", action="store_true", help="Go through EMGReader and a fake serial port.")
+    parser.add_argument("--decisions", default=None, help="Write every decision with its recorded timestamp to this CSV.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.raw:
+        samples = read_serial_capture(args.input, rate=args.rate)
+    else:
+        samples = read_stream_log(args.input, session_id=args.session_id, level_number=args.level)
+
+    with contextlib.ExitStack() as stack:
+        on_decision = None
+        if args.decisions:
+            f = stack.enter_context(open(args.decisions, "w", newline="", encoding="utf-8"))
+            w = csv.writer(f)
+            w.writerow(["recorded_timestamp", "sample_index", "probability", "prediction"])
+
+            def on_decision(decision, recorded_ts):
+                w.writerow([f"{recorded_ts:.3f}", decision.sample_index, f"{decision.probability:.6f}",
+                            int(decision.prediction)])
+
+        report = replay(samples, model_path=args.model, speed=args.speed, window=args.window, hop=args.hop,
+                        incremental=not args.full_recompute, via_reader=args.via_reader, on_decision=on_decision,
+                        ar_method=args.ar_method)
+    for name, value in report.items():
+        print(f"{name:<18}{value}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
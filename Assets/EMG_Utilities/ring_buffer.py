@@ -0,0 +1,77 @@
+import numpy as np
+
+# Column layout of every row in the ring. Multi-channel readers append one
+# more (filtered, envelope) pair per channel, so channel c is at 1 + 2c, 2 + 2c.
+TIMESTAMP, FILTERED, ENVELOPE = 0, 1, 2
+
+
+class SampleRing:
+    """Fixed-capacity, preallocated ring of (timestamp, filtered, envelope) rows.
+
+    Every row is written twice, at slot i and i + capacity, so any run of up to
+    `capacity` consecutive samples is contiguous in memory and latest()/since()
+    can return views instead of copies. A view stays valid until `capacity`
+    newer samples have been written; copy it to hold on to it for longer.
+
+    Samples are addressed by an absolute cursor: the number of samples written
+    before them. `total` is the cursor of the next sample to be written.
+    """
+
+    def __init__(self, capacity, n_columns=3, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self._data = np.zeros((2 * capacity, n_columns), dtype=dtype)
+        self.total = 0
+        self.overruns = 0
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, row):
+        slot = self.total % self.capacity
+        self._data[slot] = row
+        self._data[slot + self.capacity] = row
+        # Publish only after the data is in place, readers go by total
+        self.total += 1
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        if rows.ndim != 2:
+            raise ValueError(f"Expected a 2-D array of rows, got shape {rows.shape}")
+        if len(rows) == 0:
+            return
+        skipped = 0
+        if len(rows) > self.capacity:
+            # Only the newest `capacity` rows can be kept anyway
+            skipped = len(rows) - self.capacity
+            rows = rows[skipped:]
+        n = len(rows)
+        slot = (self.total + skipped) % self.capacity
+        first = min(n, self.capacity - slot)
+        for offset in (0, self.capacity):
+            self._data[slot + offset:slot + offset + first] = rows[:first]
+            self._data[offset:offset + n - first] = rows[first:]
+        # Readers only see the rows once they are all written
+        self.total += skipped + n
+
+    def latest(self, n):
+        """View of the newest n samples, oldest first."""
+        n = min(n, len(self))
+        end = self.total % self.capacity + self.capacity
+        return self._data[end - n:end]
+
+    def since(self, cursor):
+        """
+        View of every sample written from `cursor` on, and the cursor to pass
+        next time. Samples already overwritten are skipped and counted in
+        overruns.
+        """
+        total = self.total
+        oldest = total - len(self)
+        if cursor < oldest:
+            self.overruns += oldest - cursor
+            cursor = oldest
+        n = total - cursor
+        end = total % self.capacity + self.capacity
+        return self._data[end - n:end], total
@@ -0,0 +1,147 @@
+# Acquisition for several serial devices (two players, bilateral sleeves) on
+# one thread instead of one blocking EMGReader thread per port. Ports are
+# opened non-blocking and polled: whatever is waiting on each one is read in
+# a single call and handed to that device's EMGReader to parse and store.
+# pyserial handles cannot be select()ed on Windows, so the loop polls
+# in_waiting and sleeps on the stop event when every port is idle, which
+# also lets stop() return within one poll interval.
+import asyncio
+import threading
+import time
+
+from emg import EMGReader
+from metrics import METRICS
+
+
+class SerialManager:
+    """Services many serial devices from one thread or one asyncio task.
+
+    Every device is an EMGReader created without its own thread, so the
+    usual reader API (filtered/envelope, read_samples, latest/since/chunks
+    with a ring buffer) works per device. on_samples(name, samples) callbacks
+    run on the polling thread with the samples of every read.
+
+    A device whose port raises is counted in read_errors and skipped for the
+    rest of that pass; a callback that raises is counted in callback_errors.
+    Either way the other devices are not affected and polling goes on.
+    """
+
+    def __init__(self, poll=0.002):
+        self.poll = poll
+        self.devices = {}
+        self.passes = 0
+        self.idle_passes = 0
+        self._callbacks = {}
+        self._bytes = {}
+        self._read_errors = {}
+        self._callback_errors = {}
+        self.last_read_error = None
+        self.last_callback_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, name, port=None, baud=115200, serial_port=None, on_samples=None, **reader_options):
+        """
+        Registers a device and returns its EMGReader.
+
+        Args:
+            port / baud: Serial port to open non-blocking (timeout=0).
+            serial_port: An already open serial-like object with in_waiting,
+                read and close, used instead of opening port.
+            on_samples: Optional callable(name, samples) for every read.
+                With it the samples are not also queued for read_samples()
+                unless queue_samples=True is passed.
+            reader_options: Passed to EMGReader, e.g. n_channels,
+                buffer_size or timestamps.
+        """
+        if name in self.devices:
+            raise ValueError(f"Device '{name}' is already registered")
+        if serial_port is None:
+            import serial  # imported here so stub works without pyserial
+
+            serial_port = serial.Serial(port, baud, timeout=0)
+        reader_options.setdefault("queue_samples", on_samples is None)
+        reader = EMGReader(serial_port=serial_port, bulk=True, start=False, **reader_options)
+        self.devices[name] = reader
+        self._callbacks[name] = on_samples
+        self._bytes[name] = 0
+        self._read_errors[name] = 0
+        self._callback_errors[name] = 0
+        return reader
+
+    def poll_once(self):
+        """Reads and parses whatever is waiting on every device. Returns the bytes read."""
+        total = 0
+        for name, reader in self.devices.items():
+            try:
+                t0 = METRICS.start()
+                waiting = reader.ser.in_waiting
+                data = reader.ser.read(waiting) if waiting else b""
+                METRICS.record("serial_read", t0)
+            except Exception as e:
+                self._read_errors[name] += 1
+                self.last_read_error = (name, repr(e))
+                continue
+            if not data:
+                continue
+            total += len(data)
+            self._bytes[name] += len(data)
+            samples = reader.feed(data)
+            callback = self._callbacks[name]
+            if samples and callback is not None:
+                try:
+                    callback(name, samples)
+                except Exception as e:
+                    # One broken consumer must not stop the thread every device shares
+                    self._callback_errors[name] += 1
+                    self.last_callback_error = (name, repr(e))
+        self.passes += 1
+        if not total:
+            self.idle_passes += 1
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self.poll_once():
+                self._stop.wait(self.poll)
+
+    def start(self):
+        """Polls every device on one daemon thread until stop()."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    async def serve(self):
+        """Polls every device from the running event loop until stop()."""
+        self._stop.clear()
+        while not self._stop.is_set():
+            if not self.poll_once():
+                await asyncio.sleep(self.poll)
+
+    def stop(self, timeout=1.0):
+        """Stops polling and closes every port. Returns the seconds it took."""
+        start = time.perf_counter()
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        for reader in self.devices.values():
+            reader.stop()
+        return time.perf_counter() - start
+
+    def stats(self):
+        """Per-device bytes, samples, parse, read and callback errors, plus loop pass counts."""
+        return {
+            "passes": self.passes,
+            "idle_passes": self.idle_passes,
+            "devices": {
+                name: {
+                    "bytes": self._bytes[name],
+                    "samples": reader.parsed_count,
+                    "parse_errors": reader.parse_errors,
+                    "read_errors": self._read_errors[name],
+                    "callback_errors": self._callback_errors[name],
+                }
+                for name, reader in self.devices.items()
+            },
+        }
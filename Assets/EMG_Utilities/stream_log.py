@@ -0,0 +1,97 @@
+import collections
+import csv
+from pathlib import Path
+
+import numpy as np
+
+from stream_writer import BINARY_HEADER, BINARY_MAGIC, BINARY_RECORD_SIZE, BINARY_VERSION, index_path
+
+# Record layout of the binary stream log, see stream_writer.BinaryStreamWriter
+RECORD_DTYPE = np.dtype([("timestamp", "<f8"), ("value", "<f8")])
+
+# One contiguous run of records from the same session and level: records[start:stop]
+Segment = collections.namedtuple("Segment", ["session_id", "level_number", "start", "stop"])
+
+
+def _level(value):
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class StreamLog:
+    """Read-only, memory-mapped view of a binary stream log (emg_stream.bin).
+
+    Nothing is read up front apart from the header and the index sidecar;
+    records, timestamps and values are views into the mapped file, and so
+    are the per-segment arrays returned by select() and level(). A record
+    torn by a crash at the end of the file is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            header = f.read(BINARY_HEADER.size)
+        if len(header) < BINARY_HEADER.size:
+            raise ValueError(f"{self.path} is too short to be a binary stream log")
+        magic, version, record_size = BINARY_HEADER.unpack(header)
+        if magic != BINARY_MAGIC or record_size != BINARY_RECORD_SIZE:
+            raise ValueError(f"{self.path} is not a version {BINARY_VERSION} binary stream log")
+
+        n = (self.path.stat().st_size - BINARY_HEADER.size) // BINARY_RECORD_SIZE
+        if n:
+            self.records = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=BINARY_HEADER.size, shape=(n,))
+        else:
+            # np.memmap cannot map zero bytes
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self.segments = self._read_index(n)
+
+    def _read_index(self, n):
+        idx = index_path(self.path)
+        if not idx.exists():
+            return [Segment(None, None, 0, n)] if n else []
+        with idx.open(newline="", encoding="utf-8") as f:
+            entries = [(row[0], _level(row[1]), int(row[2])) for row in list(csv.reader(f))[1:] if row]
+        segments = []
+        for i, (session_id, level_number, start) in enumerate(entries):
+            stop = entries[i + 1][2] if i + 1 < len(entries) else n
+            stop = min(stop, n)
+            if stop > start:
+                segments.append(Segment(session_id, level_number, start, stop))
+        return segments
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        return self.records["timestamp"]
+
+    @property
+    def values(self):
+        return self.records["value"]
+
+    def select(self, session_id=None, level_number=None):
+        """
+        (Segment, records view) for every segment matching the given session
+        and/or level, in file order.
+        """
+        return [
+            (segment, self.records[segment.start:segment.stop])
+            for segment in self.segments
+            if (session_id is None or segment.session_id == session_id)
+            and (level_number is None or segment.level_number == level_number)
+        ]
+
+    def level(self, session_id, level_number):
+        """
+        Records of one session/level. A view when the level was logged in one
+        run, a concatenated copy when it was split (e.g. by a restart).
+        """
+        parts = [records for _, records in self.select(session_id, level_number)]
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
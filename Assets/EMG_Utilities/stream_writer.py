@@ -0,0 +1,346 @@
+import array
+import csv
+import io
+import math
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+from metrics import METRICS
+
+# How hard a flush pushes rows towards the disk:
+#   none  - leave it to the file object / OS buffers until close
+#   flush - flush Python's buffer to the OS on every flush
+#   fsync - flush and fsync, so flushed rows survive a power cut
+DURABILITY = ("none", "flush", "fsync")
+
+# Binary stream log (emg_stream.bin): a 16-byte header (magic, format version,
+# record size) followed by fixed-width little-endian records of
+# (timestamp f8, value f8). Which session/level each run of records belongs to
+# is kept in a CSV sidecar (emg_stream.idx) with the index of its first record.
+BINARY_MAGIC = b"EMGSTRM\0"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<8sII")
+BINARY_RECORD_SIZE = 16
+INDEX_HEADER = ["session_id", "level_number", "start"]
+
+
+def segment_path(path, index):
+    """emg_stream.csv -> emg_stream.0001.csv"""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.{index:04d}{path.suffix}")
+
+
+def stream_segments(path):
+    """
+    Every file of a rotated stream log in write order: the numbered segments
+    followed by the active file, skipping the ones that do not exist.
+    """
+    path = Path(path)
+    segments = []
+    index = 1
+    while segment_path(path, index).exists():
+        segments.append(segment_path(path, index))
+        index += 1
+    if path.exists():
+        segments.append(path)
+    return segments
+
+
+class StreamWriter:
+    """Writes CSV rows on a background thread so disk I/O stays off the hot path.
+
+    write() only puts the row on a bounded queue. The writer thread takes rows
+    off in batches of up to batch_size, writes them with writerows, and
+    flushes when flush_rows rows or flush_bytes bytes have been written since
+    the last flush, or flush_interval seconds have passed. If the queue is
+    full the row is dropped and counted rather than blocking the caller.
+
+    With rotate_bytes / rotate_seconds the active file is closed once it
+    reaches that size or age and renamed to the next numbered segment
+    (emg_stream.0001.csv, ...); a fresh file with the header takes its place.
+
+    Sizes come from counting the bytes written, not f.tell(): tell() on a
+    text file flushes its buffer, which would defeat flush_bytes and
+    durability="none".
+    """
+
+    def __init__(
+        self,
+        path,
+        header=None,
+        max_queue=10000,
+        batch_size=500,
+        flush_rows=1000,
+        flush_interval=1.0,
+        flush_bytes=None,
+        durability="flush",
+        rotate_bytes=None,
+        rotate_seconds=None,
+        start=True,
+    ):
+        if durability not in DURABILITY:
+            raise ValueError(f"Unknown durability '{durability}', expected one of {DURABILITY}")
+        self.path = Path(path)
+        self.header = header
+        self.batch_size = batch_size
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.durability = durability
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.rotations = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.flushes = 0
+        self.max_depth = 0
+        self.error = ""
+        self._file_bytes = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        if start:
+            self.start()
+
+    def start(self):
+        self._thread.start()
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def write(self, row):
+        """Queues one row. Returns False if it was dropped because the queue is full."""
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _take_batch(self, timeout):
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        self.max_depth = max(self.max_depth, len(batch) + self._queue.qsize())
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, f):
+        if self.durability == "none":
+            return
+        f.flush()
+        if self.durability == "fsync":
+            os.fsync(f.fileno())
+        self.flushes += 1
+
+    def _open(self):
+        size = self.path.stat().st_size if self.path.exists() else 0
+        f = self.path.open("a", newline="", encoding="utf-8")
+        self._file_bytes = size
+        if not size and self.header is not None:
+            self._write_batch(f, [self.header])
+        self._opened_at = time.monotonic()
+        return f, f
+
+    def _write_batch(self, f, batch):
+        """Writes the rows and returns their size in bytes."""
+        text = io.StringIO(newline="")
+        csv.writer(text).writerows(batch)
+        text = text.getvalue()
+        f.write(text)
+        written = len(text.encode("utf-8"))
+        self._file_bytes += written
+        return written
+
+    def _close(self, f):
+        f.close()
+
+    def _should_rotate(self, rows_in_file):
+        if not rows_in_file:
+            return False
+        if self.rotate_bytes is not None and self._file_bytes >= self.rotate_bytes:
+            return True
+        if self.rotate_seconds is not None and time.monotonic() - self._opened_at >= self.rotate_seconds:
+            return True
+        return False
+
+    def _rotate(self, f):
+        self._close(f)
+        index = 1
+        while segment_path(self.path, index).exists():
+            index += 1
+        os.replace(self.path, segment_path(self.path, index))
+        self._rotated(index)
+        self.rotations += 1
+        return self._open()
+
+    def _rotated(self, index):
+        """Hook for files that travel with the log when it is rotated."""
+
+    def _run(self):
+        f = None
+        try:
+            f, w = self._open()
+            rows_in_file = 0
+            unflushed = 0
+            flushed_at = self._file_bytes
+            last_flush = time.monotonic()
+            while True:
+                batch = self._take_batch(timeout=min(self.flush_interval, 0.1))
+                if batch:
+                    t0 = METRICS.start()
+                    self._write_batch(w, batch)
+                    METRICS.record("log_write", t0)
+                    self.written += len(batch)
+                    self.batches += 1
+                    unflushed += len(batch)
+                    rows_in_file += len(batch)
+
+                now = time.monotonic()
+                if unflushed and (
+                    unflushed >= self.flush_rows
+                    or now - last_flush >= self.flush_interval
+                    or (self.flush_bytes is not None and self._file_bytes - flushed_at >= self.flush_bytes)
+                ):
+                    t0 = METRICS.start()
+                    self._flush(f)
+                    METRICS.record("log_flush", t0)
+                    unflushed = 0
+                    flushed_at = self._file_bytes
+                    last_flush = now
+
+                if self._should_rotate(rows_in_file):
+                    f, w = self._rotate(f)
+                    rows_in_file = 0
+                    unflushed = 0
+                    flushed_at = self._file_bytes
+
+                if self._stop.is_set() and self._queue.empty():
+                    break
+            self._flush(f)
+        except OSError as e:
+            self.error = str(e)
+        finally:
+            if f is not None:
+                self._close(f)
+
+    def close(self, timeout=5.0):
+        """Writes out everything still queued, flushes and stops the thread."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_depth,
+            "batches": self.batches,
+            "flushes": self.flushes,
+            "rotations": self.rotations,
+        }
+
+
+def index_path(path):
+    """emg_stream.bin -> emg_stream.idx"""
+    return Path(path).with_suffix(".idx")
+
+
+class BinaryStreamWriter(StreamWriter):
+    """StreamWriter for the binary stream log.
+
+    Rows are (timestamp, session_id, level_number, value); the timestamp and
+    value go to the record file, and every change of session/level appends a
+    line to the index sidecar. Values that are not numbers (e.g. "" for a
+    failed read) are stored as NaN. A torn record left by a crash is cut off
+    before appending, so the file always holds whole records.
+    """
+
+    def __init__(self, path, header=None, **kwargs):
+        # header is fixed by the format; accepted so both writers take the same arguments
+        self._segment = None
+        self._records = 0
+        self._index = None
+        super().__init__(path, **kwargs)
+
+    def _open(self):
+        size = self.path.stat().st_size if self.path.exists() else 0
+        f = self.path.open("r+b" if size else "wb")
+        if size < BINARY_HEADER.size:
+            f.truncate(0)
+            f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, BINARY_RECORD_SIZE))
+            self._records = 0
+        else:
+            magic, version, record_size = BINARY_HEADER.unpack(f.read(BINARY_HEADER.size))
+            if magic != BINARY_MAGIC or record_size != BINARY_RECORD_SIZE:
+                f.close()
+                raise OSError(f"{self.path} is not a version {BINARY_VERSION} binary stream log")
+            self._records = (size - BINARY_HEADER.size) // BINARY_RECORD_SIZE
+            f.truncate(BINARY_HEADER.size + self._records * BINARY_RECORD_SIZE)
+        f.seek(0, os.SEEK_END)
+        self._file_bytes = BINARY_HEADER.size + self._records * BINARY_RECORD_SIZE
+
+        idx = index_path(self.path)
+        new_index = not idx.exists() or idx.stat().st_size == 0
+        self._index = idx.open("a", newline="", encoding="utf-8")
+        self._index_writer = csv.writer(self._index)
+        if new_index:
+            self._index_writer.writerow(INDEX_HEADER)
+        if self._segment is not None:
+            # A rotated file starts part-way through the current level
+            self._index_writer.writerow([*self._segment, self._records])
+        self._opened_at = time.monotonic()
+        return f, f
+
+    @staticmethod
+    def _as_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    def _write_batch(self, f, batch):
+        values = array.array("d")
+        for timestamp, session_id, level_number, value in batch:
+            segment = (session_id, level_number)
+            if segment != self._segment:
+                self._index_writer.writerow([session_id, level_number, self._records + len(values) // 2])
+                self._segment = segment
+            values.append(float(timestamp))
+            values.append(self._as_float(value))
+        if sys.byteorder != "little":
+            values.byteswap()
+        data = values.tobytes()
+        f.write(data)
+        self._records += len(values) // 2
+        self._file_bytes += len(data)
+        return len(data)
+
+    def _flush(self, f):
+        if self.durability != "none":
+            self._index.flush()
+            if self.durability == "fsync":
+                os.fsync(self._index.fileno())
+        super()._flush(f)
+
+    def _close(self, f):
+        f.close()
+        self._index.close()
+
+    def _rotated(self, index):
+        idx = index_path(self.path)
+        if idx.exists():
+            os.replace(idx, index_path(segment_path(self.path, index)))
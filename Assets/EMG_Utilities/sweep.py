@@ -0,0 +1,258 @@
+# Hyperparameter / cross-validation sweeps around model.build_model. Every
+# (parameters, fold) pair is one trial, run in its own worker process with a
+# capped thread count. Results are appended to a JSONL store as they finish,
+# and trials already in the store are skipped, so an interrupted sweep picks
+# up where it stopped. Every result carries a fingerprint of the data it was
+# trained on, so a store reused for another dataset (the next cohort) neither
+# skips its trials nor mixes the old accuracies into the summary.
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+# Data shared by the trials of one worker process, set by _init_worker
+_DATA = {}
+
+
+def param_grid(grid):
+    """Every combination of a {name: [values]} grid, as a list of dicts in a stable order."""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def make_folds(n, k=5, groups=None, seed=13):
+    """
+    k (train_idx, val_idx) folds over n rows. With groups (e.g. session ids)
+    every group lands in exactly one validation fold, so no group is on both
+    sides of a split.
+    """
+    rng = np.random.default_rng(seed)
+    if groups is None:
+        fold_of = np.empty(n, dtype=int)
+        fold_of[rng.permutation(n)] = np.arange(n) % k
+    else:
+        unique, inverse = np.unique(np.asarray(groups), return_inverse=True)
+        if len(unique) < k:
+            raise ValueError(f"Need at least k={k} groups, got {len(unique)}")
+        group_fold = np.empty(len(unique), dtype=int)
+        group_fold[rng.permutation(len(unique))] = np.arange(len(unique)) % k
+        fold_of = group_fold[inverse]
+    return [(np.flatnonzero(fold_of != i), np.flatnonzero(fold_of == i)) for i in range(k)]
+
+
+def data_fingerprint(X, y, groups=None):
+    """Short hash of the shapes and bytes of X, y and groups."""
+    digest = hashlib.sha1()
+    arrays = [np.asarray(X), np.asarray(y)]
+    if groups is not None:
+        # as strings, since the bytes of an object array are only pointers
+        arrays.append(np.asarray(groups).astype(str))
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def trial_id(params, fold, k, seed, data):
+    """Stable id of one trial on one dataset, used to skip it once it is in the results store."""
+    text = json.dumps({"params": params, "fold": fold, "k": k, "seed": seed, "data": data}, sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def load_results(path, data=None):
+    """
+    Every result in the JSONL store, or only those of one data fingerprint;
+    a torn last line from a crash is ignored.
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    results = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if data is None or result.get("data") == data:
+                results.append(result)
+    return results
+
+
+def limit_threads(threads):
+    """Caps the math libraries of this process to `threads` threads. Call before TensorFlow is imported."""
+    for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS",
+                 "TF_NUM_INTEROP_THREADS"):
+        os.environ[name] = str(threads)
+    import tensorflow as tf
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(threads)
+    except RuntimeError:
+        # TensorFlow was already initialised in this process
+        pass
+
+
+def _init_worker(X, y, threads):
+    if threads:
+        limit_threads(threads)
+    _DATA["X"] = X
+    _DATA["y"] = y
+
+
+def _run_trial(params, train_idx, val_idx, seed):
+    """Trains one model on the train rows and returns its validation loss and accuracy."""
+    import tensorflow as tf
+
+    from model import build_model
+
+    start = time.perf_counter()
+    tf.keras.utils.set_random_seed(seed)
+    X, y = _DATA["X"], _DATA["y"]
+    model = build_model(
+        input_dim=X.shape[1],
+        hidden_units=tuple(params.get("hidden_units", (16, 16))),
+        learning_rate=params.get("learning_rate"),
+    )
+    model.fit(X[train_idx], y[train_idx], epochs=params.get("epochs", 5), batch_size=params.get("batch_size", 32),
+              verbose=0)
+    loss, accuracy = model.evaluate(X[val_idx], y[val_idx], verbose=0)
+    return {"val_loss": float(loss), "val_accuracy": float(accuracy), "seconds": time.perf_counter() - start}
+
+
+def run_sweep(X, y, grid, k=5, groups=None, results_path="sweep_results.jsonl", workers=None, threads_per_worker=1,
+              seed=13, executor=None):
+    """
+    Cross-validates every combination in grid (keys: hidden_units,
+    learning_rate, batch_size, epochs) and appends one line per finished
+    trial to results_path. Trials already stored without an error are
+    skipped; a trial that raises is stored with its error and retried on
+    the next run.
+
+    Args:
+        groups: Optional per-row group ids (sessions) for leak-free folds.
+        workers: Worker processes (default: one per core).
+        threads_per_worker: Thread cap of every worker, so workers * threads
+            does not oversubscribe the CPU.
+        executor: Optional executor to run trials on instead of a new pool;
+            the data is then shared in this process.
+
+    Returns:
+        list: every result in the store for this data, old and new.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    data = data_fingerprint(X, y, groups)
+    folds = make_folds(len(X), k, groups, seed)
+    results_path = Path(results_path)
+    done = {r["trial_id"] for r in load_results(results_path, data) if not r.get("error")}
+
+    todo = []
+    for params in param_grid(grid):
+        for fold, (train_idx, val_idx) in enumerate(folds):
+            tid = trial_id(params, fold, k, seed, data)
+            if tid not in done:
+                todo.append((tid, params, fold, train_idx, val_idx))
+
+    own_executor = executor is None
+    if own_executor:
+        # spawn, not fork: a forked copy of a process that already loaded TensorFlow can deadlock
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_worker, initargs=(X, y, threads_per_worker))
+    else:
+        _init_worker(X, y, None)
+    try:
+        futures = {
+            executor.submit(_run_trial, params, train_idx, val_idx, seed): (tid, params, fold)
+            for tid, params, fold, train_idx, val_idx in todo
+        }
+        with results_path.open("a", encoding="utf-8") as f:
+            for future in as_completed(futures):
+                tid, params, fold = futures[future]
+                result = {"trial_id": tid, "params": params, "fold": fold, "k": k, "seed": seed, "data": data}
+                try:
+                    result.update(future.result())
+                except Exception as e:
+                    result["error"] = repr(e)
+                f.write(json.dumps(result) + "\n")
+                f.flush()
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+    return load_results(results_path, data)
+
+
+def summarize(results, k=None, data=None):
+    """
+    Mean and std validation accuracy per parameter set over its successful
+    folds, best first. With k, only parameter sets with all k folds done;
+    with data, only results of that data fingerprint.
+    """
+    by_params = {}
+    for r in results:
+        if r.get("error") or (data is not None and r.get("data") != data):
+            continue
+        entry = by_params.setdefault(json.dumps(r["params"], sort_keys=True), {"params": r["params"], "folds": {}})
+        entry["folds"][r["fold"]] = r["val_accuracy"]
+    summary = []
+    for entry in by_params.values():
+        if k is not None and len(entry["folds"]) < k:
+            continue
+        accuracies = np.array(list(entry["folds"].values()))
+        summary.append({"params": entry["params"], "folds": len(accuracies),
+                        "mean_accuracy": float(accuracies.mean()), "std_accuracy": float(accuracies.std())})
+    return sorted(summary, key=lambda s: -s["mean_accuracy"])
+
+
+def _hidden(text):
+    # "32,16" -> [32, 16]
+    return [int(units) for units in text.split(",") if units]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter sweep for the EMG model.")
+    parser.add_argument("data", nargs="?", default="emg_features.csv", help="Feature CSV or feature dataset directory.")
+    parser.add_argument("--hidden", type=_hidden, nargs="+", default=[[16, 16]],
+                        help="Hidden layer widths per architecture, e.g. --hidden 16,16 32 64,32")
+    parser.add_argument("--lr", type=float, nargs="+", default=[0.001])
+    parser.add_argument("--batch", type=int, nargs="+", default=[32])
+    parser.add_argument("--epochs", type=int, nargs="+", default=[20])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core).")
+    parser.add_argument("--threads", type=int, default=1, help="Threads per worker.")
+    parser.add_argument("--results", default="sweep_results.jsonl")
+    parser.add_argument("--seed", type=int, default=13)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from feature_dataset import is_feature_dataset, load_feature_dataset
+    from model import load_and_preprocess_data
+
+    args = parse_args()
+    groups = None
+    if is_feature_dataset(args.data):
+        # Folds by session, and only rows with a known label
+        X, y, info = load_feature_dataset(args.data)
+        keep = y >= 0
+        X, y, groups = X[keep], y[keep], info["session_id"][keep]
+    else:
+        X, y = load_and_preprocess_data(args.data)
+    grid = {"hidden_units": args.hidden, "learning_rate": args.lr, "batch_size": args.batch, "epochs": args.epochs}
+    results = run_sweep(X, y, grid, k=args.folds, groups=groups, results_path=args.results, workers=args.workers,
+                        threads_per_worker=args.threads, seed=args.seed)
+    for row in summarize(results, k=args.folds)[:10]:
+        print(f"{row['mean_accuracy'] * 100:6.2f}% +/- {row['std_accuracy'] * 100:5.2f}  {row['params']}")
+    succeeded = {r["trial_id"] for r in results if not r.get("error")}
+    errors = {r["trial_id"] for r in results if r.get("error")} - succeeded
+    if errors:
+        print(f"{len(errors)} trials failed, re-run to retry them")
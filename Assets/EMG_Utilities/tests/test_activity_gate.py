@@ -0,0 +1,109 @@
+import importlib.util
+import pathlib
+import random
+import sys
+
+import pytest
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_ACTIVITY_GATE_MODULE = _load_module("activity_gate")
+ActivityGate = _ACTIVITY_GATE_MODULE.ActivityGate
+
+MODEL = pathlib.Path(__file__).resolve().parents[1] / "bg_model.npz"
+
+
+def _session(rest=600, burst=200, seed=0):
+    """Resting envelope noise around 10, one contraction, rest again."""
+    rng = random.Random(seed)
+    quiet = lambda n: [10 + rng.gauss(0, 1) for _ in range(n)]  # noqa: E731
+    return quiet(rest) + [300 + rng.gauss(0, 30) for _ in range(burst)] + quiet(rest)
+
+
+def test_gate_opens_at_onset_and_closes_after_hold():
+    signal = _session()
+    gate = ActivityGate(hold=50, warmup=100)
+    states = [gate.update(value) for value in signal]
+
+    # Open during warmup, closed at rest once the baseline has settled
+    assert all(states[:100])
+    assert not any(states[200:600])
+    # Opens on the first contraction sample, stays open through it
+    assert states[600] and all(states[600:800])
+    # Closes again, but only after hold quiet samples
+    closed = states.index(False, 800)
+    assert 850 <= closed < 900
+    assert not any(states[closed:])
+    assert gate.stats()["activations"] == 1
+    assert 9.5 < gate.baseline < 10.5
+
+
+def test_gate_rejects_off_threshold_above_on_threshold():
+    with pytest.raises(ValueError):
+        ActivityGate(on_factor=2.0, off_factor=3.0)
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_gated_decisions_match_while_active_and_skip_work_at_rest(incremental):
+    np = pytest.importorskip("numpy")
+    load_model = _load_module("inference").load_model
+    livestream_decisions = _load_module("livestream").livestream_decisions
+
+    model = load_model(str(MODEL))
+    signal = _session()
+    chunks = [signal[i:i + 7] for i in range(0, len(signal), 7)]
+
+    plain = list(livestream_decisions(iter(chunks), model, window=50, hop=5, incremental=incremental))
+    gate = ActivityGate()
+    gated = list(livestream_decisions(iter(chunks), model, window=50, hop=5, incremental=incremental, gate=gate))
+
+    assert [d.sample_index for d in gated] == [d.sample_index for d in plain]
+    # Every window ending while the gate is open is computed exactly as without it
+    active = [i for i, d in enumerate(plain) if 600 < d.sample_index <= 850]
+    np.testing.assert_allclose([gated[i].probability for i in active], [plain[i].probability for i in active],
+                               rtol=1e-6, atol=1e-9)
+    assert [gated[i].prediction for i in active] == [plain[i].prediction for i in active]
+
+    stats = gate.stats()
+    assert stats["computed_windows"] + stats["skipped_windows"] == len(plain)
+    assert stats["skipped_windows"] > len(plain) // 2
+    # Skipped windows repeat the decision of the first window at rest
+    rest = [d.probability for d in gated if 300 < d.sample_index <= 600]
+    assert len(set(rest)) == 1
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+@pytest.mark.parametrize("hold", [5, 10])
+def test_rest_decision_is_not_cached_from_the_end_of_a_contraction(incremental, hold):
+    np = pytest.importorskip("numpy")
+    NumpyModel = _load_module("inference").NumpyModel
+    livestream_decisions = _load_module("livestream").livestream_decisions
+
+    # Fires only on a large waveform length: rest windows have WL ~ 55,
+    # windows touching the contraction several hundred or more
+    kernel = np.zeros((11, 1))
+    kernel[0, 0] = 0.05
+    model = NumpyModel([kernel], [np.array([-25.0])], ["sigmoid"])
+    signal = _session()
+    chunks = [signal[i:i + 7] for i in range(0, len(signal), 7)]
+
+    plain = list(livestream_decisions(iter(chunks), model, window=50, hop=5, incremental=incremental))
+    gate = ActivityGate(hold=hold)
+    gated = list(livestream_decisions(iter(chunks), model, window=50, hop=5, incremental=incremental, gate=gate))
+
+    # hold is shorter than the window, so the gate closes while the window
+    # still holds the contraction; those windows must not become the rest decision
+    assert [d.prediction for d in gated] == [d.prediction for d in plain]
+    assert any(d.prediction for d in plain)
+    assert not any(d.prediction for d in gated if d.sample_index > 850)
+    assert gate.stats()["skipped_windows"] > 0
@@ -0,0 +1,77 @@
+import importlib.util
+import json
+import pathlib
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_BENCHMARK_MODULE = _load_module("benchmark")
+compare = _BENCHMARK_MODULE.compare
+main = _BENCHMARK_MODULE.main
+run_benchmarks = _BENCHMARK_MODULE.run_benchmarks
+
+
+def _report(**values):
+    return {"results": {name: {"value": value, "unit": "x", "higher_is_better": not name.endswith("latency")}
+                        for name, value in values.items()}}
+
+
+def test_compare_flags_regressions_in_the_bad_direction_only():
+    baseline = _report(throughput=1000.0, latency=10.0, other=5.0)
+    report = _report(throughput=800.0, latency=9.0, new=1.0)
+
+    rows = {row["name"]: row for row in compare(report, baseline, threshold=0.1)}
+    assert set(rows) == {"throughput", "latency"}
+    assert rows["throughput"]["regressed"] and rows["throughput"]["change"] == pytest.approx(-0.2)
+    assert not rows["latency"]["regressed"] and rows["latency"]["change"] == pytest.approx(0.1)
+
+    rows = {row["name"]: row for row in compare(report, baseline, threshold=0.1, thresholds={"throughput": 0.25})}
+    assert not rows["throughput"]["regressed"]
+
+
+def test_quick_reader_and_logger_benchmarks_report_positive_rates():
+    report = run_benchmarks(only=["reader", "logger"], quick=True)
+
+    assert set(report["results"]) == {
+        "reader.line", "reader.bulk",
+        "logger.csv.write", "logger.csv.throughput", "logger.binary.write", "logger.binary.throughput",
+    }
+    assert all(result["value"] > 0 for result in report["results"].values())
+    assert report["meta"]["quick"] is True
+    # the committed baseline covers these metrics
+    baseline = json.loads(_BENCHMARK_MODULE.BASELINE_PATH.read_text())
+    assert set(report["results"]) <= set(baseline["results"])
+    # the fake port is removed again
+    assert not isinstance(sys.modules.get("serial"), _BENCHMARK_MODULE._BenchSerialModule)
+
+
+def test_main_fails_when_a_metric_regresses_against_the_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(_BENCHMARK_MODULE, "BENCHMARKS", {"fake": lambda quick=False: {
+        "fake.rate": {"value": 50.0, "unit": "ops/s", "higher_is_better": True}}})
+    (tmp_path / "baseline.json").write_text(json.dumps(_report(**{"fake.rate": 100.0})))
+
+    code = main(["--output", str(tmp_path / "out.json"), "--baseline", str(tmp_path / "baseline.json")])
+
+    assert code == 1
+    assert json.loads((tmp_path / "out.json").read_text())["results"]["fake.rate"]["value"] == 50.0
+    assert main(["--output", str(tmp_path / "out.json"), "--no-baseline"]) == 0
+
+    # without --baseline the stored baseline is used, and a missing one is skipped
+    monkeypatch.setattr(_BENCHMARK_MODULE, "BASELINE_PATH", tmp_path / "baseline.json")
+    assert main(["--output", str(tmp_path / "out.json")]) == 1
+    monkeypatch.setattr(_BENCHMARK_MODULE, "BASELINE_PATH", tmp_path / "missing.json")
+    assert main(["--output", str(tmp_path / "out.json")]) == 0
@@ -5,7 +5,10 @@ import time
 
 import pytest
 
-_EMG_PATH = pathlib.Path(__file__).resolve().parents[1] / "emg.py"
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# emg.py imports ring_buffer lazily when a ring buffer is requested
+sys.path.insert(0, str(_EMG_DIR))
+_EMG_PATH = _EMG_DIR / "emg.py"
 _SPEC = importlib.util.spec_from_file_location("emg_module", _EMG_PATH)
 _EMG_MODULE = importlib.util.module_from_spec(_SPEC)
 _SPEC.loader.exec_module(_EMG_MODULE)
@@ -31,13 +34,58 @@ class _FakeSerial:
         self.closed = True
 
 
+class _FakeBulkSerial:
+    """Serves a list of byte chunks through in_waiting/read, like pyserial."""
+
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+        self._pending = b""
+        self.closed = False
+
+    @property
+    def in_waiting(self):
+        if not self._pending and self._chunks:
+            self._pending = self._chunks.pop(0)
+        return len(self._pending)
+
+    def read(self, size=1):
+        time.sleep(0.002)
+        if not self._pending and self._chunks:
+            self._pending = self._chunks.pop(0)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def close(self):
+        self.closed = True
+
+
+class _FailingBulkSerial:
+    """Port whose every read raises, like an unplugged device."""
+
+    def __init__(self, _chunks=()):
+        self.reads = 0
+        self.closed = False
+
+    @property
+    def in_waiting(self):
+        self.reads += 1
+        raise OSError("device unplugged")
+
+    def read(self, size=1):
+        raise OSError("device unplugged")
+
+    def close(self):
+        self.closed = True
+
+
 class _FakeSerialModule:
-    def __init__(self, lines):
+    def __init__(self, lines, serial_class=_FakeSerial):
         self._lines = lines
+        self._serial_class = serial_class
         self.instance = None
 
     def Serial(self, *args, **kwargs):
-        self.instance = _FakeSerial(self._lines)
+        self.instance = self._serial_class(self._lines)
         return self.instance
 
 
@@ -54,8 +102,8 @@ def _wait_until(predicate, timeout=0.3, poll=0.005):
 def fake_serial_module(monkeypatch):
     created = {}
 
-    def install(lines):
-        module = _FakeSerialModule(lines)
+    def install(lines, serial_class=_FakeSerial):
+        module = _FakeSerialModule(lines, serial_class)
         created["module"] = module
         monkeypatch.setitem(sys.modules, "serial", module)
         return module
@@ -82,6 +130,20 @@ def test_emg_reader_recovers_after_malformed_line(fake_serial_module):
     try:
         # The malformed line should be ignored, and then valid data should update state.
         assert _wait_until(lambda: reader.filtered == 3.0 and reader.envelope == 4.0)
+        assert reader.parse_errors >= 1
+        assert reader.parsed_count == 1
+    finally:
+        reader.stop()
+
+
+def test_emg_reader_idle_port_timeouts_are_not_parse_errors(fake_serial_module):
+    # No data: every readline() times out and returns b""
+    fake_serial_module([b"\r\n", b"5,6\n"])
+    reader = EMGReader(port="COM_TEST")
+    try:
+        assert _wait_until(lambda: reader.envelope == 6.0)
+        time.sleep(0.05)
+        assert reader.parse_errors == 0
     finally:
         reader.stop()
 
@@ -95,3 +157,126 @@ def test_emg_reader_stop_stops_loop_and_closes_serial(fake_serial_module):
 
     assert reader.running is False
     assert module.instance.closed is True
+
+
+def test_emg_reader_bulk_mode_keeps_every_sample_across_split_lines(fake_serial_module):
+    # Lines are split across reads and several arrive in one read.
+    chunks = [b"1,10\n2,2", b"0\n3,30\n4,", b"40\nbad\n5,50\n"]
+    fake_serial_module(chunks, serial_class=_FakeBulkSerial)
+    reader = EMGReader(port="COM_TEST", bulk=True)
+    received = []
+    try:
+        assert _wait_until(lambda: received.extend(reader.read_samples()) or len(received) == 5)
+    finally:
+        reader.stop()
+
+    assert received == [(1.0, 10.0), (2.0, 20.0), (3.0, 30.0), (4.0, 40.0), (5.0, 50.0)]
+    assert reader.parse_errors == 1
+    assert reader.last_error[0] == b"bad"
+    assert (reader.filtered, reader.envelope) == (5.0, 50.0)
+
+
+def test_emg_reader_bulk_mode_timestamps_samples(fake_serial_module):
+    fake_serial_module([b"1,2\n3,4\n"], serial_class=_FakeBulkSerial)
+    before = time.time()
+    reader = EMGReader(port="COM_TEST", bulk=True, timestamps=True)
+    received = []
+    try:
+        assert _wait_until(lambda: received.extend(reader.read_samples()) or len(received) == 2)
+    finally:
+        reader.stop()
+
+    assert [sample[1:] for sample in received] == [(1.0, 2.0), (3.0, 4.0)]
+    assert all(sample[0] >= before for sample in received)
+
+
+def test_emg_reader_bulk_mode_backs_off_on_read_errors(fake_serial_module):
+    module = fake_serial_module([], serial_class=_FailingBulkSerial)
+    reader = EMGReader(port="COM_TEST", bulk=True)
+    try:
+        time.sleep(0.2)
+    finally:
+        reader.stop()
+
+    # Without the back-off the loop retries thousands of times in 0.2 s
+    assert 1 <= module.instance.reads <= 10
+    assert "unplugged" in reader.last_error[1]
+
+
+def test_emg_reader_bulk_queue_is_bounded(monkeypatch, fake_serial_module):
+    fake_serial_module([])
+    monkeypatch.setattr(_EMG_MODULE, "MAX_QUEUED_SAMPLES", 3)
+    reader = EMGReader(port="COM_TEST", bulk=True, start=False)
+
+    reader.feed(b"1,1\n2,2\n")
+    reader.feed(b"3,3\n4,4\n5,5\n")
+
+    assert reader.read_samples() == [(3.0, 3.0), (4.0, 4.0), (5.0, 5.0)]
+    assert reader.dropped_samples == 2
+
+
+def test_line_parser_counts_wrong_field_count():
+    parser = _EMG_MODULE.LineParser()
+
+    assert parser.feed(b"1,2,3\n4,5\n6") == [(4.0, 5.0)]
+    assert parser.errors == 1
+    assert parser.feed(b",7\n") == [(6.0, 7.0)]
+    assert parser.parsed == 2
+
+
+def test_emg_reader_ring_buffer_windowed_reads(fake_serial_module):
+    pytest.importorskip("numpy")
+    lines = [f"{i},{i * 10}\n".encode() for i in range(8)]
+    fake_serial_module([b"".join(lines)], serial_class=_FakeBulkSerial)
+    reader = EMGReader(port="COM_TEST", bulk=True, buffer_size=16)
+    try:
+        assert _wait_until(lambda: reader.buffer.total == 8)
+        assert reader.latest(3)[:, 2].tolist() == [50.0, 60.0, 70.0]
+
+        rows, cursor = reader.since(6)
+        assert rows[:, 1].tolist() == [6.0, 7.0]
+        assert cursor == 8
+
+        assert reader.read_samples() == [(float(i), float(i * 10)) for i in range(8)]
+        assert reader.read_samples() == []
+    finally:
+        reader.stop()
+
+
+def test_emg_reader_line_mode_fills_ring_buffer(fake_serial_module):
+    pytest.importorskip("numpy")
+    fake_serial_module([b"1,2\n", b"3,4\n"])
+    reader = EMGReader(port="COM_TEST", buffer_size=4)
+    try:
+        assert _wait_until(lambda: reader.buffer.total == 2)
+        assert reader.latest(2)[:, 1:].tolist() == [[1.0, 2.0], [3.0, 4.0]]
+    finally:
+        reader.stop()
+
+
+def test_emg_reader_windowed_api_requires_buffer(fake_serial_module):
+    fake_serial_module([])
+    reader = EMGReader(port="COM_TEST")
+    try:
+        with pytest.raises(RuntimeError):
+            reader.latest(5)
+    finally:
+        reader.stop()
+
+
+def test_emg_reader_parses_every_channel_into_the_ring(fake_serial_module):
+    pytest.importorskip("numpy")
+    lines = [f"{i},{i * 10},{-i},{-i * 10},{i + 0.5},{i * 100}\n".encode() for i in range(6)]
+    fake_serial_module([b"".join(lines[:3]), b"bad,line\n", b"".join(lines[3:])], serial_class=_FakeBulkSerial)
+    reader = EMGReader(port="COM_TEST", bulk=True, buffer_size=16, n_channels=3)
+    try:
+        assert _wait_until(lambda: reader.buffer.total == 6)
+        assert reader.buffer.latest(1).shape == (1, 7)
+        assert (reader.filtered, reader.envelope) == (5.0, 50.0)
+        assert reader.last_sample == (5.0, 50.0, -5.0, -50.0, 5.5, 500.0)
+        assert reader.parse_errors == 1
+
+        chunk = next(reader.chunks(column=reader.envelope_columns, cursor=4))
+        assert chunk.tolist() == [[40.0, -40.0, 400.0], [50.0, -50.0, 500.0]]
+    finally:
+        reader.stop()
@@ -0,0 +1,66 @@
+import importlib.util
+import os
+import pathlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_FEATURE_CACHE_MODULE = _load_module("feature_cache")
+FeatureCache = _FEATURE_CACHE_MODULE.FeatureCache
+
+
+def test_key_changes_with_data_parameters_and_feature_version(monkeypatch):
+    values = np.arange(100.0)
+    key = FeatureCache.key(values, window=50, hop=50, ar_order=4)
+
+    assert FeatureCache.key(values.copy(), window=50, hop=50, ar_order=4) == key
+    assert FeatureCache.key(values + 1e-9, window=50, hop=50, ar_order=4) != key
+    assert FeatureCache.key(values, window=50, hop=25, ar_order=4) != key
+    monkeypatch.setattr(_FEATURE_CACHE_MODULE, "FEATURE_VERSION", _FEATURE_CACHE_MODULE.FEATURE_VERSION + 1)
+    assert FeatureCache.key(values, window=50, hop=50, ar_order=4) != key
+
+
+def test_get_returns_what_was_put_and_counts_hits(tmp_path):
+    cache = FeatureCache(tmp_path / "cache")
+    features = np.random.default_rng(0).normal(size=(5, 11))
+
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, features)
+    np.testing.assert_array_equal(cache.get("ab" * 32), features)
+    # survives reopening, size included
+    reopened = FeatureCache(tmp_path / "cache")
+    assert reopened.size == cache.size > 0
+    np.testing.assert_array_equal(reopened.get("ab" * 32), features)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    entry = np.zeros((10, 11))
+    probe = FeatureCache(tmp_path / "probe")
+    probe.put("00" * 32, entry)
+    cache = FeatureCache(tmp_path / "cache", max_bytes=int(probe.size * 2.5))
+
+    for i, key in enumerate(("aa" * 32, "bb" * 32)):
+        cache.put(key, entry)
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    cache.get("aa" * 32)  # now newer than bb
+    cache.put("cc" * 32, entry)
+
+    assert cache.evictions == 1
+    assert cache.get("bb" * 32) is None
+    assert cache.get("aa" * 32) is not None and cache.get("cc" * 32) is not None
+    assert cache.size <= cache.max_bytes
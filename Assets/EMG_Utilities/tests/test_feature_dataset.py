@@ -0,0 +1,89 @@
+import importlib.util
+import json
+import pathlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_FEATURE_DATASET_MODULE = _load_module("feature_dataset")
+FeatureDatasetWriter = _FEATURE_DATASET_MODULE.FeatureDatasetWriter
+feature_columns = _FEATURE_DATASET_MODULE.feature_columns
+load_feature_dataset = _FEATURE_DATASET_MODULE.load_feature_dataset
+
+
+def test_dataset_round_trips_typed_columns_across_shards(tmp_path):
+    rng = np.random.default_rng(0)
+    blocks = [(rng.normal(size=(n, 11)), label, session, level)
+              for n, label, session, level in [(7, 0, "s1", 1), (5, 1, "s1", 2), (9, 1, "s2", 4)]]
+    writer = FeatureDatasetWriter(tmp_path / "features", window=50, hop=25, shard_rows=8)
+    for block in blocks:
+        writer.append(*block)
+    writer.close()
+
+    X, y, info = load_feature_dataset(tmp_path / "features")
+    np.testing.assert_array_equal(X, np.vstack([b[0] for b in blocks]))
+    assert X.dtype == np.float64
+    assert y.tolist() == [0] * 7 + [1] * 14
+    assert info["session_id"].tolist() == ["s1"] * 12 + ["s2"] * 9
+    assert info["level_number"].tolist() == [1] * 7 + [2] * 5 + [4] * 9
+    assert (info["window"], info["hop"], info["ar_order"]) == (50, 25, 4)
+    assert info["feature_columns"] == feature_columns(4)
+    assert feature_columns(2) == ["WL", "AAC", "DASDV", "AR_1", "AR_2", "CC_1", "CC_2"]
+    # blocks are not split, a shard closes once it reaches shard_rows
+    assert [shard["rows"] for shard in info["shards"]] == [12, 9]
+    assert sum(shard["rows"] for shard in info["shards"]) == info["rows"] == 21
+
+
+def test_rewriting_a_dataset_replaces_old_shards(tmp_path):
+    for n in (30, 4):
+        writer = FeatureDatasetWriter(tmp_path / "features", window=50, hop=50, shard_rows=10)
+        writer.append(np.ones((n, 11)), 0, "s", 1)
+        writer.close()
+
+    X, _, _ = load_feature_dataset(tmp_path / "features")
+    assert len(X) == 4
+    assert sorted(p.name for p in (tmp_path / "features").glob("part-*.npz")) == ["part-00000.npz"]
+    assert json.loads((tmp_path / "features" / "schema.json").read_text())["rows"] == 4
+
+
+def test_interrupted_rewrite_leaves_no_stale_schema(tmp_path):
+    writer = FeatureDatasetWriter(tmp_path / "features", window=50, hop=50)
+    writer.append(np.ones((3, 11)), 0, "s", 1)
+    writer.close()
+
+    writer = FeatureDatasetWriter(tmp_path / "features", window=50, hop=50, shard_rows=2)
+    writer.append(np.ones((5, 11)), 0, "s", 1)
+    # never closed: the shard on disk must not be paired with the previous run's schema
+    assert not _FEATURE_DATASET_MODULE.is_feature_dataset(tmp_path / "features")
+
+
+def test_writer_rejects_wrong_feature_width(tmp_path):
+    writer = FeatureDatasetWriter(tmp_path / "features", window=50, hop=50, ar_order=4)
+    with pytest.raises(ValueError):
+        writer.append(np.ones((3, 9)), 0, "s", 1)
+
+
+def test_writer_checks_level_labels(tmp_path):
+    writer = FeatureDatasetWriter(tmp_path / "features", window=50, hop=50)
+    writer.append(np.ones((2, 11)), 0, "s", np.float64(2.0))
+    with pytest.raises(ValueError, match="level_number must be an integer, got 2.5"):
+        writer.append(np.ones((2, 11)), 0, "s", 2.5)
+    with pytest.raises(ValueError, match="level_number must be an integer"):
+        writer.append(np.ones((2, 11)), 0, "s", "two")
+    writer.close()
+
+    assert load_feature_dataset(tmp_path / "features")[2]["level_number"].tolist() == [2, 2]
@@ -0,0 +1,110 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("statsmodels")
+
+_FE_PATH = pathlib.Path(__file__).resolve().parents[1] / "feature_engineering.py"
+_SPEC = importlib.util.spec_from_file_location("feature_engineering_module", _FE_PATH)
+_FE_MODULE = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(_FE_MODULE)
+calculate_emg_features = _FE_MODULE.calculate_emg_features
+calculate_emg_features_batch = _FE_MODULE.calculate_emg_features_batch
+
+
+def _flatten(features):
+    return np.concatenate(
+        (
+            [features["WL"], features["AAC"], features["DASDV"]],
+            features["AR_Coeffs"],
+            features["Cepstral_Coeffs"],
+        )
+    )
+
+
+def test_batch_features_match_per_window_features():
+    rng = np.random.default_rng(0)
+    segments = rng.normal(size=(20, 50)).cumsum(axis=1)
+
+    batch = calculate_emg_features_batch(segments)
+    expected = np.stack([_flatten(calculate_emg_features(s)) for s in segments])
+
+    assert batch.shape == (20, 11)
+    np.testing.assert_allclose(batch, expected, rtol=1e-8, atol=1e-10)
+
+
+def test_batch_features_follow_ar_order():
+    rng = np.random.default_rng(1)
+    segments = rng.normal(size=(3, 40))
+
+    batch = calculate_emg_features_batch(segments, ar_order=2)
+    expected = np.stack([_flatten(calculate_emg_features(s, ar_order=2)) for s in segments])
+
+    assert batch.shape == (3, 7)
+    np.testing.assert_allclose(batch, expected, rtol=1e-8, atol=1e-10)
+
+
+def test_batch_features_reject_one_dimensional_input():
+    with pytest.raises(ValueError):
+        calculate_emg_features_batch(np.zeros(50))
+
+
+@pytest.mark.parametrize("method", ["ols", "yule_walker", "burg"])
+def test_ar_methods_recover_a_known_process(method):
+    # Long AR(2) series: every estimator converges to the true coefficients
+    rng = np.random.default_rng(2)
+    noise = rng.normal(size=(2, 5000))
+    x = np.zeros_like(noise)
+    for t in range(2, x.shape[1]):
+        x[:, t] = 0.6 * x[:, t - 1] - 0.3 * x[:, t - 2] + noise[:, t]
+
+    coeffs = _FE_MODULE.ar_coefficients(x, ar_order=2, method=method)
+
+    np.testing.assert_allclose(coeffs, [[0.6, -0.3]] * 2, atol=0.05)
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_ar_methods_match_statsmodels_references():
+    from statsmodels.regression.linear_model import burg, yule_walker
+
+    rng = np.random.default_rng(3)
+    segments = rng.normal(size=(10, 50)).cumsum(axis=1)
+
+    np.testing.assert_allclose(
+        _FE_MODULE.ar_coefficients(segments, 4, "ols"), _FE_MODULE.ar_coefficients(segments, 4, "autoreg"),
+        rtol=1e-8, atol=1e-10,
+    )
+    np.testing.assert_allclose(
+        _FE_MODULE.ar_coefficients(segments, 4, "yule_walker"),
+        [yule_walker(s, 4, method="mle")[0] for s in segments],
+        rtol=1e-8, atol=1e-10,
+    )
+    np.testing.assert_allclose(
+        _FE_MODULE.ar_coefficients(segments, 4, "burg"), [burg(s, 4)[0] for s in segments], rtol=1e-8, atol=1e-10,
+    )
+
+
+def test_ar_methods_keep_flat_windows_finite_and_reject_unknown_names():
+    flat = np.ones((2, 50))
+    for method in ("yule_walker", "burg"):
+        np.testing.assert_array_equal(calculate_emg_features_batch(flat, ar_method=method)[:, 3:], 0.0)
+    single = calculate_emg_features(np.random.default_rng(4).normal(size=50), ar_method="burg")
+    assert np.all(np.isfinite(single["AR_Coeffs"]))
+    with pytest.raises(ValueError):
+        calculate_emg_features_batch(flat, ar_method="lstsq")
+
+
+def test_batch_features_of_multichannel_windows_are_per_channel_blocks():
+    rng = np.random.default_rng(5)
+    segments = rng.normal(size=(6, 50, 4)).cumsum(axis=1)
+
+    batch = calculate_emg_features_batch(segments)
+
+    assert batch.shape == (6, 44)
+    for channel in range(4):
+        np.testing.assert_allclose(
+            batch[:, channel * 11:(channel + 1) * 11], calculate_emg_features_batch(segments[:, :, channel]),
+            rtol=1e-12, atol=1e-12,
+        )
@@ -0,0 +1,222 @@
+import csv
+import importlib
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_FEATURE_ENGINEERING_MODULE = _load_module("feature_engineering")
+calculate_emg_features_batch = _FEATURE_ENGINEERING_MODULE.calculate_emg_features_batch
+level_to_output = _FEATURE_ENGINEERING_MODULE.level_to_output
+_FEATURE_PIPELINE_MODULE = _load_module("feature_pipeline")
+StreamWindower = _FEATURE_PIPELINE_MODULE.StreamWindower
+extract_stream_features = _FEATURE_PIPELINE_MODULE.extract_stream_features
+_STREAM_WRITER_MODULE = _load_module("stream_writer")
+BinaryStreamWriter = _STREAM_WRITER_MODULE.BinaryStreamWriter
+
+
+def _stream_rows():
+    rng = np.random.default_rng(3)
+    signals = {("s1", 1): rng.normal(size=230), ("s1", 2): rng.normal(size=120), ("s2", 4): rng.normal(size=75)}
+    rows = []
+    t = 0.0
+    for (session_id, level_number), values in signals.items():
+        for v in values:
+            rows.append((t, session_id, level_number, float(v)))
+            t += 0.01
+    return signals, rows
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["timestamp", "session_id", "level_number", "value"])
+        w.writerows([f"{t:.3f}", s, lvl, repr(v)] for t, s, lvl, v in rows)
+
+
+def _read_features(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def _expected(signals, window=50):
+    expected = []
+    for (session_id, level_number), values in signals.items():
+        n = len(values) // window
+        for features in calculate_emg_features_batch(values[:n * window].reshape(n, window)):
+            expected.append((session_id, level_number, level_to_output(level_number), features))
+    return expected
+
+
+def _check(rows, expected):
+    assert len(rows) == len(expected)
+    for row, (session_id, level_number, label, features) in zip(rows, expected):
+        assert (row["session_id"], int(row["level_number"]), int(row["Output"])) == (session_id, level_number, label)
+        got = [float(row["WL"]), float(row["AAC"]), float(row["DASDV"])]
+        got += np.fromstring(row["AR"].strip("[]"), sep=" ").tolist()
+        got += np.fromstring(row["CC"].strip("[]"), sep=" ").tolist()
+        np.testing.assert_allclose(got, features, rtol=1e-12, atol=1e-12)
+
+
+def test_csv_stream_features_match_whole_level_batches_across_chunks(tmp_path):
+    signals, rows = _stream_rows()
+    _write_csv(tmp_path / "emg_stream.csv", rows)
+
+    counts = extract_stream_features(tmp_path / "emg_stream.csv", tmp_path / "features.csv", chunksize=37)
+
+    expected = _expected(signals)
+    assert counts["samples"] == len(rows)
+    assert counts["windows"] == len(expected) == 4 + 2 + 1
+    assert counts["labels"] == {0: 4, 1: 3}
+    _check(_read_features(tmp_path / "features.csv"), expected)
+
+
+def test_binary_stream_gives_the_same_features(tmp_path):
+    signals, rows = _stream_rows()
+    writer = BinaryStreamWriter(tmp_path / "emg_stream.bin")
+    for row in rows:
+        writer.write(row)
+    writer.close()
+
+    extract_stream_features(tmp_path / "emg_stream.bin", tmp_path / "features.csv", chunksize=64)
+
+    _check(_read_features(tmp_path / "features.csv"), _expected(signals))
+
+
+def test_windower_carries_tails_per_key_and_honours_hop():
+    windower = StreamWindower(window=4, hop=2)
+    assert windower.feed("a", [0, 1, 2]).shape == (0, 4)
+    assert windower.feed("b", [10, 11]).shape == (0, 4)
+    np.testing.assert_array_equal(windower.feed("a", [3, 4, 5]), [[0, 1, 2, 3], [2, 3, 4, 5]])
+    np.testing.assert_array_equal(windower.feed("a", [6, 7]), [[4, 5, 6, 7]])
+    np.testing.assert_array_equal(windower.feed("b", [12, 13]), [[10, 11, 12, 13]])
+
+
+def test_windower_skips_the_gap_between_windows_across_feeds():
+    windower = StreamWindower(window=2, hop=5)
+    np.testing.assert_array_equal(windower.feed("a", [0, 1, 2]), [[0, 1]])
+    assert windower.feed("a", [3]).shape == (0, 2)
+    np.testing.assert_array_equal(windower.feed("a", [4, 5, 6, 7, 8, 9, 10, 11]), [[5, 6], [10, 11]])
+    assert windower._tails == {} and windower._skips == {"a": 3}
+
+    windower.flush("a")
+    np.testing.assert_array_equal(windower.feed("a", [20, 21]), [[20, 21]])
+    assert windower._tails == {} and windower._skips == {"a": 3}
+
+
+def test_chunked_features_match_one_pass_with_hop_larger_than_window(tmp_path):
+    signals, rows = _stream_rows()
+    _write_csv(tmp_path / "emg_stream.csv", rows)
+
+    extract_stream_features(tmp_path / "emg_stream.csv", tmp_path / "chunked.csv", window=20, hop=35, chunksize=13)
+    extract_stream_features(tmp_path / "emg_stream.csv", tmp_path / "whole.csv", window=20, hop=35,
+                            chunksize=len(rows))
+
+    expected = []
+    for (session_id, level_number), values in signals.items():
+        windows = np.lib.stride_tricks.sliding_window_view(values, 20)[::35]
+        for features in calculate_emg_features_batch(windows):
+            expected.append((session_id, level_number, level_to_output(level_number), features))
+    _check(_read_features(tmp_path / "chunked.csv"), expected)
+    assert _read_features(tmp_path / "chunked.csv") == _read_features(tmp_path / "whole.csv")
+
+
+def test_dataset_output_loads_into_the_same_X_y_as_csv(tmp_path):
+    load_and_preprocess_data = _load_module("model").load_and_preprocess_data
+
+    signals, rows = _stream_rows()
+    _write_csv(tmp_path / "emg_stream.csv", rows)
+    extract_stream_features(tmp_path / "emg_stream.csv", tmp_path / "features.csv", hop=25, chunksize=40)
+    extract_stream_features(tmp_path / "emg_stream.csv", tmp_path / "features", hop=25, chunksize=40)
+
+    X_csv, y_csv = load_and_preprocess_data(tmp_path / "features.csv")
+    X, y = load_and_preprocess_data(tmp_path / "features")
+    np.testing.assert_allclose(X, X_csv, rtol=1e-12, atol=1e-12)
+    np.testing.assert_array_equal(y, y_csv)
+
+
+def test_parallel_extraction_matches_serial_output_in_order(tmp_path):
+    # The worker processes unpickle _shard_features by module name, so this
+    # test runs the module registered under its own name
+    extract_stream_features_parallel = importlib.import_module("feature_pipeline").extract_stream_features_parallel
+
+    signals, rows = _stream_rows()
+    _write_csv(tmp_path / "emg_stream.csv", rows)
+    # hop < window: shards overlap; hop > window: shards skip the gap between windows
+    for window, hop in ((50, 20), (20, 35)):
+        serial = extract_stream_features(tmp_path / "emg_stream.csv", tmp_path / "serial.csv", window=window,
+                                         hop=hop, chunksize=33)
+        report = extract_stream_features_parallel(tmp_path / "emg_stream.csv", tmp_path / "parallel.csv",
+                                                  window=window, hop=hop, chunksize=33, workers=2, shard_samples=60)
+
+        assert report["errors"] == []
+        assert (report["samples"], report["windows"], report["labels"]) == (
+            serial["samples"], serial["windows"], serial["labels"])
+        assert [shard["index"] for shard in report["shards"]] == list(range(len(report["shards"])))
+        assert len(report["shards"]) > len(signals)
+        assert all(shard["seconds"] >= 0 for shard in report["shards"])
+        assert _read_features(tmp_path / "parallel.csv") == _read_features(tmp_path / "serial.csv")
+
+
+def test_failed_shard_is_reported_and_the_run_continues(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    signals, rows = _stream_rows()
+    _write_csv(tmp_path / "emg_stream.csv", rows)
+    real_batch = _FEATURE_PIPELINE_MODULE.calculate_emg_features_batch
+
+    def flaky_batch(windows, **kwargs):
+        if len(windows) == 2:  # only the ("s1", 2) level has exactly two windows
+            raise RuntimeError("bad shard")
+        return real_batch(windows, **kwargs)
+
+    monkeypatch.setattr(_FEATURE_PIPELINE_MODULE, "calculate_emg_features_batch", flaky_batch)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        report = _FEATURE_PIPELINE_MODULE.extract_stream_features_parallel(
+            tmp_path / "emg_stream.csv", tmp_path / "features.csv", executor=executor)
+
+    assert [(e["session_id"], e["level_number"]) for e in report["errors"]] == [("s1", 2)]
+    assert "bad shard" in report["errors"][0]["error"]
+    assert [(s["session_id"], s["level_number"]) for s in report["shards"]] == [("s1", 1), ("s2", 4)]
+    assert report["windows"] == len(_read_features(tmp_path / "features.csv")) == 5
+
+
+def test_cached_rerun_only_computes_new_sessions(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    FeatureCache = _load_module("feature_cache").FeatureCache
+    extract_stream_features_parallel = _FEATURE_PIPELINE_MODULE.extract_stream_features_parallel
+
+    signals, rows = _stream_rows()
+    _write_csv(tmp_path / "day1.csv", rows)
+    extra = [(1000.0 + i * 0.01, "s3", 3, float(np.sin(i))) for i in range(100)]
+    _write_csv(tmp_path / "day2.csv", rows + extra)
+    cache = FeatureCache(tmp_path / "cache")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = extract_stream_features_parallel(tmp_path / "day1.csv", tmp_path / "f1.csv", executor=executor,
+                                                 cache=cache)
+        second = extract_stream_features_parallel(tmp_path / "day2.csv", tmp_path / "f2.csv", executor=executor,
+                                                  cache=cache)
+
+    assert not any(shard["cached"] for shard in first["shards"])
+    assert [shard["cached"] for shard in second["shards"]] == [True, True, True, False]
+    assert second["cache"]["hits"] == 3
+    assert _read_features(tmp_path / "f2.csv")[:len(_read_features(tmp_path / "f1.csv"))] == \
+        _read_features(tmp_path / "f1.csv")
@@ -0,0 +1,103 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("statsmodels")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_FEATURE_ENGINEERING_MODULE = _load_module("feature_engineering")
+calculate_emg_features_batch = _FEATURE_ENGINEERING_MODULE.calculate_emg_features_batch
+_INCREMENTAL_FEATURES_MODULE = _load_module("incremental_features")
+SlidingFeatureEngine = _INCREMENTAL_FEATURES_MODULE.SlidingFeatureEngine
+
+
+def _reference(signal, window, ar_order=4):
+    windows = np.lib.stride_tricks.sliding_window_view(signal, window)
+    return calculate_emg_features_batch(windows, ar_order=ar_order)
+
+
+def test_engine_matches_batch_features_on_every_window():
+    rng = np.random.default_rng(0)
+    signal = rng.normal(size=400).cumsum() * 10 + 500
+
+    engine = SlidingFeatureEngine(window=50)
+    produced = []
+    for value in signal:
+        engine.push(value)
+        if engine.ready:
+            produced.append(engine.features())
+
+    np.testing.assert_allclose(np.array(produced), _reference(signal, 50), rtol=1e-6, atol=1e-8)
+
+
+def test_engine_without_refresh_stays_within_tolerance():
+    rng = np.random.default_rng(2)
+    signal = rng.normal(size=3000)
+
+    engine = SlidingFeatureEngine(window=30, ar_order=3, refresh_every=10**9)
+    engine.extend(signal)
+
+    np.testing.assert_allclose(engine.features(), _reference(signal, 30, ar_order=3)[-1], rtol=1e-6, atol=1e-8)
+
+
+def test_engine_is_not_ready_until_window_is_full():
+    engine = SlidingFeatureEngine(window=10, ar_order=2)
+    engine.extend(range(9))
+
+    assert not engine.ready
+    assert engine.features() is None
+    assert len(engine) == 9
+
+
+def test_multichannel_engine_matches_batch_features_per_channel():
+    rng = np.random.default_rng(3)
+    signal = rng.normal(size=(200, 3)).cumsum(axis=0)
+
+    engine = SlidingFeatureEngine(window=40, n_channels=3)
+    produced = []
+    for row in signal:
+        engine.push(row)
+        if engine.ready:
+            produced.append(engine.features())
+
+    windows = np.lib.stride_tricks.sliding_window_view(signal, 40, axis=0).transpose(0, 2, 1)
+    expected = calculate_emg_features_batch(windows)
+    assert expected.shape == (161, 33)
+    np.testing.assert_allclose(np.array(produced), expected, rtol=1e-6, atol=1e-8)
+    np.testing.assert_array_equal(engine.window_values(), signal[-40:])
+
+
+def test_multichannel_livestream_incremental_matches_full_recompute():
+    NumpyModel = _load_module("inference").NumpyModel
+    livestream_decisions = _load_module("livestream").livestream_decisions
+
+    rng = np.random.default_rng(4)
+    model = NumpyModel([rng.normal(size=(22, 1)) * 0.1], [np.zeros(1)], ["sigmoid"])
+    signal = rng.normal(size=(120, 2)).cumsum(axis=0)
+    chunks = [signal[:70], signal[70:71], signal[71:]]
+
+    full = list(livestream_decisions(chunks, model, window=50, hop=5, n_channels=2))
+    incremental = list(livestream_decisions(chunks, model, window=50, hop=5, incremental=True, n_channels=2))
+
+    assert [d.sample_index for d in full] == list(range(50, 121, 5))
+    np.testing.assert_allclose([d.probability for d in incremental], [d.probability for d in full], rtol=1e-6)
+
+
+def test_engine_only_supports_least_squares_ar():
+    SlidingFeatureEngine(window=10, ar_order=2, ar_method="autoreg")
+    with pytest.raises(ValueError):
+        SlidingFeatureEngine(window=10, ar_order=2, ar_method="burg")
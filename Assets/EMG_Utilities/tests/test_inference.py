@@ -0,0 +1,98 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_INFERENCE_MODULE = _load_module("inference")
+
+
+def _tiny_model():
+    kernels = [np.array([[1.0, -1.0], [0.5, 2.0]]), np.array([[1.0], [-1.0]])]
+    biases = [np.array([0.0, 0.1]), np.array([0.2])]
+    return _INFERENCE_MODULE.NumpyModel(kernels, biases, ["relu", "sigmoid"])
+
+
+def test_numpy_model_forward_pass_and_batch_predictions():
+    model = _tiny_model()
+    X = np.array([[1.0, 1.0], [-2.0, 0.0]])
+
+    hidden = np.maximum(X @ model.kernels[0] + model.biases[0], 0.0)
+    expected = 1.0 / (1.0 + np.exp(-(hidden @ model.kernels[1] + model.biases[1])))
+
+    np.testing.assert_allclose(model.predict(X), expected)
+    np.testing.assert_allclose(_INFERENCE_MODULE.predict_proba(model, X), expected[:, 0])
+    assert _INFERENCE_MODULE.predict(model, X[:1]) == bool(expected[0, 0] > 0.5)
+    assert list(_INFERENCE_MODULE.predict_batch(model, X)) == list(expected[:, 0] > 0.5)
+
+
+def test_exported_weights_round_trip(tmp_path):
+    model = _tiny_model()
+    path = tmp_path / "tiny.npz"
+    np.savez(
+        path,
+        activations=np.array(model.activations),
+        kernel_0=model.kernels[0],
+        bias_0=model.biases[0],
+        kernel_1=model.kernels[1],
+        bias_1=model.biases[1],
+    )
+
+    loaded = _INFERENCE_MODULE.load_model(str(path))
+    X = np.random.default_rng(0).normal(size=(5, 2))
+    np.testing.assert_allclose(loaded.predict(X), model.predict(X))
+    assert loaded.ar_method is None
+
+
+def test_export_records_the_ar_method(tmp_path):
+    pytest.importorskip("tensorflow")
+    pytest.importorskip("sklearn")
+    model_module = _load_module("model")
+
+    path = _INFERENCE_MODULE.export_model(model_module.build_model(), str(tmp_path / "burg.npz"), ar_method="burg")
+
+    assert _INFERENCE_MODULE.load_model(path).ar_method == "burg"
+
+
+def test_numpy_model_rejects_unknown_activation():
+    with pytest.raises(ValueError):
+        _INFERENCE_MODULE.NumpyModel([np.ones((2, 1))], [np.zeros(1)], ["swish_custom"])
+
+
+def test_build_model_export_matches_keras(tmp_path):
+    pytest.importorskip("tensorflow")
+    pytest.importorskip("sklearn")
+    model_module = _load_module("model")
+
+    keras_model = model_module.build_model()
+    path = _INFERENCE_MODULE.export_model(keras_model, str(tmp_path / "built.npz"))
+    X = np.random.default_rng(1).normal(size=(64, model_module.INPUT_DIM))
+
+    expected = keras_model.predict(X, verbose=0)
+    np.testing.assert_allclose(_INFERENCE_MODULE.load_numpy_model(path).predict(X), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_shipped_npz_matches_bg_model_h5():
+    pytest.importorskip("tensorflow")
+    from tensorflow.keras.models import load_model as load_keras_model
+
+    keras_model = load_keras_model(str(_EMG_DIR / "bg_model.h5"))
+    numpy_model = _INFERENCE_MODULE.load_numpy_model(str(_EMG_DIR / "bg_model.npz"))
+    X = np.random.default_rng(2).normal(size=(64, 11)) * 100
+
+    expected = keras_model.predict(X, verbose=0)
+    np.testing.assert_allclose(numpy_model.predict(X), expected, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,88 @@
+import importlib.util
+import pathlib
+import queue
+import subprocess
+import sys
+import threading
+
+import pytest
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_LIVE_SESSION_MODULE = _load_module("live_session")
+
+
+def _imported_after(statement):
+    # Fresh interpreter so modules loaded by other tests do not leak in
+    code = f"import sys; {statement}; print(','.join(sorted(sys.modules)))"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=_EMG_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return set(out.strip().split(","))
+
+
+def test_entry_point_does_not_import_heavy_modules():
+    modules = _imported_after("import live_session")
+
+    for name in ("numpy", "tensorflow", "statsmodels", "pandas", "sklearn"):
+        assert name not in modules
+
+
+def test_processing_modules_do_not_import_training_dependencies():
+    pytest.importorskip("numpy")
+    modules = _imported_after("import livestream")
+
+    for name in ("tensorflow", "statsmodels", "pandas", "sklearn"):
+        assert name not in modules
+
+
+def test_background_importer_records_timings_and_errors():
+    importer = _LIVE_SESSION_MODULE.BackgroundImporter(["json", "module_that_does_not_exist"]).start()
+
+    with pytest.raises(ImportError):
+        importer.wait(timeout=5)
+    assert "json" in importer.modules
+    assert set(importer.timings) == {"json", "module_that_does_not_exist"}
+
+
+def test_iter_queue_chunks_drains_backlog_and_stops():
+    samples = queue.Queue()
+    stop_event = threading.Event()
+    for value in range(5):
+        samples.put(value)
+
+    chunks = _LIVE_SESSION_MODULE.iter_queue_chunks(samples, stop_event, poll=0.01)
+    assert next(chunks) == [0, 1, 2, 3, 4]
+
+    samples.put(5)
+    stop_event.set()
+    assert list(chunks) == [[5]]
+
+
+def test_ar_methods_match_feature_engineering_and_batch_only_ones_need_full_recompute():
+    pytest.importorskip("numpy")
+    feature_engineering = _load_module("feature_engineering")
+
+    assert _LIVE_SESSION_MODULE.AR_METHODS == feature_engineering.AR_METHODS
+    assert _LIVE_SESSION_MODULE.parse_args(["--ar-method", "burg", "--full-recompute"]).ar_method == "burg"
+    assert _LIVE_SESSION_MODULE.parse_args([]).ar_method is None
+    with pytest.raises(SystemExit):
+        _LIVE_SESSION_MODULE.parse_args(["--ar-method", "yule_walker"])
+
+
+def test_startup_report_lists_each_import():
+    report = _LIVE_SESSION_MODULE.format_startup_report({"numpy": 0.1, "inference": 0.002}, {"serial opened": 0.01})
+
+    assert "numpy" in report
+    assert "inference" in report
+    assert "serial opened" in report
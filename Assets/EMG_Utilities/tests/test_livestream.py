@@ -6,24 +6,25 @@ import types
 import pytest
 
 
-def _load_livestream_module(monkeypatch, load_model_impl=None):
-    livestream_path = pathlib.Path(__file__).resolve().parents[1] / "livestream.py"
+_FEATURE_ROW = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0]
 
-    # Build lightweight fake numpy module used by livestream.py.
-    class _FakeVector(list):
-        def reshape(self, rows, _cols):
-            if rows != 1:
-                raise ValueError("This fake reshape only supports one row")
-            return _FakeMatrix([list(self)])
 
-    class _FakeMatrix:
-        def __init__(self, data):
-            self._data = data
-            self.shape = (len(data), len(data[0]) if data else 0)
+class _FakeMatrix:
+    def __init__(self, data):
+        self._data = data
+        self.shape = (len(data), len(data[0]) if data else 0)
+
+    def __getitem__(self, idx):
+        return self._data[idx]
 
-        def __getitem__(self, idx):
-            return self._data[idx]
+    def __len__(self):
+        return len(self._data)
+
+
+def _load_livestream_module(monkeypatch, load_model_impl=None):
+    livestream_path = pathlib.Path(__file__).resolve().parents[1] / "livestream.py"
 
+    # Build lightweight fake numpy module used by livestream.py.
     fake_numpy = types.ModuleType("numpy")
     fake_numpy.array = lambda x: list(x)
     fake_numpy.zeros = lambda n: [0.0] * n
@@ -32,55 +33,37 @@ def _load_livestream_module(monkeypatch, load_model_impl=None):
         flattened = []
         for part in parts:
             flattened.extend(list(part))
-        return _FakeVector(flattened)
+        return flattened
 
     fake_numpy.concatenate = _concatenate
-
-    # Build lightweight fake tensorflow package tree so import does not require real TF.
-    tf_module = types.ModuleType("tensorflow")
-    keras_module = types.ModuleType("tensorflow.keras")
-    keras_models_module = types.ModuleType("tensorflow.keras.models")
-    keras_layers_module = types.ModuleType("tensorflow.keras.layers")
+    fake_numpy.vstack = lambda rows: _FakeMatrix([list(row) for row in rows])
 
     if load_model_impl is None:
         load_model_impl = lambda path: object()
 
-    keras_models_module.load_model = load_model_impl
-    keras_models_module.Sequential = type("Sequential", (), {})
-    keras_layers_module.Dense = type("Dense", (), {})
-    keras_layers_module.Conv1D = type("Conv1D", (), {})
-    keras_layers_module.MaxPooling1D = type("MaxPooling1D", (), {})
-    keras_layers_module.Flatten = type("Flatten", (), {})
-    keras_layers_module.LSTM = type("LSTM", (), {})
-
-    tf_module.keras = types.SimpleNamespace(models=keras_models_module, layers=keras_layers_module)
-    keras_module.models = keras_models_module
-    keras_module.layers = keras_layers_module
-
     # Stub local imports used by livestream.py.
     feature_engineering_module = types.ModuleType("feature_engineering")
-    feature_engineering_module.calculate_emg_features = lambda segment: {
-        "WL": 0.0,
-        "AAC": 0.0,
-        "DASDV": 0.0,
-        "AR_Coeffs": [0.0, 0.0, 0.0, 0.0],
-        "Cepstral_Coeffs": [0.0, 0.0, 0.0, 0.0],
-    }
+    feature_engineering_module.calculate_emg_features_batch = lambda segments, ar_method="ols": _FakeMatrix(
+        [[0.0] * 11 for _ in range(len(segments))]
+    )
+    feature_engineering_module.feature_dim = lambda ar_order=4, n_channels=1: n_channels * (3 + 2 * ar_order)
 
-    model_module = types.ModuleType("model")
-    model_module.predict = lambda model, input_data: False
+    incremental_module = types.ModuleType("incremental_features")
+    incremental_module.SlidingFeatureEngine = type("SlidingFeatureEngine", (), {})
+    incremental_module.AR_METHODS = ("autoreg", "ols")
 
-    emg_module = types.ModuleType("emg")
-    emg_module.EMGReader = type("EMGReader", (), {})
+    inference_module = types.ModuleType("inference")
+    inference_module.load_model = load_model_impl
+    inference_module.predict_proba = lambda model, input_data: [0.0] * len(input_data)
+
+    metrics_module = types.ModuleType("metrics")
+    metrics_module.METRICS = types.SimpleNamespace(start=lambda: None, record=lambda stage, started: None)
 
     monkeypatch.setitem(sys.modules, "numpy", fake_numpy)
-    monkeypatch.setitem(sys.modules, "tensorflow", tf_module)
-    monkeypatch.setitem(sys.modules, "tensorflow.keras", keras_module)
-    monkeypatch.setitem(sys.modules, "tensorflow.keras.models", keras_models_module)
-    monkeypatch.setitem(sys.modules, "tensorflow.keras.layers", keras_layers_module)
     monkeypatch.setitem(sys.modules, "feature_engineering", feature_engineering_module)
-    monkeypatch.setitem(sys.modules, "model", model_module)
-    monkeypatch.setitem(sys.modules, "emg", emg_module)
+    monkeypatch.setitem(sys.modules, "incremental_features", incremental_module)
+    monkeypatch.setitem(sys.modules, "inference", inference_module)
+    monkeypatch.setitem(sys.modules, "metrics", metrics_module)
 
     spec = importlib.util.spec_from_file_location("livestream_module_under_test", livestream_path)
     module = importlib.util.module_from_spec(spec)
@@ -88,6 +71,23 @@ def _load_livestream_module(monkeypatch, load_model_impl=None):
     return module
 
 
+def _counting_hooks(module, probability=0.0):
+    calls = {"features": 0, "predict": 0, "rows": 0}
+
+    def fake_features(segments, ar_method="ols"):
+        calls["features"] += 1
+        return _FakeMatrix([list(_FEATURE_ROW) for _ in range(len(segments))])
+
+    def fake_predict_proba(_model, input_data):
+        calls["predict"] += 1
+        calls["rows"] += len(input_data)
+        return [probability] * len(input_data)
+
+    module.calculate_emg_features_batch = fake_features
+    module.predict_proba = fake_predict_proba
+    return calls
+
+
 def test_process_livestream_returns_early_when_model_load_fails(monkeypatch, capsys):
     def _raise_load_error(_):
         raise RuntimeError("model load failed")
@@ -102,25 +102,7 @@ def test_process_livestream_returns_early_when_model_load_fails(monkeypatch, cap
 
 def test_process_livestream_does_not_predict_before_buffer_reaches_50(monkeypatch):
     module = _load_livestream_module(monkeypatch, load_model_impl=lambda _: object())
-
-    calls = {"features": 0, "predict": 0}
-
-    def fake_features(_segment):
-        calls["features"] += 1
-        return {
-            "WL": 1.0,
-            "AAC": 2.0,
-            "DASDV": 3.0,
-            "AR_Coeffs": [4.0, 5.0, 6.0, 7.0],
-            "Cepstral_Coeffs": [8.0, 9.0, 10.0, 11.0],
-        }
-
-    def fake_predict(_model, _input_data):
-        calls["predict"] += 1
-        return True
-
-    module.calculate_emg_features = fake_features
-    module.predict = fake_predict
+    calls = _counting_hooks(module)
 
     module.process_livestream(range(49))
 
@@ -133,52 +115,136 @@ def test_process_livestream_builds_expected_feature_vector_and_shape(monkeypatch
 
     captured = {}
 
-    def fake_features(segment):
-        captured["segment_len"] = len(segment)
-        return {
-            "WL": 1.0,
-            "AAC": 2.0,
-            "DASDV": 3.0,
-            "AR_Coeffs": [4.0, 5.0, 6.0, 7.0],
-            "Cepstral_Coeffs": [8.0, 9.0, 10.0, 11.0],
-        }
-
-    def fake_predict(model, input_data):
+    def fake_features(segments, ar_method="ols"):
+        captured["segments_shape"] = segments.shape
+        return _FakeMatrix([list(_FEATURE_ROW)])
+
+    def fake_predict_proba(model, input_data):
         captured["model"] = model
         captured["shape"] = input_data.shape
         captured["vector"] = input_data[0].copy()
-        return True
+        return [0.9]
 
-    module.calculate_emg_features = fake_features
-    module.predict = fake_predict
+    module.calculate_emg_features_batch = fake_features
+    module.predict_proba = fake_predict_proba
 
-    module.process_livestream(range(50))
+    decisions = []
+    module.process_livestream(range(50), on_decision=decisions.append)
 
-    assert captured["segment_len"] == 50
+    assert captured["segments_shape"] == (1, 50)
     assert captured["model"] == "fake_model"
     assert captured["shape"] == (1, 11)
-    assert captured["vector"] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0]
+    assert captured["vector"] == _FEATURE_ROW
+    assert len(decisions) == 1
+    assert decisions[0].sample_index == 50
+    assert decisions[0].probability == 0.9
+    assert decisions[0].prediction is True
 
 
 def test_process_livestream_predicts_for_each_new_value_after_buffer_full(monkeypatch):
     module = _load_livestream_module(monkeypatch, load_model_impl=lambda _: object())
+    calls = _counting_hooks(module)
 
-    calls = {"predict": 0}
+    # For 52 values and maxlen=50, predict should run on items 50, 51, and 52 => 3 calls.
+    module.process_livestream(range(52))
+    assert calls["predict"] == 3
 
-    module.calculate_emg_features = lambda _segment: {
-        "WL": 0.0,
-        "AAC": 0.0,
-        "DASDV": 0.0,
-        "AR_Coeffs": [0.0, 0.0, 0.0, 0.0],
-        "Cepstral_Coeffs": [0.0, 0.0, 0.0, 0.0],
-    }
 
-    def fake_predict(_model, _input_data):
-        calls["predict"] += 1
-        return False
+def test_process_livestream_hop_controls_decision_rate(monkeypatch):
+    module = _load_livestream_module(monkeypatch, load_model_impl=lambda _: object())
+    calls = _counting_hooks(module)
 
-    module.predict = fake_predict
+    decisions = []
+    module.process_livestream(range(100), window=20, hop=10, on_decision=decisions.append)
 
-    # For 52 values and maxlen=50, predict should run on items 50, 51, and 52 => 3 calls.
-    module.process_livestream(range(52))
+    # Windows end at samples 20, 30, ..., 100.
+    assert [d.sample_index for d in decisions] == list(range(20, 101, 10))
+    assert calls["predict"] == 9
+
+
+def test_process_livestream_batches_windows_due_in_one_chunk(monkeypatch):
+    module = _load_livestream_module(monkeypatch, load_model_impl=lambda _: object())
+    calls = _counting_hooks(module, probability=0.7)
+
+    # A source that fell behind delivers 30 samples at once after the first 50.
+    chunks = [list(range(50)), list(range(50, 80))]
+    decisions = []
+    module.process_livestream(chunks, hop=10, on_decision=decisions.append)
+
+    assert [d.sample_index for d in decisions] == [50, 60, 70, 80]
+    assert calls["predict"] == 2
+    assert calls["features"] == 2
+    assert calls["rows"] == 4
+    assert all(d.prediction for d in decisions)
+
+
+def test_process_livestream_rejects_invalid_hop(monkeypatch):
+    module = _load_livestream_module(monkeypatch, load_model_impl=lambda _: object())
+
+    with pytest.raises(ValueError):
+        list(module.livestream_decisions(range(10), object(), hop=0))
+
+
+def test_process_livestream_uses_and_checks_the_models_ar_method(monkeypatch, capsys):
+    model = types.SimpleNamespace(ar_method="burg")
+    module = _load_livestream_module(monkeypatch, load_model_impl=lambda _: model)
+    methods = []
+
+    def fake_features(segments, ar_method="ols"):
+        methods.append(ar_method)
+        return _FakeMatrix([list(_FEATURE_ROW) for _ in range(len(segments))])
+
+    module.calculate_emg_features_batch = fake_features
+    module.predict_proba = lambda _model, input_data: [0.0] * len(input_data)
+
+    module.process_livestream(range(50), on_decision=lambda decision: None)
+    assert methods == ["burg"]
+
+    module.process_livestream(range(50), ar_method="ols")
+    assert "trained on burg AR features, not ols" in capsys.readouterr().out
+    module.process_livestream(range(50), incremental=True)
+    assert "use the full recompute" in capsys.readouterr().out
+    assert methods == ["burg"]
+
+
+def test_process_livestream_incremental_uses_engine_instead_of_buffer(monkeypatch):
+    module = _load_livestream_module(monkeypatch, load_model_impl=lambda _: object())
+    calls = _counting_hooks(module)
+    pushed = []
+
+    class _FakeEngine:
+        def __init__(self, window, n_channels=1, ar_method="ols"):
+            self.window = window
+
+        def push(self, value):
+            pushed.append(value)
+
+        def features(self):
+            return list(_FEATURE_ROW)
+
+    module.SlidingFeatureEngine = _FakeEngine
+
+    module.process_livestream(range(52), incremental=True)
+
+    assert pushed == list(range(52))
+    assert calls["features"] == 0
     assert calls["predict"] == 3
+
+
+def test_livestream_times_its_stages_when_metrics_are_on(monkeypatch):
+    metrics_path = pathlib.Path(__file__).resolve().parents[1] / "metrics.py"
+    spec = importlib.util.spec_from_file_location("metrics_module", metrics_path)
+    metrics_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(metrics_module)
+    Metrics = metrics_module.Metrics
+
+    module = _load_livestream_module(monkeypatch, load_model_impl=lambda _: object())
+    _counting_hooks(module)
+    module.METRICS = Metrics(enabled=True)
+
+    module.process_livestream([list(range(55))], on_decision=lambda decision: None)
+
+    stages = module.METRICS.snapshot()
+    assert stages["features"]["count"] == 1
+    assert stages["predict"]["count"] == 1
+    assert stages["buffer_copy"]["count"] == 6 + 1
@@ -0,0 +1,91 @@
+import csv
+import importlib.util
+import pathlib
+import sys
+import time
+
+import pytest
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_LOGGER_MODULE = _load_module("logger")
+Logger = _LOGGER_MODULE.Logger
+_STREAM_WRITER_MODULE = _load_module("stream_writer")
+stream_segments = _STREAM_WRITER_MODULE.stream_segments
+
+
+def _read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_live_stream_generator_yields_values_and_logs_them(tmp_path):
+    logger = Logger(tmp_path / "session")
+    values = iter(range(10))
+
+    stream = logger.live_stream_generator("s1", 2, lambda: next(values), interval=0.001)
+    received = [next(stream) for _ in range(5)]
+    stream.close()
+
+    rows = _read_rows(tmp_path / "emg_stream.csv")
+    assert received == [0, 1, 2, 3, 4]
+    assert rows[0] == ["timestamp", "session_id", "level_number", "value"]
+    assert [row[1:] for row in rows[1:]] == [["s1", "2", str(v)] for v in range(5)]
+    assert logger.stream_writer.stats()["written"] == 5
+    assert logger.pacing.ticks == 5
+
+
+def test_stream_worker_writes_rows_while_running_and_rotates(tmp_path):
+    logger = Logger(tmp_path / "session", stream_options={"flush_interval": 0.01, "rotate_bytes": 200})
+    path = tmp_path / "emg_stream.csv"
+
+    logger.start_stream("s1", 3, lambda: 1.5)
+    deadline = time.monotonic() + 5.0
+    # Rows reach the disk during the level, not only when it stops
+    while logger.stream_writer is None or logger.stream_writer.rotations < 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    logger.stop_stream()
+
+    rows = []
+    for segment in stream_segments(path):
+        segment_rows = _read_rows(segment)
+        assert segment_rows[0] == ["timestamp", "session_id", "level_number", "value"]
+        rows += segment_rows[1:]
+    assert len(rows) == logger.stream_writer.written
+    assert all(row[1:] == ["s1", "3", "1.5"] for row in rows)
+
+
+def test_binary_stream_format_logs_to_memory_mappable_file(tmp_path):
+    np = pytest.importorskip("numpy")
+    StreamLog = _load_module("stream_log").StreamLog
+
+    logger = Logger(tmp_path / "session", stream_format="binary")
+    values = iter([1.0, 2.0, "bad", 4.0])
+
+    def get_value():
+        value = next(values)
+        if value == "bad":
+            raise RuntimeError("read failed")
+        return value
+
+    stream = logger.live_stream_generator("s1", 2, get_value, interval=0.001)
+    received = [next(stream) for _ in range(4)]
+    stream.close()
+
+    log = StreamLog(tmp_path / "emg_stream.bin")
+    assert received == [1.0, 2.0, "", 4.0]
+    assert [(s.session_id, s.level_number) for s in log.segments] == [("s1", 2)]
+    np.testing.assert_array_equal(log.values[[0, 1, 3]], [1.0, 2.0, 4.0])
+    assert np.isnan(log.values[2])
+    assert np.all(np.diff(log.timestamps) > 0)
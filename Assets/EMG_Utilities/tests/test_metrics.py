@@ -0,0 +1,64 @@
+import importlib.util
+import json
+import pathlib
+import sys
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_METRICS_MODULE = _load_module("metrics")
+LatencyHistogram = _METRICS_MODULE.LatencyHistogram
+Metrics = _METRICS_MODULE.Metrics
+MetricsDumper = _METRICS_MODULE.MetricsDumper
+
+
+def test_histogram_percentiles_cover_only_the_rolling_window():
+    histogram = LatencyHistogram(size=100)
+    for _ in range(100):
+        histogram.add(1.0)
+    for i in range(1, 101):
+        histogram.add(i / 1000)
+
+    s = histogram.snapshot()
+    assert s["count"] == 200
+    assert s["p50"] == 51.0 and s["p95"] == 96.0 and s["p99"] == 100.0 and s["max"] == 100.0
+    # the mean covers the whole run
+    assert abs(s["mean"] - (100 * 1000 + 50.5 * 100) / 200) < 1e-9
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+    t0 = metrics.start()
+    metrics.record("features", t0)
+    assert t0 is None
+    assert metrics.snapshot() == {}
+
+    metrics.enable()
+    metrics.record("features", metrics.start())
+    assert metrics.snapshot()["features"]["count"] == 1
+
+
+def test_dumper_writes_snapshots_and_follows_the_control_file(tmp_path):
+    metrics = Metrics(enabled=True)
+    control = tmp_path / "metrics.control"
+    dumper = MetricsDumper(tmp_path / "metrics.jsonl", interval=60.0, metrics=metrics, control_path=control)
+
+    metrics.add("predict", 0.002)
+    dumper.dump()
+    control.write_text("off\n")
+    dumper.dump()
+    metrics.record("predict", metrics.start())
+
+    lines = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert lines[0]["enabled"] is True and lines[0]["stages"]["predict"]["p50"] == 2.0
+    assert lines[1]["enabled"] is False
+    assert metrics.snapshot()["predict"]["count"] == 1
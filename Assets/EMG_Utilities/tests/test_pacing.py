@@ -0,0 +1,116 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_PACING_MODULE = _load_module("pacing")
+DeadlineScheduler = _PACING_MODULE.DeadlineScheduler
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def work(self, seconds):
+        self.now += seconds
+
+
+def _scheduler(clock, policy="skip"):
+    return DeadlineScheduler(0.01, policy=policy, sleep=clock.sleep, clock=clock, wall_clock=lambda: 1000.0 + clock.now)
+
+
+def test_deadlines_do_not_drift_with_processing_time():
+    clock = _FakeClock()
+    scheduler = _scheduler(clock)
+
+    wake_times = []
+    for _ in range(50):
+        scheduler.wait()
+        wake_times.append(clock.now)
+        clock.work(0.004)
+
+    # Every tick lands on start + n * interval despite 4 ms of work per tick.
+    assert wake_times == pytest.approx([100.0 + 0.01 * n for n in range(50)])
+    assert scheduler.missed_deadlines == 0
+
+
+def test_skip_policy_drops_missed_slots_and_stays_on_grid():
+    clock = _FakeClock()
+    scheduler = _scheduler(clock, "skip")
+
+    scheduler.wait()
+    clock.work(0.035)
+    tick = scheduler.wait()
+    following = scheduler.wait()
+
+    assert tick.skipped == 2
+    assert tick.timestamp == pytest.approx(1100.03)
+    assert following.timestamp == pytest.approx(1100.04)
+    assert scheduler.missed_deadlines == 1
+    assert scheduler.skipped == 2
+
+
+def test_burst_policy_runs_missed_slots_back_to_back():
+    clock = _FakeClock()
+    scheduler = _scheduler(clock, "burst")
+
+    scheduler.wait()
+    clock.work(0.035)
+    stamps = [scheduler.wait().timestamp for _ in range(3)]
+
+    # Three catch-up ticks without sleeping, stamped with their nominal slots.
+    assert clock.now == pytest.approx(100.035)
+    assert stamps == pytest.approx([1100.01, 1100.02, 1100.03])
+    assert scheduler.skipped == 0
+
+
+def test_timestamp_policy_restarts_grid_and_stamps_actual_time():
+    clock = _FakeClock()
+    scheduler = _scheduler(clock, "timestamp")
+
+    scheduler.wait()
+    clock.work(0.035)
+    late = scheduler.wait()
+    following = scheduler.wait()
+
+    assert late.timestamp == pytest.approx(1100.035)
+    assert following.timestamp == pytest.approx(1100.045)
+    assert scheduler.stats()["missed_deadlines"] == 1
+
+
+def test_stats_report_lateness():
+    clock = _FakeClock()
+    scheduler = _scheduler(clock)
+
+    scheduler.wait()
+    clock.work(0.012)
+    scheduler.wait()
+
+    stats = scheduler.stats()
+    assert stats["ticks"] == 2
+    assert stats["max_lateness"] == pytest.approx(0.002)
+    assert stats["mean_lateness"] == pytest.approx(0.001)
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        DeadlineScheduler(0.01, policy="sometimes")
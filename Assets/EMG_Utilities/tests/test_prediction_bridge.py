@@ -0,0 +1,133 @@
+import collections
+import importlib.util
+import pathlib
+import socket
+import sys
+import time
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_PREDICTION_BRIDGE_MODULE = _load_module("prediction_bridge")
+MESSAGE = _PREDICTION_BRIDGE_MODULE.MESSAGE
+PredictionPublisher = _PREDICTION_BRIDGE_MODULE.PredictionPublisher
+PredictionSubscriber = _PREDICTION_BRIDGE_MODULE.PredictionSubscriber
+pack_message = _PREDICTION_BRIDGE_MODULE.pack_message
+parse_address = _PREDICTION_BRIDGE_MODULE.parse_address
+unpack_message = _PREDICTION_BRIDGE_MODULE.unpack_message
+
+# Same fields as livestream.Decision, without importing NumPy
+Decision = collections.namedtuple("Decision", ["timestamp", "sample_index", "probability", "prediction"])
+
+
+def _decision(probability=0.75, prediction=True, timestamp=None):
+    return Decision(time.time() if timestamp is None else timestamp, 1, probability, prediction)
+
+
+def test_message_round_trips_in_24_bytes():
+    data = pack_message(7, 1700000000.25, 0.75, True, session=0xDEADBEEF)
+
+    assert MESSAGE.size == len(data) == 24
+    message = unpack_message(data, received=1700000000.5)
+    assert (message.session, message.seq, message.timestamp, message.probability, message.prediction) == (
+        0xDEADBEEF, 7, 1700000000.25, 0.75, True)
+    assert message.latency == 0.25
+    assert unpack_message(b"XX" + data[2:]) is None
+    assert unpack_message(data[:-1]) is None
+
+
+def test_subscriber_receives_published_decisions_with_latency():
+    subscriber = PredictionSubscriber(("127.0.0.1", 0))
+    publisher = PredictionPublisher(subscriber.address)
+    try:
+        for i in range(5):
+            assert publisher.publish(_decision(probability=i / 10, prediction=i % 2 == 0))
+        messages = [subscriber.receive(timeout=1.0) for _ in range(5)]
+    finally:
+        publisher.close()
+        subscriber.close()
+
+    assert [m.seq for m in messages] == [0, 1, 2, 3, 4]
+    assert [m.prediction for m in messages] == [True, False, True, False, True]
+    assert all(0 <= m.latency < 1.0 for m in messages)
+    stats = subscriber.stats()
+    assert (stats["received"], stats["lost"], stats["reordered"]) == (5, 0, 0)
+    assert stats["latency"]["count"] == 5
+    assert publisher.stats() == {"published": 5, "sent": 5, "dropped": 0, "errors": 0}
+
+
+def test_subscriber_counts_lost_reordered_and_invalid_messages():
+    subscriber = PredictionSubscriber(("127.0.0.1", 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        now = time.time()
+        for seq in (0, 1, 4, 3, 5):
+            sender.sendto(pack_message(seq, now, 0.5, False), subscriber.address)
+        sender.sendto(b"not a message", subscriber.address)
+        time.sleep(0.05)
+        messages = subscriber.drain()
+    finally:
+        sender.close()
+        subscriber.close()
+
+    assert [m.seq for m in messages] == [0, 1, 4, 3, 5]
+    stats = subscriber.stats()
+    # 2 was never sent; 3 arrived late, after 4
+    assert (stats["lost"], stats["reordered"], stats["invalid"]) == (1, 1, 1)
+
+
+def test_restarted_publisher_starts_a_new_stream():
+    subscriber = PredictionSubscriber(("127.0.0.1", 0))
+    try:
+        received = []
+        for session in (1, 2):
+            # A fresh process: new session, seq from 0 again
+            publisher = PredictionPublisher(subscriber.address, session=session)
+            for _ in range(3):
+                publisher.publish(_decision())
+            publisher.close()
+            received += [subscriber.receive(timeout=1.0) for _ in range(3)]
+    finally:
+        subscriber.close()
+
+    assert [(m.session, m.seq) for m in received] == [(1, 0), (1, 1), (1, 2), (2, 0), (2, 1), (2, 2)]
+    stats = subscriber.stats()
+    assert (stats["sessions"], stats["lost"], stats["reordered"]) == (2, 0, 0)
+    first, second = PredictionPublisher(), PredictionPublisher()
+    assert first.session != second.session
+    first.close()
+    second.close()
+
+
+def test_publishing_without_a_listener_never_raises():
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("127.0.0.1", 0))
+    address = probe.getsockname()
+    probe.close()
+
+    publisher = PredictionPublisher(address)
+    try:
+        start = time.perf_counter()
+        results = [publisher.publish(_decision()) for _ in range(20)]
+        elapsed = time.perf_counter() - start
+    finally:
+        publisher.close()
+
+    assert elapsed < 0.5
+    stats = publisher.stats()
+    assert stats["published"] == 20
+    assert stats["sent"] + stats["dropped"] + stats["errors"] == 20 == len(results)
+
+
+def test_parse_address_defaults_to_localhost():
+    assert parse_address("5006") == ("127.0.0.1", 5006)
+    assert parse_address("10.0.0.2:6000") == ("10.0.0.2", 6000)
@@ -0,0 +1,140 @@
+import csv
+import importlib
+import importlib.util
+import pathlib
+import sys
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_EMG_MODULE = _load_module("emg")
+EMGReader = _EMG_MODULE.EMGReader
+_REPLAY_MODULE = _load_module("replay")
+ReplaySerial = _REPLAY_MODULE.ReplaySerial
+Sample = _REPLAY_MODULE.Sample
+paced = _REPLAY_MODULE.paced
+read_serial_capture = _REPLAY_MODULE.read_serial_capture
+read_stream_log = _REPLAY_MODULE.read_stream_log
+replay = _REPLAY_MODULE.replay
+
+MODEL = pathlib.Path(__file__).resolve().parents[1] / "bg_model.npz"
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+def _samples(timestamps):
+    return [Sample(ts, float(i), 1) for i, ts in enumerate(timestamps)]
+
+
+def test_paced_releases_samples_at_recorded_time_over_speed_and_shortens_gaps():
+    clock = _FakeClock()
+    chunks = list(paced(_samples([10.0, 10.0, 10.5, 11.0, 100.0]), speed=2.0, max_gap=1.0,
+                        sleep=clock.sleep, clock=clock))
+
+    assert [[s.value for s in chunk] for chunk in chunks] == [[0.0, 1.0], [2.0], [3.0], [4.0]]
+    # the 89 s gap is replayed as max_gap, at double speed
+    assert clock.sleeps == [0.25, 0.25, 0.5]
+
+
+def test_unthrottled_pacing_only_chunks():
+    chunks = list(paced(_samples(range(10)), speed=None, max_chunk=4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+
+
+def test_replay_serial_feeds_every_sample_through_emg_reader():
+    port = ReplaySerial(_samples(np.arange(500) * 0.01), speed=None, timeout=0.001)
+    reader = EMGReader(bulk=True, buffer_size=1000, serial_port=port)
+    try:
+        received = []
+        for _ in range(2000):
+            received.extend(reader.read_samples())
+            if len(received) == 500:
+                break
+            time.sleep(0.001)
+    finally:
+        reader.stop()
+
+    assert [envelope for _, envelope in received] == [float(i) for i in range(500)]
+    assert port.closed and port.finished
+
+
+def test_replay_reports_decisions_with_recorded_timestamps(tmp_path):
+    path = tmp_path / "emg_stream.csv"
+    rng = np.random.default_rng(0)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["timestamp", "session_id", "level_number", "value"])
+        for i, v in enumerate(rng.normal(size=120)):
+            w.writerow([f"{1000 + i * 0.01:.3f}", "s1", 2 if i < 60 else 5, repr(float(v))])
+
+    decisions = []
+    report = replay(read_stream_log(path), model_path=MODEL, hop=10,
+                    on_decision=lambda decision, ts: decisions.append((decision.sample_index, ts)))
+
+    assert report["samples"] == 120 and report["decisions"] == 8
+    assert decisions[0] == (50, pytest.approx(1000.49)) and decisions[-1] == (120, pytest.approx(1001.19))
+    # only the level 2 decisions have a label
+    assert report["accuracy"] in (0.0, 0.5, 1.0)
+    assert report["samples_per_sec"] > 0 and report["realtime_factor"] > 0
+
+    via_reader = replay(read_stream_log(path), model_path=MODEL, hop=10, via_reader=True)
+    assert via_reader["decisions"] == 8 and via_reader["overruns"] == 0
+
+
+def test_replay_builds_the_features_the_model_was_trained_on(tmp_path, monkeypatch):
+    with np.load(MODEL) as data:
+        arrays = {name: data[name] for name in data.files}
+    burg_model = tmp_path / "burg.npz"
+    np.savez(burg_model, **arrays, ar_method=np.array("burg"))
+    samples = _samples([i * 0.01 for i in range(120)])
+
+    # replay() imports livestream by name, so that is the module to patch
+    livestream = importlib.import_module("livestream")
+    batch = livestream.calculate_emg_features_batch
+    methods = set()
+
+    def spy(segments, ar_method="ols"):
+        methods.add(ar_method)
+        return batch(segments, ar_method=ar_method)
+
+    monkeypatch.setattr(livestream, "calculate_emg_features_batch", spy)
+    report = replay(samples, model_path=burg_model, hop=10, incremental=False)
+    assert report["decisions"] == 8 and methods == {"burg"}
+
+    with pytest.raises(ValueError, match="trained on burg AR features, not ols"):
+        replay(samples, model_path=burg_model, hop=10, incremental=False, ar_method="ols")
+    with pytest.raises(ValueError, match="full recompute"):
+        replay(samples, model_path=burg_model, hop=10)
+
+
+def test_serial_capture_is_timestamped_at_the_sample_rate(tmp_path):
+    path = tmp_path / "capture.txt"
+    path.write_bytes(b"1.0,2.0\ngarbage\n3.0,4.0\n5.0,6.0")
+
+    samples = list(read_serial_capture(path, rate=50.0))
+    assert [(s.timestamp, s.value) for s in samples] == [(0.0, 2.0), (0.02, 4.0), (0.04, 6.0)]
@@ -0,0 +1,85 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_RING_BUFFER_MODULE = _load_module("ring_buffer")
+SampleRing = _RING_BUFFER_MODULE.SampleRing
+
+
+def _rows(start, stop):
+    values = np.arange(start, stop, dtype=float)
+    return np.column_stack((values, values * 10, values * 100))
+
+
+def test_latest_returns_contiguous_view_across_wrap():
+    ring = SampleRing(5)
+    ring.extend(_rows(0, 4))
+    ring.extend(_rows(4, 8))
+
+    window = ring.latest(5)
+    assert window[:, 0].tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+    # No copy: the window shares memory with the ring storage
+    assert np.shares_memory(window, ring._data)
+
+
+def test_since_tracks_cursor_and_counts_overruns():
+    ring = SampleRing(4)
+    ring.extend(_rows(0, 3))
+
+    rows, cursor = ring.since(0)
+    assert rows[:, 0].tolist() == [0.0, 1.0, 2.0]
+    assert cursor == 3
+
+    ring.append(_rows(3, 4)[0])
+    ring.extend(_rows(4, 10))
+    rows, cursor = ring.since(cursor)
+
+    # Samples 3..5 were overwritten before the reader came back
+    assert rows[:, 0].tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert cursor == 10
+    assert ring.overruns == 3
+
+
+def test_since_is_empty_when_nothing_new():
+    ring = SampleRing(3)
+    ring.extend(_rows(0, 2))
+
+    rows, cursor = ring.since(2)
+    assert len(rows) == 0
+    assert cursor == 2
+
+
+def test_oversized_extend_publishes_total_after_writing_the_rows():
+    ring = SampleRing(4)
+    ring.extend(_rows(0, 3))
+    totals_during_write = []
+
+    class _WatchedStorage(np.ndarray):
+        def __setitem__(self, index, value):
+            totals_during_write.append(ring.total)
+            super().__setitem__(index, value)
+
+    ring._data = ring._data.view(_WatchedStorage)
+    ring.extend(_rows(3, 13))
+
+    # A concurrent since() must not see a total covering rows not yet written
+    assert set(totals_during_write) == {3}
+    rows, cursor = ring.since(0)
+    assert rows[:, 0].tolist() == [9.0, 10.0, 11.0, 12.0]
+    assert cursor == 13
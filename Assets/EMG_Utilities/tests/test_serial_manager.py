@@ -0,0 +1,170 @@
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import threading
+import time
+
+import pytest
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_SERIAL_MANAGER_MODULE = _load_module("serial_manager")
+SerialManager = _SERIAL_MANAGER_MODULE.SerialManager
+
+
+class _FakePort:
+    """Non-blocking serial stand-in: serves byte chunks through in_waiting/read."""
+
+    def __init__(self, chunks=(), fail=False):
+        self._chunks = list(chunks)
+        self._pending = b""
+        self.fail = fail
+        self.closed = False
+
+    @property
+    def in_waiting(self):
+        if self.fail:
+            raise OSError("device unplugged")
+        if not self._pending and self._chunks:
+            self._pending = self._chunks.pop(0)
+        return len(self._pending)
+
+    def read(self, size=1):
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def close(self):
+        self.closed = True
+
+
+def _wait_until(predicate, timeout=1.0, poll=0.005):
+    start = time.time()
+    while time.time() - start < timeout:
+        if predicate():
+            return True
+        time.sleep(poll)
+    return False
+
+
+def test_one_thread_serves_every_device_with_callbacks():
+    received = {"left": [], "right": []}
+    manager = SerialManager()
+    left = manager.add("left", serial_port=_FakePort([b"1,10\n2,2", b"0\n3,30\n"]),
+                       on_samples=lambda name, samples: received[name].extend(samples))
+    manager.add("right", serial_port=_FakePort([b"bad\n", b"7,70\n"]),
+                on_samples=lambda name, samples: received[name].extend(samples))
+
+    threads = threading.active_count()
+    manager.start()
+    try:
+        assert threading.active_count() == threads + 1
+        assert _wait_until(lambda: len(received["left"]) == 3 and len(received["right"]) == 1)
+    finally:
+        manager.stop()
+
+    assert received["left"] == [(1.0, 10.0), (2.0, 20.0), (3.0, 30.0)]
+    assert received["right"] == [(7.0, 70.0)]
+    assert (left.filtered, left.envelope) == (3.0, 30.0)
+    stats = manager.stats()["devices"]
+    assert stats["left"]["samples"] == 3
+    assert stats["right"]["parse_errors"] == 1
+
+
+def test_devices_keep_their_own_ring_buffer_and_channel_count():
+    pytest.importorskip("numpy")
+    manager = SerialManager()
+    sleeve = manager.add("sleeve", serial_port=_FakePort([b"1,10,2,20\n3,30,4,40\n"]), n_channels=2, buffer_size=8)
+    single = manager.add("single", serial_port=_FakePort([b"5,50\n"]), buffer_size=8)
+
+    while manager.poll_once():
+        pass
+
+    assert sleeve.latest(2)[:, sleeve.envelope_columns].tolist() == [[10.0, 20.0], [30.0, 40.0]]
+    assert single.latest(1)[:, 1:].tolist() == [[5.0, 50.0]]
+
+
+def test_stop_is_prompt_and_closes_every_port():
+    ports = [_FakePort(), _FakePort()]
+    manager = SerialManager(poll=0.5)
+    for i, port in enumerate(ports):
+        manager.add(f"dev{i}", serial_port=port)
+    manager.start()
+    time.sleep(0.05)
+
+    elapsed = manager.stop()
+
+    assert elapsed < 0.1
+    assert all(port.closed for port in ports)
+    assert not manager._thread.is_alive()
+
+
+def test_failing_device_is_counted_and_others_keep_reading():
+    received = []
+    manager = SerialManager()
+    manager.add("broken", serial_port=_FakePort(fail=True))
+    manager.add("ok", serial_port=_FakePort([b"1,2\n"]), on_samples=lambda name, samples: received.extend(samples))
+
+    manager.poll_once()
+    manager.poll_once()
+
+    assert received == [(1.0, 2.0)]
+    stats = manager.stats()
+    assert stats["devices"]["broken"]["read_errors"] == 2
+    assert manager.last_read_error[0] == "broken" and "unplugged" in manager.last_read_error[1]
+    assert stats["passes"] == 2 and stats["idle_passes"] == 1
+
+
+def test_callback_devices_do_not_queue_samples_and_callback_errors_are_contained():
+    received = []
+
+    def broken(name, samples):
+        raise RuntimeError("consumer bug")
+
+    manager = SerialManager()
+    bad = manager.add("bad", serial_port=_FakePort([b"1,2\n", b"3,4\n"]), on_samples=broken)
+    good = manager.add("good", serial_port=_FakePort([b"5,6\n"]), on_samples=lambda name, s: received.extend(s))
+    polled = manager.add("polled", serial_port=_FakePort([b"7,8\n"]))
+
+    manager.start()
+    try:
+        assert _wait_until(lambda: manager.stats()["devices"]["bad"]["callback_errors"] == 2)
+        assert _wait_until(lambda: received == [(5.0, 6.0)])
+        assert manager._thread.is_alive()
+    finally:
+        manager.stop()
+
+    assert "consumer bug" in manager.last_callback_error[1]
+    # the callbacks took the samples, so nothing waits in the read_samples() queue
+    assert bad.read_samples() == [] and good.read_samples() == []
+    assert (bad.filtered, bad.envelope) == (3.0, 4.0)
+    assert polled.read_samples() == [(7.0, 8.0)]
+
+
+def test_serve_runs_inside_an_event_loop():
+    received = []
+
+    async def session(manager):
+        task = asyncio.ensure_future(manager.serve())
+        while len(received) < 2:
+            await asyncio.sleep(0.001)
+        manager.stop()
+        await asyncio.wait_for(task, 1.0)
+
+    manager = SerialManager()
+    manager.add("dev", serial_port=_FakePort([b"1,2\n", b"3,4\n"]), on_samples=lambda name, s: received.extend(s))
+    asyncio.run(session(manager))
+
+    assert received == [(1.0, 2.0), (3.0, 4.0)]
+    with pytest.raises(ValueError):
+        manager.add("dev", serial_port=_FakePort())
@@ -0,0 +1,94 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_STREAM_LOG_MODULE = _load_module("stream_log")
+Segment = _STREAM_LOG_MODULE.Segment
+StreamLog = _STREAM_LOG_MODULE.StreamLog
+_STREAM_WRITER_MODULE = _load_module("stream_writer")
+BinaryStreamWriter = _STREAM_WRITER_MODULE.BinaryStreamWriter
+stream_segments = _STREAM_WRITER_MODULE.stream_segments
+
+
+def _write(path, rows, **kwargs):
+    writer = BinaryStreamWriter(path, **kwargs)
+    for row in rows:
+        writer.write(row)
+    writer.close()
+    return writer
+
+
+def test_binary_log_round_trips_segments_as_memmap_views(tmp_path):
+    path = tmp_path / "emg_stream.bin"
+    rows = [(100.0 + i, "s1", 1, i * 0.5) for i in range(5)]
+    rows += [(200.0 + i, "s1", 2, "") for i in range(3)]
+    rows += [(300.0 + i, "s2", 1, float(i)) for i in range(4)]
+    _write(path, rows)
+
+    log = StreamLog(path)
+    assert len(log) == 12
+    assert log.segments == [Segment("s1", 1, 0, 5), Segment("s1", 2, 5, 8), Segment("s2", 1, 8, 12)]
+    level = log.level("s1", 1)
+    assert isinstance(level.base, np.memmap) or isinstance(level, np.memmap)
+    np.testing.assert_array_equal(level["timestamp"], 100.0 + np.arange(5))
+    np.testing.assert_array_equal(level["value"], np.arange(5) * 0.5)
+    # values that were not numbers come back as NaN
+    assert np.isnan(log.level("s1", 2)["value"]).all()
+    assert [segment.session_id for segment, _ in log.select(level_number=1)] == ["s1", "s2"]
+
+
+def test_appending_after_a_torn_record_keeps_records_aligned(tmp_path):
+    path = tmp_path / "emg_stream.bin"
+    _write(path, [(1.0, "s1", 1, 10.0), (2.0, "s1", 1, 20.0)])
+    with path.open("ab") as f:
+        f.write(b"\x01\x02\x03")  # half-written record from a crash
+    assert len(StreamLog(path)) == 2
+
+    _write(path, [(3.0, "s1", 1, 30.0)])
+    log = StreamLog(path)
+    np.testing.assert_array_equal(log.values, [10.0, 20.0, 30.0])
+    # a new writer starts a new index entry; level() joins the two runs
+    assert len(log.select("s1", 1)) == 2
+    np.testing.assert_array_equal(log.level("s1", 1)["timestamp"], [1.0, 2.0, 3.0])
+
+
+def test_rotated_binary_segments_keep_their_index(tmp_path):
+    path = tmp_path / "emg_stream.bin"
+    writer = BinaryStreamWriter(path, batch_size=4, rotate_bytes=16 + 4 * 16, start=False)
+    for i in range(12):
+        writer.write((float(i), "s1", 3, float(i)))
+    writer.start()
+    writer.close()
+
+    segments = stream_segments(path)
+    assert writer.rotations >= 2
+    timestamps = []
+    for segment in segments:
+        log = StreamLog(segment)
+        if len(log):
+            assert {(s.session_id, s.level_number) for s in log.segments} == {("s1", 3)}
+        timestamps += log.timestamps.tolist()
+    assert timestamps == [float(i) for i in range(12)]
+
+
+def test_stream_log_rejects_other_files(tmp_path):
+    path = tmp_path / "emg_stream.csv"
+    path.write_text("timestamp,session_id,level_number,value\n" * 4)
+    with pytest.raises(ValueError):
+        StreamLog(path)
@@ -0,0 +1,124 @@
+import csv
+import importlib.util
+import pathlib
+import sys
+import time
+
+import pytest
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_STREAM_WRITER_MODULE = _load_module("stream_writer")
+StreamWriter = _STREAM_WRITER_MODULE.StreamWriter
+segment_path = _STREAM_WRITER_MODULE.segment_path
+stream_segments = _STREAM_WRITER_MODULE.stream_segments
+
+
+def _read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_writer_writes_header_and_all_rows_on_close(tmp_path):
+    path = tmp_path / "stream.csv"
+    writer = StreamWriter(path, header=["a", "b"], batch_size=7)
+    for i in range(100):
+        assert writer.write([i, i * 2])
+    writer.close()
+
+    rows = _read_rows(path)
+    assert rows[0] == ["a", "b"]
+    assert rows[1:] == [[str(i), str(i * 2)] for i in range(100)]
+    assert writer.written == 100
+    assert writer.dropped == 0
+    assert writer.batches >= 100 // 7
+
+
+def test_writer_counts_rows_dropped_when_queue_is_full(tmp_path):
+    path = tmp_path / "stream.csv"
+    writer = StreamWriter(path, max_queue=3, start=False)
+    results = [writer.write([i]) for i in range(5)]
+    writer.start()
+    writer.close()
+
+    assert results == [True, True, True, False, False]
+    assert writer.stats()["dropped"] == 2
+    assert _read_rows(path) == [["0"], ["1"], ["2"]]
+
+
+def test_writer_does_not_repeat_header_when_appending(tmp_path):
+    path = tmp_path / "stream.csv"
+    for value in ("x", "y"):
+        writer = StreamWriter(path, header=["value"], durability="fsync")
+        writer.write([value])
+        writer.close()
+
+    assert _read_rows(path) == [["value"], ["x"], ["y"]]
+
+
+def test_writer_rejects_unknown_durability(tmp_path):
+    with pytest.raises(ValueError):
+        StreamWriter(tmp_path / "stream.csv", durability="eventually")
+
+
+def test_writer_rotates_into_numbered_segments_with_headers(tmp_path):
+    path = tmp_path / "emg_stream.csv"
+    writer = StreamWriter(path, header=["value"], batch_size=10, rotate_bytes=40)
+    for i in range(100):
+        writer.write([f"{i:03d}"])
+        if i % 10 == 9:
+            # let the writer take one batch at a time
+            while writer.queue_depth:
+                time.sleep(0.001)
+    writer.close()
+
+    segments = stream_segments(path)
+    assert writer.rotations >= 2
+    assert segments[0] == segment_path(path, 1)
+    assert segments[-1] == path
+    values = []
+    for segment in segments:
+        rows = _read_rows(segment)
+        assert rows[0] == ["value"]
+        values += [row[0] for row in rows[1:]]
+    assert values == [f"{i:03d}" for i in range(100)]
+
+
+def test_writer_flushes_on_byte_threshold_before_close(tmp_path):
+    path = tmp_path / "stream.csv"
+    writer = StreamWriter(path, flush_rows=10**6, flush_interval=60.0, flush_bytes=100)
+    try:
+        # 10 rows of 3 bytes stay below the threshold, so nothing reaches the file yet
+        for i in range(10):
+            writer.write([i])
+        assert _wait_until(lambda: writer.written == 10)
+        time.sleep(0.05)
+        assert writer.flushes == 0
+        assert path.stat().st_size == 0
+
+        # 20 rows of 6 bytes cross it
+        for i in range(1000, 1020):
+            writer.write([i])
+        assert _wait_until(lambda: writer.flushes >= 1)
+        assert len(_read_rows(path)) == 30
+    finally:
+        writer.close()
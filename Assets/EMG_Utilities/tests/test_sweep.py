@@ -0,0 +1,121 @@
+import importlib.util
+import json
+import pathlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_SWEEP_MODULE = _load_module("sweep")
+load_results = _SWEEP_MODULE.load_results
+make_folds = _SWEEP_MODULE.make_folds
+param_grid = _SWEEP_MODULE.param_grid
+run_sweep = _SWEEP_MODULE.run_sweep
+summarize = _SWEEP_MODULE.summarize
+
+
+def test_param_grid_is_every_combination_in_stable_order():
+    grid = param_grid({"learning_rate": [0.01, 0.001], "hidden_units": [[16], [32, 16]]})
+    assert grid == [
+        {"hidden_units": [16], "learning_rate": 0.01},
+        {"hidden_units": [16], "learning_rate": 0.001},
+        {"hidden_units": [32, 16], "learning_rate": 0.01},
+        {"hidden_units": [32, 16], "learning_rate": 0.001},
+    ]
+
+
+def test_group_folds_never_split_a_group():
+    groups = np.repeat(["a", "b", "c", "d", "e", "f"], 5)
+    folds = make_folds(len(groups), k=3, groups=groups)
+
+    assert sorted(np.concatenate([val for _, val in folds]).tolist()) == list(range(30))
+    for train, val in folds:
+        assert not set(groups[train]) & set(groups[val])
+        assert len(set(groups[val])) == 2
+    with pytest.raises(ValueError):
+        make_folds(len(groups), k=7, groups=groups)
+
+
+def test_sweep_resumes_and_retries_failed_trials(tmp_path, monkeypatch):
+    calls = []
+    failing = [True]
+
+    def fake_trial(params, train_idx, val_idx, seed):
+        calls.append((params["learning_rate"], len(val_idx)))
+        if params["learning_rate"] == 0.1 and failing[0]:
+            raise RuntimeError("diverged")
+        return {"val_loss": 0.5, "val_accuracy": params["learning_rate"] * 10, "seconds": 0.0}
+
+    monkeypatch.setattr(_SWEEP_MODULE, "_run_trial", fake_trial)
+    X, y = np.zeros((12, 11)), np.zeros(12)
+    grid = {"learning_rate": [0.01, 0.1]}
+    results_path = tmp_path / "results.jsonl"
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        run_sweep(X, y, grid, k=2, results_path=results_path, executor=executor)
+        assert len(calls) == 4
+        failing[0] = False
+        results = run_sweep(X, y, grid, k=2, results_path=results_path, executor=executor)
+
+    # only the two failed trials ran again
+    assert len(calls) == 6
+    assert len(results) == 6
+    assert all(json.loads(line) for line in results_path.read_text().splitlines())
+    best = summarize(load_results(results_path), k=2)
+    assert [row["params"]["learning_rate"] for row in best] == [0.1, 0.01]
+    assert best[0]["folds"] == 2
+
+
+def test_stored_results_of_other_data_are_not_reused(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_trial(params, train_idx, val_idx, seed):
+        calls.append(len(val_idx))
+        return {"val_loss": 0.5, "val_accuracy": 0.5 + len(calls) / 100, "seconds": 0.0}
+
+    monkeypatch.setattr(_SWEEP_MODULE, "_run_trial", fake_trial)
+    grid = {"learning_rate": [0.01]}
+    results_path = tmp_path / "results.jsonl"
+    # float32, as run_sweep fingerprints its float32 copies
+    first_cohort = np.zeros((12, 11), np.float32), np.zeros(12, np.float32)
+    next_cohort = np.ones((12, 11), np.float32), np.zeros(12, np.float32)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        run_sweep(*first_cohort, grid, k=2, results_path=results_path, executor=executor)
+        results = run_sweep(*next_cohort, grid, k=2, results_path=results_path, executor=executor)
+
+    # the next cohort trains every trial and only sees its own results
+    assert len(calls) == 4
+    assert len(results) == 2 and len(load_results(results_path)) == 4
+    data = _SWEEP_MODULE.data_fingerprint(*next_cohort)
+    assert all(r["data"] == data for r in results)
+    assert summarize(load_results(results_path), k=2, data=data)[0]["mean_accuracy"] == pytest.approx(0.535)
+    assert data != _SWEEP_MODULE.data_fingerprint(*next_cohort, groups=["a"] * 6 + ["b"] * 6)
+
+
+def test_trial_trains_a_real_model(tmp_path):
+    pytest.importorskip("tensorflow")
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(40, 11)).astype(np.float32)
+    y = (X[:, 0] > 0).astype(np.float32)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        results = run_sweep(X, y, {"hidden_units": [[8]], "learning_rate": [0.01], "epochs": [2], "batch_size": [8]},
+                            k=2, results_path=tmp_path / "results.jsonl", executor=executor)
+
+    assert len(results) == 2
+    assert all(not r.get("error") and 0.0 <= r["val_accuracy"] <= 1.0 for r in results)
@@ -0,0 +1,93 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+_EMG_DIR = pathlib.Path(__file__).resolve().parents[1]
+# The modules import their siblings by name
+sys.path.insert(0, str(_EMG_DIR))
+
+
+def _load_module(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_module", _EMG_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_FEATURE_DATASET_MODULE = _load_module("feature_dataset")
+FeatureDatasetWriter = _FEATURE_DATASET_MODULE.FeatureDatasetWriter
+_TRAINING_DATA_MODULE = _load_module("training_data")
+load_shard = _TRAINING_DATA_MODULE.load_shard
+split_sessions = _TRAINING_DATA_MODULE.split_sessions
+
+
+def _write_dataset(directory):
+    rng = np.random.default_rng(1)
+    writer = FeatureDatasetWriter(directory, window=50, hop=50, shard_rows=10)
+    rows = {}
+    for i, session in enumerate(["a", "b", "c", "d", "e"]):
+        for level in (1, 2, 5):
+            features = rng.normal(size=(4, 11)) + i
+            label = {1: 0, 2: 1, 5: -1}[level]
+            writer.append(features, label, session, level)
+            rows[(session, level)] = features
+    writer.close()
+    return rows
+
+
+def test_split_sessions_is_disjoint_and_reproducible(tmp_path):
+    _write_dataset(tmp_path / "features")
+    train, val = split_sessions(tmp_path / "features", validation_fraction=0.4, seed=3)
+
+    assert len(val) == 2 and len(train) == 3
+    assert sorted(train + val) == ["a", "b", "c", "d", "e"]
+    assert split_sessions(tmp_path / "features", validation_fraction=0.4, seed=3) == (train, val)
+
+
+def test_load_shard_keeps_selected_sessions_and_known_labels(tmp_path):
+    rows = _write_dataset(tmp_path / "features")
+    features, labels = load_shard(tmp_path / "features" / "part-00000.npz", sessions=["a"])
+
+    assert features.dtype == np.float32
+    np.testing.assert_allclose(features, np.vstack([rows[("a", 1)], rows[("a", 2)]]), rtol=1e-6)
+    assert labels.tolist() == [0] * 4 + [1] * 4
+
+
+def test_make_dataset_streams_only_the_requested_sessions(tmp_path):
+    pytest.importorskip("tensorflow")
+    make_dataset = _TRAINING_DATA_MODULE.make_dataset
+
+    rows = _write_dataset(tmp_path / "features")
+    ds = make_dataset(tmp_path / "features", sessions=["b", "d"], batch_size=5, shuffle_buffer=8, seed=0)
+    features = np.vstack([f.numpy() for f, _ in ds])
+    labels = np.concatenate([y.numpy() for _, y in ds])
+
+    expected = np.vstack([rows[(s, lvl)] for s in ("b", "d") for lvl in (1, 2)])
+    assert features.shape == (16, 11) and labels.shape == (16,)
+    # shuffled, but the same rows
+    np.testing.assert_allclose(np.sort(features, axis=0), np.sort(expected, axis=0), rtol=1e-6)
+    assert sorted(labels.tolist()) == [0.0] * 8 + [1.0] * 8
+
+    ordered = make_dataset(tmp_path / "features", sessions=["b", "d"], batch_size=5, shuffle=False, cache="")
+    for _ in range(2):  # second pass comes from the cache
+        np.testing.assert_allclose(np.vstack([f.numpy() for f, _ in ordered]), expected, rtol=1e-6)
+
+
+def test_model_trains_on_a_streamed_dataset(tmp_path):
+    pytest.importorskip("tensorflow")
+    model_module = _load_module("model")
+    build_model = model_module.build_model
+    evaluate_model = model_module.evaluate_model
+    train_neural_network = model_module.train_neural_network
+    make_dataset = _TRAINING_DATA_MODULE.make_dataset
+
+    _write_dataset(tmp_path / "features")
+    train_ds = make_dataset(tmp_path / "features", sessions=["a", "b", "c"], batch_size=8, seed=0)
+    val_ds = make_dataset(tmp_path / "features", sessions=["d", "e"], batch_size=8, shuffle=False)
+
+    model = train_neural_network(build_model(), train_ds, epochs=2, validation_data=val_ds)
+    assert 0.0 <= evaluate_model(model, val_ds) <= 1.0
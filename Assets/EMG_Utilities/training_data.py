@@ -0,0 +1,93 @@
+# Streaming training input over a feature dataset directory (see
+# feature_dataset). Shards are read one at a time inside a tf.data pipeline,
+# so training memory depends on the shard and shuffle buffer sizes rather
+# than on the size of the dataset. TensorFlow is only imported by
+# make_dataset.
+import math
+from pathlib import Path
+
+import numpy as np
+
+from feature_dataset import read_schema
+
+
+def dataset_sessions(directory):
+    """Sorted session ids in the dataset, reading only the session_id column of each shard."""
+    sessions = set()
+    for shard in read_schema(directory)["shards"]:
+        with np.load(Path(directory) / shard["file"]) as data:
+            sessions.update(data["session_id"].tolist())
+    return sorted(sessions)
+
+
+def split_sessions(directory, validation_fraction=0.2, seed=13):
+    """
+    Splits the dataset's sessions into train and validation sessions, so no
+    session contributes rows to both sides.
+
+    Returns:
+        tuple: (train_sessions, validation_sessions). With a single session
+        everything goes to training.
+    """
+    sessions = dataset_sessions(directory)
+    if len(sessions) < 2:
+        return sessions, []
+    order = np.random.default_rng(seed).permutation(len(sessions))
+    n_val = min(max(1, math.ceil(len(sessions) * validation_fraction)), len(sessions) - 1)
+    val = sorted(sessions[i] for i in order[:n_val])
+    train = sorted(sessions[i] for i in order[n_val:])
+    return train, val
+
+
+def load_shard(path, sessions=None):
+    """
+    (features, labels) of one shard as float32, keeping only the given
+    sessions and rows with a known label (Output 0 or 1).
+    """
+    with np.load(path) as data:
+        features, labels = data["features"], data["Output"]
+        keep = labels >= 0
+        if sessions is not None:
+            keep &= np.isin(data["session_id"], list(sessions))
+    return features[keep].astype(np.float32), labels[keep].astype(np.float32)
+
+
+def make_dataset(directory, sessions=None, batch_size=32, shuffle_buffer=10000, shuffle=True, cache=None,
+                 num_parallel_calls=None, seed=None):
+    """
+    Batched tf.data.Dataset of (features, label) pairs read from the shards.
+
+    Args:
+        sessions: Only rows of these sessions (e.g. one side of split_sessions).
+        shuffle_buffer: Rows held for shuffling; shard order is shuffled too.
+        shuffle: False keeps the dataset order, e.g. for evaluation.
+        cache: None for no caching, "" to cache the rows in memory after the
+            first epoch, or a file path to cache them on disk.
+        num_parallel_calls: Shards loaded in parallel (default: AUTOTUNE).
+    """
+    import tensorflow as tf
+
+    directory = Path(directory)
+    schema = read_schema(directory)
+    width = len(schema["feature_columns"])
+    files = [str(directory / shard["file"]) for shard in schema["shards"]]
+    sessions = None if sessions is None else list(sessions)
+    parallel = tf.data.AUTOTUNE if num_parallel_calls is None else num_parallel_calls
+
+    def load(path):
+        features, labels = tf.numpy_function(
+            lambda p: load_shard(p.decode(), sessions), [path], (tf.float32, tf.float32))
+        features.set_shape([None, width])
+        labels.set_shape([None])
+        return features, labels
+
+    ds = tf.data.Dataset.from_tensor_slices(files)
+    if shuffle:
+        ds = ds.shuffle(len(files) or 1, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.map(load, num_parallel_calls=parallel, deterministic=not shuffle)
+    ds = ds.unbatch()
+    if cache is not None:
+        ds = ds.cache(cache)
+    if shuffle:
+        ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
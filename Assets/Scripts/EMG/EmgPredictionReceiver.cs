@@ -0,0 +1,108 @@
+using System;
+using System.Net;
+using System.Net.Sockets;
+using UnityEngine;
+
+/// Receives live EMG decisions from EMG_Utilities (live_session.py --publish 127.0.0.1:5005).
+/// Every UDP datagram is one 24-byte little-endian message, see prediction_bridge.py:
+///   magic "EP" | version u8 | decision u8 | session u32 | seq u32 | timestamp f8 (unix seconds) | probability f4
+/// session is random per publisher run; when it changes, seq starts over and so does the receiver.
+/// The socket is non-blocking and drained once per frame, so only the newest decision is applied.
+public class EmgPredictionReceiver : MonoBehaviour
+{
+    private const int MessageSize = 24;
+    private const byte MessageVersion = 2;
+
+    [SerializeField] private int port = 5005;
+
+    private UdpClient client;
+    private long session = -1;
+    private long nextSeq = -1;
+
+    public float Probability { get; private set; }
+    public bool Decision { get; private set; }
+    public uint Sequence { get; private set; }
+    /// Muscle-to-game latency of the last message: receive time minus decision time.
+    public double LatencyMs { get; private set; }
+    public int Received { get; private set; }
+    public int Lost { get; private set; }
+
+    /// Raised when the decision flips, e.g. to drive a macro on muscle activation.
+    public event Action<bool> DecisionChanged;
+
+    void OnEnable()
+    {
+        try
+        {
+            client = new UdpClient(new IPEndPoint(IPAddress.Loopback, port));
+            client.Client.Blocking = false;
+        }
+        catch (SocketException e)
+        {
+            Debug.LogError($"[EmgPredictionReceiver] Cannot listen on port {port}: {e.Message}");
+            client = null;
+        }
+    }
+
+    void OnDisable()
+    {
+        client?.Close();
+        client = null;
+    }
+
+    void Update()
+    {
+        if (client == null)
+            return;
+
+        var remote = new IPEndPoint(IPAddress.Any, 0);
+        while (client.Available > 0)
+        {
+            byte[] data;
+            try
+            {
+                data = client.Receive(ref remote);
+            }
+            catch (SocketException)
+            {
+                break;
+            }
+            Apply(data);
+        }
+    }
+
+    private void Apply(byte[] data)
+    {
+        if (data.Length != MessageSize || data[0] != (byte)'E' || data[1] != (byte)'P' || data[2] != MessageVersion)
+            return;
+        // Windows and every Unity target we ship are little-endian, like the message
+        uint messageSession = BitConverter.ToUInt32(data, 4);
+        uint seq = BitConverter.ToUInt32(data, 8);
+        double timestamp = BitConverter.ToDouble(data, 12);
+        float probability = BitConverter.ToSingle(data, 20);
+        bool decision = data[3] != 0;
+
+        if (messageSession != session)
+        {
+            // The Python side restarted; its sequence counts from 0 again
+            session = messageSession;
+            nextSeq = -1;
+        }
+        if (nextSeq >= 0 && seq < nextSeq)
+            return; // stale, a newer decision was already applied
+        if (nextSeq >= 0)
+            Lost += (int)(seq - nextSeq);
+        nextSeq = (long)seq + 1;
+        Received++;
+
+        double nowSeconds = DateTimeOffset.UtcNow.ToUnixTimeMilliseconds() / 1000.0;
+        LatencyMs = (nowSeconds - timestamp) * 1000.0;
+        Sequence = seq;
+        Probability = probability;
+        if (decision != Decision)
+        {
+            Decision = decision;
+            DecisionChanged?.Invoke(decision);
+        }
+    }
+}